@@ -0,0 +1,345 @@
+import math
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional, Callable, Sequence, Tuple, AsyncIterator
+
+# HTTP status for each way a chat can be turned away
+REJECTION_STATUS = {"rate_limited": 429, "queue_full": 503, "queue_timeout": 503, "shed": 503}
+
+
+class AdmissionRejected(Exception):
+    """Raised instead of running a chat; ``status`` and ``retry_after`` (whole seconds) go into the HTTP response"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"{reason}, retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status = REJECTION_STATUS[reason]
+
+
+def parse_priorities(spec: str) -> List[str]:
+    """``"interactive,batch"`` -> priority classes, highest first"""
+    return [name.strip().lower() for name in spec.split(",") if name.strip()]
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``; every chat takes one"""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token; returns 0 if there was one, else the seconds until there will be"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _Waiter:
+    __slots__ = ("rank", "priority", "enqueued_at", "state", "wake")
+
+    def __init__(self, rank: int, priority: str, enqueued_at: float, wake: Callable[[], None]):
+        self.rank = rank
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        # waiting -> granted | shed | timed_out | cancelled
+        self.state = "waiting"
+        self.wake = wake
+
+
+class Ticket:
+    """An admitted chat's slot; ``release()`` it when the chat is over (repeated calls are ignored)"""
+
+    def __init__(self, controller: "AdmissionController", priority: str, started: float, waited: float):
+        self.controller = controller
+        self.priority = priority
+        self.started = started
+        self.waited = waited
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.controller._release(self)
+
+
+class AdmissionController:
+    """Admission control and priority scheduling for chats
+
+    At most ``max_concurrent`` chats run at once. Each client first takes a
+    token from its own bucket (``client_rate`` per second, up to
+    ``client_burst``); a client out of tokens is turned away at once with
+    ``rate_limited``. Otherwise the chat starts if a slot is free and no
+    chat of the same or a higher class is waiting. If not, it waits in a
+    queue ordered by priority class (``priorities``, highest first), then
+    arrival. The top class may also use the ``reserved`` slots that lower
+    classes leave free, so a burst of batch chats cannot hold every slot.
+
+    The queue holds at most ``max_queue`` chats. When it is full, a new
+    chat takes the place of the newest waiting chat of a lower class, which
+    is ``shed``; with none to displace it is turned away with
+    ``queue_full``. A chat still waiting after ``max_wait`` seconds gives
+    up with ``queue_timeout``. Rejections carry a Retry-After: the time
+    until the client's next token, or an estimate of how long the queue
+    takes to drain.
+
+    Works from both event loops and threads: ``admit`` / ``acquire`` for
+    coroutines, ``acquire_blocking`` for threads. ``observer(priority,
+    outcome, wait_seconds)`` is told how every request ended.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int = 256, max_wait: float = 10.0,
+                 priorities: Sequence[str] = ("interactive", "batch"), default_priority: Optional[str] = None,
+                 reserved: int = 0, client_rate: float = 0.0, client_burst: float = 10, max_clients: int = 10000,
+                 max_retry_after: int = 60, observer: Optional[Callable[[str, str, float], None]] = None,
+                 clock: Callable[[], float] = time.monotonic, window: int = 512):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.priorities = list(priorities) or ["default"]
+        self.default_priority = default_priority if default_priority in self.priorities else self.priorities[-1]
+        self.reserved = min(max(0, reserved), self.max_concurrent - 1)
+        self.client_rate = client_rate
+        self.client_burst = max(1.0, client_burst)
+        self.max_clients = max_clients
+        self.max_retry_after = max_retry_after
+        self.observer = observer
+        self.clock = clock
+        self._ranks = {name: rank for rank, name in enumerate(self.priorities)}
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._in_flight = 0
+        self._queued = {name: 0 for name in self.priorities}
+        self._avg_run: Optional[float] = None
+        self._peaks = {"in_flight": 0, "queued": 0}
+        self._outcomes = {name: {"admitted": 0, "rate_limited": 0, "queue_full": 0, "queue_timeout": 0,
+                                 "shed": 0, "cancelled": 0} for name in self.priorities}
+        self._waits = {name: deque(maxlen=window) for name in self.priorities}
+
+    def priority(self, requested: Optional[str]) -> str:
+        """The class a request asked for, or the default class for missing and unknown names"""
+        name = (requested or "").strip().lower()
+        return name if name in self._ranks else self.default_priority
+
+    def _limit(self, rank: int) -> int:
+        return self.max_concurrent if rank == 0 else self.max_concurrent - self.reserved
+
+    def _queue_retry_after(self) -> int:
+        queued = sum(self._queued.values())
+        run = self._avg_run if self._avg_run is not None else 1.0
+        return min(self.max_retry_after, max(1, math.ceil(run * (queued + 1) / self.max_concurrent)))
+
+    def _prune(self):
+        while self._heap and self._heap[0][2].state != "waiting":
+            heapq.heappop(self._heap)
+
+    def _record(self, priority: str, outcome: str, waited: float):
+        """Count an outcome; called with the lock held, the observer is told after it is released"""
+        self._outcomes[priority][outcome] += 1
+        if outcome == "admitted":
+            self._waits[priority].append(waited)
+
+    def _notify(self, priority: str, outcome: str, waited: float):
+        if self.observer is not None:
+            self.observer(priority, outcome, waited)
+
+    def _reject(self, priority: str, reason: str, retry_after: float, waited: float = 0.0) -> AdmissionRejected:
+        self._notify(priority, reason, waited)
+        return AdmissionRejected(reason, min(self.max_retry_after, max(1, math.ceil(retry_after))))
+
+    def _enter(self, client: Optional[str], priority: str,
+               wake: Callable[[], None]) -> Tuple[Optional[Ticket], Optional[_Waiter]]:
+        """Start the chat now (a ticket), queue it (a waiter), or raise ``AdmissionRejected``"""
+        rank = self._ranks[priority]
+        ticket = waiter = shed = rejection = None
+        with self._lock:
+            now = self.clock()
+            if self.client_rate > 0 and client:
+                bucket = self._buckets.get(client)
+                if bucket is None:
+                    bucket = self._buckets[client] = TokenBucket(self.client_rate, self.client_burst, now)
+                    if len(self._buckets) > self.max_clients:
+                        self._buckets.popitem(last=False)
+                else:
+                    self._buckets.move_to_end(client)
+                wait = bucket.take(now)
+                if wait:
+                    rejection = ("rate_limited", wait)
+
+            if rejection is None:
+                self._prune()
+                if self._in_flight < self._limit(rank) and not (self._heap and self._heap[0][0] <= rank):
+                    self._in_flight += 1
+                    self._peaks["in_flight"] = max(self._peaks["in_flight"], self._in_flight)
+                    ticket = Ticket(self, priority, now, 0.0)
+                elif self.max_queue <= 0 or self.max_wait <= 0:
+                    rejection = ("queue_full", self._queue_retry_after())
+                elif sum(self._queued.values()) >= self.max_queue:
+                    shed = self._lowest_waiter(below=rank)
+                    if shed is None:
+                        rejection = ("queue_full", self._queue_retry_after())
+                    else:
+                        shed.state = "shed"
+                        self._queued[shed.priority] -= 1
+                        self._record(shed.priority, "shed", now - shed.enqueued_at)
+
+            if rejection is not None:
+                self._record(priority, rejection[0], 0.0)
+            elif ticket is not None:
+                self._record(priority, "admitted", 0.0)
+            else:
+                waiter = _Waiter(rank, priority, now, wake)
+                heapq.heappush(self._heap, (rank, next(self._seq), waiter))
+                self._queued[priority] += 1
+                self._peaks["queued"] = max(self._peaks["queued"], sum(self._queued.values()))
+        if shed is not None:
+            shed.wake()
+            self._notify(shed.priority, "shed", now - shed.enqueued_at)
+        if rejection is not None:
+            raise self._reject(priority, *rejection)
+        if ticket is not None:
+            self._notify(priority, "admitted", 0.0)
+        return ticket, waiter
+
+    def _lowest_waiter(self, below: int) -> Optional[_Waiter]:
+        """The newest waiting chat of the lowest class ranked after ``below``, to make room for a higher one"""
+        candidates = [(rank, seq, waiter) for rank, seq, waiter in self._heap
+                      if waiter.state == "waiting" and rank > below]
+        return max(candidates, key=lambda entry: entry[:2])[2] if candidates else None
+
+    def _settle(self, waiter: _Waiter) -> Ticket:
+        """After waking or timing out: the waiter's ticket, or ``AdmissionRejected``"""
+        with self._lock:
+            now = self.clock()
+            waited = now - waiter.enqueued_at
+            state = waiter.state
+            if state == "waiting":
+                waiter.state = "timed_out"
+                self._queued[waiter.priority] -= 1
+                self._record(waiter.priority, "queue_timeout", waited)
+                retry_after = self._queue_retry_after()
+        if state == "granted":
+            self._notify(waiter.priority, "admitted", waited)
+            return Ticket(self, waiter.priority, now, waited)
+        if state == "shed":
+            raise AdmissionRejected("shed", self._queue_retry_after())
+        raise self._reject(waiter.priority, "queue_timeout", retry_after, waited)
+
+    def _abandon(self, waiter: _Waiter):
+        """The waiting caller went away (e.g. the client disconnected); free its place or its slot"""
+        with self._lock:
+            state = waiter.state
+            if state == "waiting":
+                waiter.state = "cancelled"
+                self._queued[waiter.priority] -= 1
+                self._record(waiter.priority, "cancelled", self.clock() - waiter.enqueued_at)
+        if state == "granted":
+            # Admitted while being cancelled: count it as a zero-length run
+            self._release(Ticket(self, waiter.priority, self.clock(), 0.0))
+
+    def _dispatch(self) -> List[_Waiter]:
+        """Grant free slots to the waiters at the head of the queue; called with the lock held"""
+        granted = []
+        while True:
+            self._prune()
+            if not self._heap or self._in_flight >= self._limit(self._heap[0][0]):
+                return granted
+            _, _, waiter = heapq.heappop(self._heap)
+            waiter.state = "granted"
+            self._in_flight += 1
+            self._queued[waiter.priority] -= 1
+            self._peaks["in_flight"] = max(self._peaks["in_flight"], self._in_flight)
+            self._record(waiter.priority, "admitted", self.clock() - waiter.enqueued_at)
+            granted.append(waiter)
+
+    def _release(self, ticket: Ticket):
+        with self._lock:
+            run = self.clock() - ticket.started
+            self._avg_run = run if self._avg_run is None else 0.9 * self._avg_run + 0.1 * run
+            self._in_flight -= 1
+            granted = self._dispatch()
+        for waiter in granted:
+            waiter.wake()
+
+    async def acquire(self, client: Optional[str] = None, priority: Optional[str] = None) -> Ticket:
+        """Wait for a slot on the running event loop"""
+        priority = self.priority(priority)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve():
+            if not future.done():
+                future.set_result(None)
+
+        ticket, waiter = self._enter(client, priority, lambda: loop.call_soon_threadsafe(resolve))
+        if ticket is not None:
+            return ticket
+        try:
+            await asyncio.wait({future}, timeout=self.max_wait)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        return self._settle(waiter)
+
+    def acquire_blocking(self, client: Optional[str] = None, priority: Optional[str] = None) -> Ticket:
+        """Wait for a slot, blocking the calling thread"""
+        priority = self.priority(priority)
+        event = threading.Event()
+        ticket, waiter = self._enter(client, priority, event.set)
+        if ticket is not None:
+            return ticket
+        event.wait(self.max_wait)
+        return self._settle(waiter)
+
+    @asynccontextmanager
+    async def admit(self, client: Optional[str] = None, priority: Optional[str] = None) -> AsyncIterator[Ticket]:
+        ticket = await self.acquire(client, priority)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def queue_depths(self) -> List[Tuple[Tuple[str], int]]:
+        """``((priority,), waiting chats)`` pairs, for a labelled gauge"""
+        with self._lock:
+            return [((name,), count) for name, count in self._queued.items()]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            priorities = {}
+            for name in self.priorities:
+                waits = sorted(self._waits[name])
+                priorities[name] = {
+                    "queued": self._queued[name],
+                    **self._outcomes[name],
+                    "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else None,
+                    "wait_p95_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else None
+                }
+            totals = {outcome: sum(counts[outcome] for counts in self._outcomes.values())
+                      for outcome in self._outcomes[self.priorities[0]]}
+            return {
+                "max_concurrent": self.max_concurrent,
+                "reserved_slots": self.reserved,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": sum(self._queued.values()),
+                "peak_in_flight": self._peaks["in_flight"],
+                "peak_queued": self._peaks["queued"],
+                **totals,
+                "clients": len(self._buckets),
+                "avg_run_ms": round(self._avg_run * 1000, 1) if self._avg_run is not None else None,
+                "priorities": priorities
+            }
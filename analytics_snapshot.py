@@ -0,0 +1,204 @@
+import json
+import time
+import zlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def network_metrics(vertex_counts: Dict[str, int], edge_counts: Dict[str, int]) -> List[Dict[str, Any]]:
+    """The GetNetworkAnalytics metrics, derived from per-type vertex and edge counts"""
+    people = vertex_counts.get("Person", 0)
+    friendships = edge_counts.get("FRIENDS_WITH", 0)
+    max_possible_connections = people * (people - 1)
+    return [
+        {"metric_name": "total_people", "value": people, "description": "Total number of people in network"},
+        {"metric_name": "total_companies", "value": vertex_counts.get("Company", 0), "description": "Total number of companies"},
+        {"metric_name": "total_cities", "value": vertex_counts.get("City", 0), "description": "Total number of cities"},
+        {"metric_name": "total_friendships", "value": friendships, "description": "Total friendship connections"},
+        {"metric_name": "total_work_relationships", "value": edge_counts.get("WORKS_AT", 0), "description": "Total work relationships"},
+        {"metric_name": "total_follows", "value": edge_counts.get("FOLLOWS", 0), "description": "Total follow relationships"},
+        {"metric_name": "avg_friends_per_person", "value": friendships / people if people else 0.0,
+         "description": "Average friends per person"},
+        {"metric_name": "network_density", "value": friendships * 2.0 / max_possible_connections if max_possible_connections else 0.0,
+         "description": "Network density (0-1)"}
+    ]
+
+
+class AnalyticsSnapshot:
+    """Materialized network analytics, refreshed in the background.
+
+    ``count_vertices()`` and ``count_edges()`` return ``{type: count}``
+    dicts, normally from the REST++ statistics builtins, which read stored
+    counts instead of scanning the graph. The metrics computed from them
+    are kept with the time they were computed and the data version they
+    reflect.
+
+    ``data_version`` is bumped by ``mark_stale`` whenever the graph is
+    known to have changed (e.g. after a data load). A snapshot is stale
+    once it is older than ``max_age`` seconds or behind the current data
+    version. Reads never wait on a refresh once a snapshot exists: a stale
+    one is returned with its staleness reported, and a refresh starts in
+    the background. After a failed refresh, the next one waits
+    ``retry_backoff`` seconds, doubling with each further failure up to
+    ``max_age``; until the first snapshot exists, reads in between fail
+    fast.
+    """
+
+    def __init__(self, count_vertices: Callable[[], Dict[str, int]], count_edges: Callable[[], Dict[str, int]],
+                 max_age: float = 300.0, retry_backoff: float = 30.0, clock: Callable[[], float] = time.time):
+        self.count_vertices = count_vertices
+        self.count_edges = count_edges
+        self.max_age = max_age
+        self.retry_backoff = retry_backoff
+        self.clock = clock
+        self.data_version = 0
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # Guarded by _lock; set before the background thread starts so only one is ever running
+        self._refreshing = False
+        self.failures = 0
+        self.last_attempt = 0.0
+        self.stats_counters = {"reads": 0, "stale_reads": 0, "refreshes": 0, "refresh_errors": 0}
+        self.last_error = ""
+
+    def mark_stale(self) -> int:
+        """Record that the graph changed; returns the new data version"""
+        self.data_version += 1
+        return self.data_version
+
+    def _refresh(self) -> Dict[str, Any]:
+        version = self.data_version
+        start = time.perf_counter()
+        vertex_counts = self.count_vertices()
+        edge_counts = self.count_edges()
+        computed_at = self.clock()
+        self._snapshot = {
+            "metrics": network_metrics(vertex_counts, edge_counts),
+            "vertex_counts": vertex_counts,
+            "edge_counts": edge_counts,
+            "computed_at": computed_at,
+            "data_version": version,
+            "compute_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+        self.stats_counters["refreshes"] += 1
+        logger.info(f"Network analytics snapshot refreshed (data version {version})")
+        return self._snapshot
+
+    def refresh(self) -> Dict[str, Any]:
+        """Recompute the snapshot now"""
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _retry_delay(self) -> float:
+        if not self.failures:
+            return 0.0
+        return min(self.retry_backoff * 2 ** (self.failures - 1), max(self.retry_backoff, self.max_age))
+
+    def _backing_off(self) -> float:
+        """Seconds left before a failed refresh may be retried"""
+        return max(0.0, self.last_attempt + self._retry_delay() - time.time())
+
+    def _attempt_refresh(self, refresh: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            snapshot = refresh()
+        except Exception as e:
+            self.failures += 1
+            self.stats_counters["refresh_errors"] += 1
+            self.last_error = str(e)
+            logger.warning(f"Network analytics refresh failed, retrying in {self._retry_delay():.0f}s: {e}")
+            raise
+        self.failures = 0
+        self.last_error = ""
+        return snapshot
+
+    def _refresh_in_background(self) -> bool:
+        """Start a background refresh unless one is running or the last one failed too recently"""
+        def run():
+            try:
+                self._attempt_refresh(self.refresh)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        with self._lock:
+            if self._refreshing or self._backing_off():
+                return False
+            self._refreshing = True
+            self.last_attempt = time.time()
+        threading.Thread(target=run, name="analytics-refresh", daemon=True).start()
+        return True
+
+    def _first_refresh(self) -> Dict[str, Any]:
+        """Build the first snapshot now, unless the last attempt failed too recently"""
+        with self._refresh_lock:
+            snapshot = self._snapshot
+            if snapshot is not None:
+                return snapshot
+            wait = self._backing_off()
+            if wait:
+                raise RuntimeError(f"Network analytics are not available yet (last error: {self.last_error}); "
+                                   f"retrying in {wait:.0f}s")
+            self.last_attempt = time.time()
+            return self._attempt_refresh(self._refresh)
+
+    def _staleness(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        age = max(0.0, self.clock() - snapshot["computed_at"])
+        behind = self.data_version - snapshot["data_version"]
+        return {
+            "computed_at": datetime.fromtimestamp(snapshot["computed_at"], timezone.utc).isoformat(timespec="seconds"),
+            "age_seconds": round(age, 1),
+            "data_version": snapshot["data_version"],
+            "current_data_version": self.data_version,
+            "stale": age > self.max_age or behind > 0,
+            "refreshing": self._refreshing
+        }
+
+    def get(self) -> Dict[str, Any]:
+        """The latest snapshot's metrics and staleness, building the first one synchronously"""
+        self.stats_counters["reads"] += 1
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._first_refresh()
+        staleness = self._staleness(snapshot)
+        if staleness["stale"]:
+            self.stats_counters["stale_reads"] += 1
+            if self._refresh_in_background():
+                staleness["refreshing"] = True
+        return {"metrics": snapshot["metrics"], "snapshot": staleness}
+
+    def fingerprint(self) -> Optional[int]:
+        """Checksum of the vertex and edge counts, identifying the graph data across processes
+
+        None until the first snapshot exists. Never waits on the graph: a
+        missing or stale snapshot is refreshed in the background.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.warm()
+            return None
+        if self._staleness(snapshot)["stale"]:
+            self._refresh_in_background()
+        counts = json.dumps([snapshot["vertex_counts"], snapshot["edge_counts"]], sort_keys=True)
+        return zlib.crc32(counts.encode("utf-8"))
+
+    def warm(self):
+        """Build the first snapshot in the background so the first read does not wait"""
+        if self._snapshot is None:
+            self._refresh_in_background()
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            **self.stats_counters,
+            "max_age": self.max_age,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            **({"snapshot": self._staleness(snapshot), "compute_ms": snapshot["compute_ms"]} if snapshot else {})
+        }
@@ -1,21 +1,107 @@
 import os
+import re
 import json
+import time
+import queue
+import atexit
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+import functools
+import contextvars
+import itertools
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Iterator, AsyncIterator, Awaitable, Tuple, Callable
 from dataclasses import dataclass
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context
 from flask_cors import CORS
 
-# LlamaIndex imports
-from llama_index.core import Settings
-from llama_index.core.tools import FunctionTool
-from llama_index.core.agent import ReActAgent
-from llama_index.llms.azure_openai import AzureOpenAI
-from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
+# LlamaIndex takes seconds to import, so it is imported during startup rather than with this module
+if TYPE_CHECKING:
+    from llama_index.core.tools import FunctionTool
+    from chat_memory import SessionMemory
 
 # TigerGraph imports
-import pyTigerGraph as tg
+from graph_pool import GraphConnectionPool, GraphUnavailable, is_unknown_vertex, iter_keyset
+from graph_cluster import GraphCluster, parse_hosts, set_session, reset_session
+from resilience import CircuitBreaker, is_transient
+from admission import AdmissionController, AdmissionRejected, parse_priorities
+from query_cache import QueryCache, parse_ttls
+from name_index import NameIndex
+from company_directory import CompanyDirectory
+from intent_router import IntentRouter, render_answer
+from session_memory import SessionStore, Session
+from semantic_cache import SemanticCache
+from result_encoder import ResultEncoder, parse_projections
+from influence_scores import InfluenceLeaderboard
+from analytics_snapshot import AnalyticsSnapshot
+from social_snapshot import SocialGraphSnapshot, RELATIONS
+from single_flight import SingleFlight
+from startup import Startup
+from metrics import ChatMetrics, MetricsRegistry, Trace, current_trace, start_trace, set_trace, span
+
+# Set while a streaming chat is running; tools report their progress through it
+_stream_events: contextvars.ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = contextvars.ContextVar(
+    "stream_events", default=None
+)
+
+def _import_modules(names: List[str]):
+    for name in names:
+        importlib.import_module(name)
+
+async def _until(items: AsyncIterator[Any], deadline: float) -> AsyncIterator[Any]:
+    """Items of ``items``, raising TimeoutError once the event loop clock passes ``deadline``"""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            yield await asyncio.wait_for(items.__anext__(), max(0.0, deadline - loop.time()))
+        except StopAsyncIteration:
+            return
+        except asyncio.TimeoutError:
+            raise TimeoutError("The answer did not finish streaming within AGENT_TIMEOUT") from None
+
+_ANSWER_LABEL = "Answer:"
+
+def _strip_answer_label(text: str) -> str:
+    """Drop a leading ReAct "Answer:" label (and anything before it) from streamed text"""
+    head, label, tail = text.partition(_ANSWER_LABEL)
+    return tail.lstrip() if label and len(head) < 200 else text
+
+# How each edge type reads along a path, by whether the edge points forward
+_RELATIONS = {
+    "FRIENDS_WITH": ("is friends with", "is friends with"),
+    "WORKS_AT": ("works at", "employs"),
+    "FOLLOWS": ("follows", "is followed by")
+}
+
+def connection_path(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Turn FindConnections path steps into ordered vertices, each with the relation that led to it"""
+    path = []
+    for step in sorted(steps, key=lambda s: s["position"]):
+        edge = step.get("edge_type", "")
+        if edge.startswith("reverse_"):
+            edge = edge[len("reverse_"):]
+        forward, backward = _RELATIONS.get(edge, (edge.lower(), edge.lower()))
+        path.append({
+            "id": step["node"],
+            "type": step["node_type"],
+            "name": step["label"],
+            "edge": edge,
+            "relation": (forward if step.get("forward") else backward) if edge else ""
+        })
+    return path
+
+def describe_path(path: List[Dict[str, Any]]) -> str:
+    """One-line rendering such as ``John Smith -[works at]-> TechCorp -[employs]-> Sarah Jones``"""
+    parts = [path[0]["name"]] if path else []
+    for node in path[1:]:
+        parts.append(f"-[{node['relation']}]-> {node['name']}")
+    return " ".join(parts)
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode a chat event as a server-sent event"""
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
 
 # Configuration
 @dataclass
@@ -27,11 +113,199 @@ class Config:
     AZURE_DEPLOYMENT_NAME: str = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4")
     AZURE_EMBEDDING_DEPLOYMENT: str = os.getenv("AZURE_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002")
     
-    # TigerGraph
+    # TigerGraph; a comma-separated list of hosts balances reads over a cluster (the first host takes writes)
     TIGERGRAPH_HOST: str = os.getenv("TIGERGRAPH_HOST", "http://localhost")
     TIGERGRAPH_USERNAME: str = os.getenv("TIGERGRAPH_USERNAME", "tigergraph")
     TIGERGRAPH_PASSWORD: str = os.getenv("TIGERGRAPH_PASSWORD", "tigergraph")
     TIGERGRAPH_GRAPH_NAME: str = os.getenv("TIGERGRAPH_GRAPH_NAME", "SocialNetwork")
+    TIGERGRAPH_RESTPP_PORT: str = os.getenv("TIGERGRAPH_RESTPP_PORT", "9000")
+    TIGERGRAPH_SECRET: str = os.getenv("TIGERGRAPH_SECRET", "")
+    TIGERGRAPH_TOKEN_LIFETIME: int = int(os.getenv("TIGERGRAPH_TOKEN_LIFETIME", "86400"))
+    
+    # TigerGraph connection pool
+    TIGERGRAPH_POOL_SIZE: int = int(os.getenv("TIGERGRAPH_POOL_SIZE", "8"))
+    TIGERGRAPH_POOL_TIMEOUT: float = float(os.getenv("TIGERGRAPH_POOL_TIMEOUT", "10"))
+    TIGERGRAPH_QUERY_TIMEOUT: float = float(os.getenv("TIGERGRAPH_QUERY_TIMEOUT", "30"))
+    # Per-query overrides of TIGERGRAPH_QUERY_TIMEOUT in seconds, as Query=seconds,Query=seconds
+    TIGERGRAPH_QUERY_TIMEOUTS: str = os.getenv(
+        "TIGERGRAPH_QUERY_TIMEOUTS", "FindConnections=15,ComputeInfluenceScores=600,RefreshInfluenceScores=120"
+    )
+    
+    # Retries of failed TigerGraph reads (exponential backoff with full jitter, in seconds);
+    # queries that write are never retried
+    GRAPH_RETRY_ATTEMPTS: int = int(os.getenv("GRAPH_RETRY_ATTEMPTS", "3"))
+    GRAPH_RETRY_BASE_DELAY: float = float(os.getenv("GRAPH_RETRY_BASE_DELAY", "0.1"))
+    GRAPH_RETRY_MAX_DELAY: float = float(os.getenv("GRAPH_RETRY_MAX_DELAY", "2"))
+    GRAPH_NO_RETRY_QUERIES: str = os.getenv("GRAPH_NO_RETRY_QUERIES", "ComputeInfluenceScores,RefreshInfluenceScores")
+    
+    # Circuit breakers: open after this many consecutive failures (0 disables), probe again after RESET seconds
+    GRAPH_BREAKER_THRESHOLD: int = int(os.getenv("GRAPH_BREAKER_THRESHOLD", "5"))
+    GRAPH_BREAKER_RESET: float = float(os.getenv("GRAPH_BREAKER_RESET", "30"))
+    LLM_BREAKER_THRESHOLD: int = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+    LLM_BREAKER_RESET: float = float(os.getenv("LLM_BREAKER_RESET", "30"))
+    
+    # LLM timeouts in seconds: each Azure OpenAI request (retried LLM_MAX_RETRIES times by the client),
+    # and a whole agent turn including its tool calls
+    LLM_REQUEST_TIMEOUT: float = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    AGENT_TIMEOUT: float = float(os.getenv("AGENT_TIMEOUT", "120"))
+    
+    # Routing LLM calls between two deployments: "off" (everything on AZURE_DEPLOYMENT_NAME), "tiered" (easy agent
+    # steps on the small deployment; multi-step reasoning, tool errors and failed small calls on the large one),
+    # "small" or "large" (one deployment, still retrying failed small calls on the large one)
+    LLM_ROUTING: str = os.getenv("LLM_ROUTING", "off")
+    AZURE_SMALL_DEPLOYMENT_NAME: str = os.getenv("AZURE_OPENAI_SMALL_DEPLOYMENT", "gpt-4o-mini")
+    AZURE_SMALL_MODEL: str = os.getenv("AZURE_OPENAI_SMALL_MODEL", "gpt-4o-mini")
+    # Tiered routing: agent steps per turn left to the small deployment (1 = pick a tool and answer from its result),
+    # the longest prompt it is sent (estimated tokens), and whether a tool error hands the next step to the large one
+    LLM_SMALL_MAX_STEPS: int = int(os.getenv("LLM_SMALL_MAX_STEPS", "1"))
+    LLM_SMALL_MAX_PROMPT_TOKENS: int = int(os.getenv("LLM_SMALL_MAX_PROMPT_TOKENS", "6000"))
+    LLM_ESCALATE_ON_TOOL_ERROR: bool = os.getenv("LLM_ESCALATE_ON_TOOL_ERROR", "true").lower() == "true"
+    # Small deployment request timeout in seconds (short, since a failed call is retried on the large one), and
+    # consecutive failures after which calls skip it for LLM_BREAKER_RESET seconds
+    LLM_SMALL_REQUEST_TIMEOUT: float = float(os.getenv("LLM_SMALL_REQUEST_TIMEOUT", "15"))
+    LLM_SMALL_BREAKER_THRESHOLD: int = int(os.getenv("LLM_SMALL_BREAKER_THRESHOLD", "3"))
+    # Price per 1K prompt,completion tokens of each deployment, for the cost estimates in /api/stats
+    LLM_SMALL_PRICE: str = os.getenv("LLM_SMALL_PRICE", "0.00015,0.0006")
+    LLM_LARGE_PRICE: str = os.getenv("LLM_LARGE_PRICE", "0.03,0.06")
+    
+    # Installed-query result cache (per-query TTLs in seconds, 0 disables caching)
+    QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+    QUERY_CACHE_DEFAULT_TTL: float = float(os.getenv("QUERY_CACHE_DEFAULT_TTL", "60"))
+    QUERY_CACHE_TTLS: str = os.getenv(
+        "QUERY_CACHE_TTLS",
+        "GetPersonInfo=60,GetCompanyEmployees=120,FindConnections=120,FindTopInfluencers=300,GetNetworkAnalytics=600"
+    )
+    # Seconds an expired result is kept to answer from while TigerGraph is unavailable
+    QUERY_CACHE_STALE_TTL: float = float(os.getenv("QUERY_CACHE_STALE_TTL", "3600"))
+    
+    # Name -> person ID resolver index. Every keyset page rescans the people after its cursor, so a full
+    # rebuild costs about N^2 / (2 * page size) vertex visits: keep pages large and rebuilds rare
+    NAME_INDEX_PAGE_SIZE: int = int(os.getenv("NAME_INDEX_PAGE_SIZE", "20000"))
+    NAME_INDEX_REFRESH_INTERVAL: float = float(os.getenv("NAME_INDEX_REFRESH_INTERVAL", "60"))
+    NAME_INDEX_REBUILD_INTERVAL: float = float(os.getenv("NAME_INDEX_REBUILD_INTERVAL", "86400"))
+    # Seconds before retrying a failed name index build or refresh; doubles per failure up to the refresh interval
+    NAME_INDEX_RETRY_BACKOFF: float = float(os.getenv("NAME_INDEX_RETRY_BACKOFF", "30"))
+    
+    # Vertex listing: rows fetched per GSQL page, and the hard cap on rows handed to the agent
+    LIST_PAGE_SIZE: int = int(os.getenv("LIST_PAGE_SIZE", "500"))
+    LIST_MAX_ROWS: int = int(os.getenv("LIST_MAX_ROWS", "50"))
+    # Rows per GSQL page for /api/export, which walks the whole listing (same rescan cost as above)
+    EXPORT_PAGE_SIZE: int = int(os.getenv("EXPORT_PAGE_SIZE", "10000"))
+    
+    # Employee pages: deepest row get_company_employees pages to (the query holds offset + limit rows)
+    COMPANY_EMPLOYEES_MAX_OFFSET: int = int(os.getenv("COMPANY_EMPLOYEES_MAX_OFFSET", "1000"))
+    
+    # Several TigerGraph hosts: seconds a host that failed a request is left out before it is tried again,
+    # seconds between echo health checks of every host (0 disables them), and whether each chat session
+    # reads from one host so its turns see the same data
+    GRAPH_HOST_RECHECK_INTERVAL: float = float(os.getenv("GRAPH_HOST_RECHECK_INTERVAL", "10"))
+    GRAPH_HEALTH_INTERVAL: float = float(os.getenv("GRAPH_HEALTH_INTERVAL", "10"))
+    GRAPH_SESSION_PINNING: bool = os.getenv("GRAPH_SESSION_PINNING", "true").lower() == "true"
+    
+    # Upper bound on the max_hops the agent may ask FindConnections for
+    PATH_MAX_HOPS: int = int(os.getenv("PATH_MAX_HOPS", "6"))
+    
+    # Async request path: blocking graph calls run on a bounded executor instead of the event loop
+    ASYNC_GRAPH_CALLS: bool = os.getenv("ASYNC_GRAPH_CALLS", "true").lower() == "true"
+    GRAPH_EXECUTOR_WORKERS: int = int(os.getenv("GRAPH_EXECUTOR_WORKERS", os.getenv("TIGERGRAPH_POOL_SIZE", "8")))
+    MAX_CONCURRENT_CHATS: int = int(os.getenv("MAX_CONCURRENT_CHATS", "64"))
+    
+    # Admission control for /api/chat and /api/chat/stream: chats beyond MAX_CONCURRENT_CHATS wait, for up
+    # to ADMISSION_MAX_WAIT seconds, in a queue of ADMISSION_MAX_QUEUE ordered by priority class and arrival
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "256"))
+    ADMISSION_MAX_WAIT: float = float(os.getenv("ADMISSION_MAX_WAIT", "10"))
+    # Priority classes, highest first; a request picks one with the X-Priority header or "priority" in the
+    # body (the web UI sends "interactive"), anything else gets ADMISSION_DEFAULT_PRIORITY
+    ADMISSION_PRIORITIES: str = os.getenv("ADMISSION_PRIORITIES", "interactive,batch")
+    ADMISSION_DEFAULT_PRIORITY: str = os.getenv("ADMISSION_DEFAULT_PRIORITY", "batch")
+    # Slots of MAX_CONCURRENT_CHATS that only the highest class may use
+    ADMISSION_RESERVED_SLOTS: int = int(os.getenv("ADMISSION_RESERVED_SLOTS", "0"))
+    # Token bucket per client (the X-Client-ID header, else the remote address): chats per second and
+    # burst size. Off (0) by default: behind a proxy or NAT every user without an X-Client-ID shares a bucket
+    ADMISSION_CLIENT_RATE: float = float(os.getenv("ADMISSION_CLIENT_RATE", "0"))
+    ADMISSION_CLIENT_BURST: int = int(os.getenv("ADMISSION_CLIENT_BURST", "10"))
+    AGENT_VERBOSE: bool = os.getenv("AGENT_VERBOSE", "true").lower() == "true"
+    
+    # Agent style: "react" (one tool per LLM round trip) or "function_calling", where the model can
+    # request several tools in one turn and they run concurrently on the graph executor
+    AGENT_MODE: str = os.getenv("AGENT_MODE", "react")
+    AGENT_PARALLEL_TOOL_CALLS: bool = os.getenv("AGENT_PARALLEL_TOOL_CALLS", "true").lower() == "true"
+    AGENT_MAX_FUNCTION_CALLS: int = int(os.getenv("AGENT_MAX_FUNCTION_CALLS", "10"))
+    # ReAct reasoning steps per turn; every tool call takes two (action and observation)
+    AGENT_MAX_ITERATIONS: int = int(os.getenv("AGENT_MAX_ITERATIONS", "10"))
+    
+    # Share one in-flight graph query (and, for async callers, one tool call) among identical concurrent requests
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    
+    # Most person IDs get_people_info looks up in one call
+    PEOPLE_INFO_MAX_IDS: int = int(os.getenv("PEOPLE_INFO_MAX_IDS", "25"))
+    
+    # Deterministic fast path for common intents (falls back to the agent below the confidence threshold)
+    FAST_PATH_ENABLED: bool = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+    FAST_PATH_MIN_CONFIDENCE: float = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.65"))
+    FAST_PATH_MAX_COMPANIES: int = int(os.getenv("FAST_PATH_MAX_COMPANIES", "10000"))
+    
+    # Per-session conversation memory (token budget per session, idle eviction in seconds)
+    SESSION_MEMORY_TOKENS: int = int(os.getenv("SESSION_MEMORY_TOKENS", "1500"))
+    SESSION_IDLE_TTL: float = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+    SESSION_MAX: int = int(os.getenv("SESSION_MAX", "1000"))
+    SESSION_SUMMARIZE: bool = os.getenv("SESSION_SUMMARIZE", "true").lower() == "true"
+    
+    # Tool results as the LLM sees them: json, compact, columnar or table; rows per list; fields kept per tool
+    TOOL_RESULT_FORMAT: str = os.getenv("TOOL_RESULT_FORMAT", "table")
+    TOOL_RESULT_MAX_ROWS: int = int(os.getenv("TOOL_RESULT_MAX_ROWS", "25"))
+    TOOL_RESULT_FIELDS: str = os.getenv(
+        "TOOL_RESULT_FIELDS",
+        "get_company_employees=person_id,full_name,job_title,department,salary;get_network_analytics=metric_name,value"
+    )
+    
+    # Semantic answer cache for first-turn questions (cosine similarity of question embeddings)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_SIZE: int = int(os.getenv("SEMANTIC_CACHE_SIZE", "1000"))
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_TTL: float = float(os.getenv("SEMANTIC_CACHE_TTL", "86400"))
+    SEMANTIC_CACHE_PATH: str = os.getenv("SEMANTIC_CACHE_PATH", "semantic_cache.npz")
+    SEMANTIC_CACHE_SAVE_INTERVAL: float = float(os.getenv("SEMANTIC_CACHE_SAVE_INTERVAL", "60"))
+    
+    # Precomputed influencer leaderboard read by FindTopInfluencers
+    INFLUENCE_REFRESH_ENABLED: bool = os.getenv("INFLUENCE_REFRESH_ENABLED", "true").lower() == "true"
+    INFLUENCE_BOARD_SIZE: int = int(os.getenv("INFLUENCE_BOARD_SIZE", "1000"))
+    INFLUENCE_REFRESH_INTERVAL: float = float(os.getenv("INFLUENCE_REFRESH_INTERVAL", "3600"))
+    INFLUENCE_CHECK_INTERVAL: float = float(os.getenv("INFLUENCE_CHECK_INTERVAL", "30"))
+    INFLUENCE_BATCH_SIZE: int = int(os.getenv("INFLUENCE_BATCH_SIZE", "500"))
+    INFLUENCE_PAGERANK: bool = os.getenv("INFLUENCE_PAGERANK", "true").lower() == "true"
+    
+    # Network analytics snapshot built from the REST++ vertex/edge statistics (seconds before it is refreshed)
+    ANALYTICS_MAX_AGE: float = float(os.getenv("ANALYTICS_MAX_AGE", "300"))
+    # Seconds before retrying a failed analytics refresh; doubles per failure up to ANALYTICS_MAX_AGE
+    ANALYTICS_RETRY_BACKOFF: float = float(os.getenv("ANALYTICS_RETRY_BACKOFF", "30"))
+    
+    # Local CSR snapshot of Person friendships and follows behind the mutual-friend, friend-suggestion
+    # and ego-network tools; saved under GRAPH_SNAPSHOT_PATH (empty disables) and memory-mapped on restart
+    GRAPH_SNAPSHOT_ENABLED: bool = os.getenv("GRAPH_SNAPSHOT_ENABLED", "false").lower() == "true"
+    GRAPH_SNAPSHOT_PATH: str = os.getenv("GRAPH_SNAPSHOT_PATH", "social_snapshot")
+    GRAPH_SNAPSHOT_PAGE_SIZE: int = int(os.getenv("GRAPH_SNAPSHOT_PAGE_SIZE", "5000"))
+    GRAPH_SNAPSHOT_REFRESH_INTERVAL: float = float(os.getenv("GRAPH_SNAPSHOT_REFRESH_INTERVAL", "300"))
+    GRAPH_SNAPSHOT_REBUILD_INTERVAL: float = float(os.getenv("GRAPH_SNAPSHOT_REBUILD_INTERVAL", "86400"))
+    GRAPH_SNAPSHOT_MAX_HOPS: int = int(os.getenv("GRAPH_SNAPSHOT_MAX_HOPS", "3"))
+    # Seconds before retrying a failed snapshot refresh; doubles per failure up to the refresh interval
+    GRAPH_SNAPSHOT_RETRY_BACKOFF: float = float(os.getenv("GRAPH_SNAPSHOT_RETRY_BACKOFF", "30"))
+    
+    # Request tracing: return the span breakdown with every chat (otherwise only when asked for),
+    # and log the breakdown of chats slower than this many milliseconds (0 disables)
+    TRACE_RESPONSES: bool = os.getenv("TRACE_RESPONSES", "false").lower() == "true"
+    TRACE_SLOW_CHAT_MS: float = float(os.getenv("TRACE_SLOW_CHAT_MS", "10000"))
+    
+    # Startup: finish it in the background while the server already answers (/ready reports progress),
+    # and warm the name index, caches and installed queries before reporting ready
+    STARTUP_IN_BACKGROUND: bool = os.getenv("STARTUP_IN_BACKGROUND", "false").lower() == "true"
+    STARTUP_WARMUP: bool = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+
+# LlamaIndex modules loaded by the startup "imports" step; the Azure ones only when no LLM/embedding model is passed in
+AGENT_MODULES = ("llama_index.core", "llama_index.core.tools", "llama_index.core.agent", "chat_memory", "llm_telemetry")
+AZURE_LLM_MODULE = "llama_index.llms.azure_openai"
+AZURE_EMBEDDING_MODULE = "llama_index.embeddings.azure_openai"
 
 config = Config()
 
@@ -39,7 +313,56 @@ class TigerGraphChatbot:
     def __init__(self):
         self.setup_logging()
         self.tg_conn = None
-        self.agent = None
+        self.llm = None
+        self.llm_router = None
+        self.startup = Startup()
+        self.agent_mode = config.AGENT_MODE
+        self.graph_executor = ThreadPoolExecutor(
+            max_workers=config.GRAPH_EXECUTOR_WORKERS,
+            thread_name_prefix="tigergraph"
+        )
+        self.query_cache = QueryCache(
+            max_entries=config.QUERY_CACHE_SIZE,
+            default_ttl=config.QUERY_CACHE_DEFAULT_TTL,
+            ttls=parse_ttls(config.QUERY_CACHE_TTLS),
+            stale_ttl=config.QUERY_CACHE_STALE_TTL
+        )
+        self.llm_breaker = CircuitBreaker("llm", config.LLM_BREAKER_THRESHOLD, config.LLM_BREAKER_RESET)
+        self.query_flights = SingleFlight(on_coalesce=lambda name: self.metrics.coalesced.inc(layer="query", name=name))
+        self.tool_flights = SingleFlight(on_coalesce=lambda name: self.metrics.coalesced.inc(layer="tool", name=name))
+        self.name_index = NameIndex(
+            self._load_person_directory,
+            page_size=config.NAME_INDEX_PAGE_SIZE,
+            refresh_interval=config.NAME_INDEX_REFRESH_INTERVAL,
+            rebuild_interval=config.NAME_INDEX_REBUILD_INTERVAL,
+            retry_backoff=config.NAME_INDEX_RETRY_BACKOFF
+        )
+        self.companies = CompanyDirectory(lambda: self.iter_vertices("ListCompanies", "@@companies"))
+        self.influence = InfluenceLeaderboard(
+            lambda name, params: self.tg_conn.runInstalledQuery(name, params),
+            board_size=config.INFLUENCE_BOARD_SIZE,
+            refresh_interval=config.INFLUENCE_REFRESH_INTERVAL,
+            batch_size=config.INFLUENCE_BATCH_SIZE,
+            with_pagerank=config.INFLUENCE_PAGERANK,
+            check_interval=config.INFLUENCE_CHECK_INTERVAL,
+            on_update=lambda: self.query_cache.invalidate("FindTopInfluencers")
+        )
+        self.analytics = AnalyticsSnapshot(
+            lambda: self.tg_conn.getVertexCount("*"),
+            lambda: self.tg_conn.getEdgeCount("*"),
+            max_age=config.ANALYTICS_MAX_AGE,
+            retry_backoff=config.ANALYTICS_RETRY_BACKOFF
+        )
+        self.social_graph = SocialGraphSnapshot(
+            self._load_social_adjacency,
+            self._load_people_adjacency,
+            page_size=config.GRAPH_SNAPSHOT_PAGE_SIZE,
+            path=config.GRAPH_SNAPSHOT_PATH,
+            refresh_interval=config.GRAPH_SNAPSHOT_REFRESH_INTERVAL,
+            rebuild_interval=config.GRAPH_SNAPSHOT_REBUILD_INTERVAL,
+            max_hops=config.GRAPH_SNAPSHOT_MAX_HOPS,
+            retry_backoff=config.GRAPH_SNAPSHOT_RETRY_BACKOFF
+        )
         self.query_descriptions = {
             "GetPersonInfo": {
                 "description": "Get detailed information about a specific person including their job, company, and location",
@@ -50,6 +373,14 @@ class TigerGraphChatbot:
                     "Show me details for person_005"
                 ]
             },
+            "GetPeopleInfo": {
+                "description": "Get the same details for several people in one query",
+                "parameters": ["person_ids"],
+                "example_questions": [
+                    "Compare person_001, person_002 and person_003",
+                    "What do person_004 and person_007 do?"
+                ]
+            },
             "FindConnections": {
                 "description": "Find how two people are connected through friendships or work relationships",
                 "parameters": ["source_person", "target_person", "max_hops (optional)"],
@@ -60,8 +391,8 @@ class TigerGraphChatbot:
                 ]
             },
             "GetCompanyEmployees": {
-                "description": "Get all employees working at a specific company, optionally filtered by department",
-                "parameters": ["company_name", "department (optional)"],
+                "description": "Get employees working at a specific company by salary, one page at a time, optionally filtered by department, or just their number",
+                "parameters": ["company_name", "department (optional)", "page (optional)", "limit (optional)", "count_only (optional)"],
                 "example_questions": [
                     "Who works at TechCorp?",
                     "Show me all employees at DataSystems",
@@ -88,83 +419,580 @@ class TigerGraphChatbot:
             }
         }
     
+        self.tools: Dict[str, "FunctionTool"] = {}
+        self.tool_functions: Dict[str, Callable[..., Dict[str, Any]]] = {}
+        self.result_encoder = ResultEncoder(
+            format=config.TOOL_RESULT_FORMAT,
+            max_rows=config.TOOL_RESULT_MAX_ROWS,
+            projections=parse_projections(config.TOOL_RESULT_FIELDS)
+        )
+        self._tool_call_ids = itertools.count(1)
+        self.router = IntentRouter(self.query_descriptions, min_confidence=config.FAST_PATH_MIN_CONFIDENCE)
+        self.sessions = SessionStore(
+            self._create_agent,
+            memory_tokens=config.SESSION_MEMORY_TOKENS,
+            idle_ttl=config.SESSION_IDLE_TTL,
+            max_sessions=config.SESSION_MAX
+        )
+        self.semantic_cache = SemanticCache(
+            capacity=config.SEMANTIC_CACHE_SIZE,
+            threshold=config.SEMANTIC_CACHE_THRESHOLD,
+            ttl=config.SEMANTIC_CACHE_TTL,
+            path=config.SEMANTIC_CACHE_PATH,
+            save_interval=config.SEMANTIC_CACHE_SAVE_INTERVAL,
+            # Taken from the graph, not a local counter, so every worker sharing the cache file agrees on it
+            version_source=self.analytics.fingerprint
+        )
+        atexit.register(self.semantic_cache.save)
+        self.metrics = ChatMetrics()
+        self.admission = AdmissionController(
+            config.MAX_CONCURRENT_CHATS,
+            max_queue=config.ADMISSION_MAX_QUEUE,
+            max_wait=config.ADMISSION_MAX_WAIT,
+            priorities=parse_priorities(config.ADMISSION_PRIORITIES),
+            default_priority=config.ADMISSION_DEFAULT_PRIORITY,
+            reserved=config.ADMISSION_RESERVED_SLOTS,
+            client_rate=config.ADMISSION_CLIENT_RATE,
+            client_burst=config.ADMISSION_CLIENT_BURST,
+            observer=self.metrics.observe_admission
+        )
+        self.metrics.add_queue_depths(self.admission.queue_depths)
+        for component, stats in (
+            ("pool", lambda: self.tg_conn.stats() if self.tg_conn else None),
+            ("query_cache", self.query_cache.stats),
+            ("name_index", self.name_index.stats),
+            ("companies", self.companies.stats),
+            ("router", self.router.stats),
+            ("sessions", self.sessions.stats),
+            ("semantic_cache", self.semantic_cache.stats),
+            ("tool_results", self.result_encoder.stats),
+            ("query_flights", self.query_flights.stats),
+            ("tool_flights", self.tool_flights.stats),
+            ("influence", self.influence.stats),
+            ("analytics", self.analytics.stats),
+            ("social_graph", self.social_graph.stats),
+            ("startup", lambda: self.startup.stats()),
+            ("graph_breaker", lambda: self.tg_conn.breaker.stats() if self.tg_conn and self.tg_conn.breaker else None),
+            ("llm_breaker", self.llm_breaker.stats),
+            ("llm_routing", lambda: self.llm_router.stats() if self.llm_router else None),
+            ("admission", self.admission.stats)
+        ):
+            self.metrics.add_stats(component, stats)
+    
+    @property
+    def ready(self) -> bool:
+        """Whether every required startup step has finished, so chats can be answered"""
+        return self.startup.ready
+    
     def setup_logging(self):
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
-    async def initialize(self):
-        """Initialize TigerGraph connection and LlamaIndex components"""
-        try:
-            # Initialize TigerGraph connection
-            self.tg_conn = tg.TigerGraphConnection(
-                host=config.TIGERGRAPH_HOST,
-                username=config.TIGERGRAPH_USERNAME,
-                password=config.TIGERGRAPH_PASSWORD,
-                graphname=config.TIGERGRAPH_GRAPH_NAME
-            )
-            
-            # Test the connection
-            self.logger.info("Testing TigerGraph connection...")
-            result = self.tg_conn.echo()
-            self.logger.info(f"TigerGraph connection successful: {result}")
-            
-            # Initialize Azure OpenAI
+    async def initialize(self, llm=None, embed_model=None, small_llm=None):
+        """Initialize TigerGraph connection and LlamaIndex components
+        
+        ``llm`` and ``embed_model`` override the Azure OpenAI deployments, e.g. with stubs for benchmarks;
+        with LLM_ROUTING on, ``llm`` stands in for the large deployment and ``small_llm`` for the small one.
+        Independent steps run concurrently (see ``Startup``); ``self.startup.status()`` reports their
+        progress and timings. Raises if a step the chatbot cannot work without fails.
+        """
+        startup = self.startup = Startup()
+        routing = config.LLM_ROUTING != "off"
+        modules = list(AGENT_MODULES)
+        if routing:
+            modules.append("llm_router")
+        if llm is None or (routing and small_llm is None):
+            modules.append(AZURE_LLM_MODULE)
+        if config.SEMANTIC_CACHE_ENABLED and embed_model is None:
+            modules.append(AZURE_EMBEDDING_MODULE)
+        
+        # Imports run on one thread, in order; everything that needs LlamaIndex waits for them
+        startup.add("imports", functools.partial(_import_modules, modules))
+        startup.add("graph", self._connect_graph)
+        startup.add("llm", functools.partial(self._init_llm, llm, small_llm), requires=("imports",))
+        if config.SEMANTIC_CACHE_ENABLED:
+            startup.add("semantic_cache", functools.partial(self._init_semantic_cache, embed_model), requires=("imports",))
+        startup.add("tools", self._init_tools, requires=("imports",))
+        startup.add("agent", self._init_agent, requires=("llm", "tools"))
+        
+        # Useful but not required to answer: these only log a warning when they fail
+        startup.add("router", self._load_router_companies, requires=("graph",), critical=False)
+        if config.INFLUENCE_REFRESH_ENABLED:
+            startup.add("influence", self.influence.start, requires=("graph",), critical=False)
+        if config.STARTUP_WARMUP:
+            startup.add("analytics", self.analytics.refresh, requires=("graph",), critical=False)
+            startup.add("name_index", self.name_index.ensure_fresh, requires=("graph",), critical=False)
+            if config.GRAPH_SNAPSHOT_ENABLED:
+                startup.add("social_graph", self.social_graph.ensure_fresh, requires=("graph",), critical=False)
+            startup.add("query_plans", self._prime_queries, requires=("graph",), critical=False)
+        else:
+            startup.add("analytics", self.analytics.warm, requires=("graph",), critical=False)
+        
+        if not await startup.run():
+            message = f"Failed to initialize chatbot: {'; '.join(startup.failures())}"
+            self.logger.error(message)
+            raise RuntimeError(message)
+        self.logger.info(f"TigerGraph Chatbot initialized successfully in {startup.stats()['elapsed_ms']:.0f} ms!")
+    
+    def _connect_graph(self):
+        # Initialize the pooled TigerGraph connections shared by all requests and tools
+        timeouts = parse_ttls(config.TIGERGRAPH_QUERY_TIMEOUTS)
+        if len(parse_hosts(config.TIGERGRAPH_HOST)) > 1:
+            self.tg_conn = GraphCluster.from_config(config, timeouts=timeouts)
+            self.tg_conn.host_observer = self.metrics.observe_graph_host
+            self.tg_conn.check_health()
+            self.tg_conn.start()
+            self.logger.info(f"Balancing TigerGraph reads over {len(self.tg_conn.hosts)} hosts")
+        else:
+            self.tg_conn = GraphConnectionPool.from_config(config, timeouts=timeouts)
+        self.tg_conn.observer = self.metrics.observe_graph
+        
+        # Test the connection
+        self.logger.info("Testing TigerGraph connection...")
+        result = self.tg_conn.echo()
+        self.logger.info(f"TigerGraph connection successful: {result}")
+    
+    def _init_llm(self, llm=None, small_llm=None):
+        from llama_index.core import Settings
+        
+        # Initialize Azure OpenAI
+        if llm is None:
+            from llama_index.llms.azure_openai import AzureOpenAI
             llm = AzureOpenAI(
                 model="gpt-4",
                 deployment_name=config.AZURE_DEPLOYMENT_NAME,
                 api_key=config.AZURE_OPENAI_KEY,
                 azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
                 api_version=config.AZURE_OPENAI_VERSION,
-                temperature=0.1
+                temperature=0.1,
+                timeout=config.LLM_REQUEST_TIMEOUT,
+                max_retries=config.LLM_MAX_RETRIES
             )
-            
-            # Set global settings
-            Settings.llm = llm
-            
-            # Create tools and agent
-            tools = self._create_tools()
-            self.agent = ReActAgent.from_tools(
-                tools=tools,
-                llm=llm,
-                verbose=True,
-                system_prompt=self._get_system_prompt()
+        if config.LLM_ROUTING != "off":
+            llm = self._route_llm(llm, small_llm)
+        
+        # Set global settings
+        Settings.llm = llm
+        
+        # Time LLM calls and count agent steps; agents share the LLM's callback manager
+        # (which setting Settings.llm may have replaced with the global one)
+        llm.callback_manager.add_handler(self.metrics.llm_handler())
+        self.llm = llm
+    
+    def _route_llm(self, large, small=None):
+        """Wrap ``large`` and the small deployment in a RoutedLLM following the LLM_ROUTING policy"""
+        from llm_router import RoutedLLM, RoutingPolicy, parse_prices
+        if small is None:
+            from llama_index.llms.azure_openai import AzureOpenAI
+            small = AzureOpenAI(
+                model=config.AZURE_SMALL_MODEL,
+                deployment_name=config.AZURE_SMALL_DEPLOYMENT_NAME,
+                api_key=config.AZURE_OPENAI_KEY,
+                azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
+                api_version=config.AZURE_OPENAI_VERSION,
+                temperature=0.1,
+                timeout=config.LLM_SMALL_REQUEST_TIMEOUT,
+                # No client retries: the large deployment is the retry
+                max_retries=0
             )
-            
-            self.logger.info("TigerGraph Chatbot initialized successfully!")
-            
+        policy = RoutingPolicy(
+            mode=config.LLM_ROUTING,
+            small_max_steps=config.LLM_SMALL_MAX_STEPS,
+            small_max_prompt_tokens=config.LLM_SMALL_MAX_PROMPT_TOKENS,
+            escalate_on_tool_error=config.LLM_ESCALATE_ON_TOOL_ERROR
+        )
+        router = RoutedLLM(
+            small=small,
+            large=large,
+            policy=policy,
+            small_name=getattr(small, "engine", None) or small.metadata.model_name,
+            large_name=getattr(large, "engine", None) or large.metadata.model_name,
+            prices={"small": parse_prices(config.LLM_SMALL_PRICE), "large": parse_prices(config.LLM_LARGE_PRICE)},
+            observer=self.metrics.observe_llm_route,
+            breaker_threshold=config.LLM_SMALL_BREAKER_THRESHOLD,
+            breaker_reset=config.LLM_BREAKER_RESET
+        )
+        self.logger.info(f"LLM routing: {policy.mode} between {router.small_name} and {router.large_name}")
+        self.llm_router = router
+        return router
+    
+    def _init_semantic_cache(self, embed_model=None):
+        # Question embeddings for the semantic answer cache
+        from llama_index.core import Settings
+        if embed_model is None:
+            from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
+            embed_model = AzureOpenAIEmbedding(
+                model="text-embedding-ada-002",
+                deployment_name=config.AZURE_EMBEDDING_DEPLOYMENT,
+                api_key=config.AZURE_OPENAI_KEY,
+                azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
+                api_version=config.AZURE_OPENAI_VERSION
+            )
+        Settings.embed_model = embed_model
+        self.semantic_cache.embed_model = embed_model
+        loaded = self.semantic_cache.load()
+        self.logger.info(f"Semantic cache enabled ({loaded} answer(s) loaded)")
+    
+    def _init_tools(self):
+        # Create tools; agents are created per session, each with its own memory
+        tools = self._create_tools()
+        self.tools = {tool.metadata.name: tool for tool in tools}
+        # Load the tokenizer now rather than on the first tool result
+        self.result_encoder.count_tokens("warm up")
+    
+    def _init_agent(self):
+        from chat_memory import SessionMemory
+        llm = self.llm
+        agent_mode = config.AGENT_MODE
+        if agent_mode == "function_calling" and not llm.metadata.is_function_calling_model:
+            self.logger.warning("AGENT_MODE=function_calling needs a function-calling model; using the ReAct agent")
+            agent_mode = "react"
+        self.logger.info(f"Agent mode: {agent_mode}")
+        self.sessions.summarizer_llm = llm if config.SESSION_SUMMARIZE else None
+        self.agent_mode = agent_mode
+        # Build one throwaway agent so a broken agent setup fails startup instead of the first chat
+        self._create_agent(SessionMemory.from_defaults(llm=None, token_limit=config.SESSION_MEMORY_TOKENS))
+    
+    def _prime_queries(self):
+        """Run each installed query the tools use once, so none is cold on the first chat"""
+        people = [person["id"] for person in itertools.islice(self.iter_vertices("ListPeople", "@@people"), 2)]
+        companies = [company["id"] for company in itertools.islice(self.iter_vertices("ListCompanies", "@@companies"), 1)]
+        calls = [("FindTopInfluencers", {"limit_count": 10})]
+        if people:
+            calls += [
+                ("GetPersonInfo", {"person_id": people[0]}),
+                ("GetPeopleInfo", {"person_ids": people}),
+                ("FindConnections", {"source_person": people[0], "target_person": people[-1], "max_hops": 3})
+            ]
+        if companies:
+            calls.append(("GetCompanyEmployees", self._employee_params(companies[0])))
+        for query_name, params in calls:
+            # Through the result cache, so the common default lookups are answered from it straight away
+            self._run_query(query_name, params)
+    
+    @staticmethod
+    def _employee_params(company_id: str, department: str = "", limit: int = 20, offset: int = 0,
+                         count_only: bool = False) -> Dict[str, Any]:
+        """GetCompanyEmployees parameters; the tool and query priming share them so they share cache entries"""
+        return {"company": company_id, "department": department, "page_size": limit, "offset": offset,
+                "count_only": count_only}
+    
+    def _create_agent(self, memory: "SessionMemory") -> Any:
+        """Build the agent for one session around that session's memory"""
+        from llama_index.core.agent import ReActAgent, FunctionCallingAgentWorker
+        if self.agent_mode == "function_calling":
+            return FunctionCallingAgentWorker.from_tools(
+                tools=list(self.tools.values()),
+                llm=self.llm,
+                verbose=config.AGENT_VERBOSE,
+                system_prompt=self._get_system_prompt(),
+                allow_parallel_tool_calls=config.AGENT_PARALLEL_TOOL_CALLS,
+                max_function_calls=config.AGENT_MAX_FUNCTION_CALLS
+            ).as_agent(memory=memory)
+        return ReActAgent.from_tools(
+            tools=list(self.tools.values()),
+            llm=self.llm,
+            memory=memory,
+            verbose=config.AGENT_VERBOSE,
+            system_prompt=self._get_system_prompt(),
+            max_iterations=config.AGENT_MAX_ITERATIONS
+        )
+    
+    async def _call_agent(self, start: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``start()`` (an agent turn) under AGENT_TIMEOUT and the LLM circuit breaker"""
+        if not self.llm_breaker.allow():
+            raise RuntimeError("The language model is unavailable after repeated failures; please try again shortly")
+        try:
+            result = await asyncio.wait_for(start(), config.AGENT_TIMEOUT or None)
+        except asyncio.TimeoutError:
+            self.llm_breaker.record_failure()
+            raise TimeoutError(f"No answer within {config.AGENT_TIMEOUT:.0f}s")
         except Exception as e:
-            self.logger.error(f"Failed to initialize chatbot: {e}")
+            # Only outages count against the breaker; e.g. hitting the iteration limit does not
+            if is_transient(e):
+                self.llm_breaker.record_failure()
+            else:
+                self.llm_breaker.record_success()
             raise
+        self.llm_breaker.record_success()
+        return result
+    
+    async def _finish_turn(self, session: Session):
+        """Compact the session's memory off the event loop; summarizing may call the LLM"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.sessions.finish_turn, session)
+    
+    def _cache_signature(self, user_message: str) -> str:
+        """Entities a cached answer must share with the question it is reused for"""
+        if self.name_index.ready:
+            names = self.name_index.name_tokens(user_message)
+        else:
+            # Until the name index is built, treat capitalised words not starting a sentence as possible names
+            names = sorted({word.lower() for word in re.findall(r"(?<=[^.?!\s]\s)[A-Z][a-z]+\b", user_message)})
+        return self.router.entity_signature(user_message) + "|" + ",".join(names)
+    
+    async def _semantic_lookup(self, session: Session, user_message: str) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """Cached answer for a question, plus its embedding for storing the answer on a miss
+        
+        Only a session's first question is looked up: later ones may depend on the
+        conversation so far, which the cached answer knows nothing about.
+        """
+        if not self.semantic_cache.enabled or session.turns:
+            return None, None
+        try:
+            vector = await self.semantic_cache.aembed(user_message)
+        except Exception as e:
+            self.logger.warning(f"Question embedding failed, skipping the semantic cache: {e}")
+            self.semantic_cache.record_embed_error()
+            return None, None
+        return self.semantic_cache.lookup(vector, self._cache_signature(user_message)), vector
+    
+    async def _semantic_store(self, vector: Any, user_message: str, answer: str, trace: Trace):
+        """Cache an agent answer, unless a tool failed or served stale data while writing it
+        
+        Such an answer (e.g. "TigerGraph is unavailable") would otherwise be replayed to
+        every similar first question until the TTL runs out.
+        """
+        if vector is None:
+            return
+        if trace.counts.get("tool_errors") or trace.counts.get("stale_results"):
+            self.semantic_cache.record_skipped_store()
+            return
+        self.semantic_cache.store(vector, user_message, answer, self._cache_signature(user_message))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.semantic_cache.maybe_save)
+    
+    def _coalesced(self, query_name: str, params: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run an installed query, joining an identical one already in flight"""
+        def load() -> List[Dict[str, Any]]:
+            return self.tg_conn.runInstalledQuery(query_name, params)
+        
+        if not config.SINGLE_FLIGHT_ENABLED:
+            return load()
+        return self.query_flights.do(QueryCache.make_key(query_name, params), load)
+    
+    def _run_query(self, query_name: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run an installed query through the result cache; concurrent misses share one request
+        
+        While TigerGraph is unavailable, a recently expired result is served instead of the error.
+        """
+        try:
+            return self.query_cache.get_or_load(query_name, params, lambda: self._coalesced(query_name, params))
+        except Exception as e:
+            if not (isinstance(e, GraphUnavailable) or is_transient(e)):
+                raise
+            hit, value = self.query_cache.get_stale(query_name, params)
+            if not hit:
+                raise
+            self.logger.warning(f"Serving a stale {query_name} result: {e}")
+            trace = current_trace()
+            if trace is not None:
+                trace.count("stale_results")
+            return value
+    
+    def _load_people_info(self, params_list: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Fetch several people with one GetPeopleInfo query, split into per-person GetPersonInfo results"""
+        ids = [params["person_id"] for params in params_list]
+        result = self._coalesced("GetPeopleInfo", {"person_ids": ids})
+        rows = {row["id"]: row for row in (result[0]["@@result"] if result else [])}
+        return [[{"@@result": [rows[person_id]] if person_id in rows else []}] for person_id in ids]
+    
+    def _load_person_directory(self, after_id: str, page_size: int) -> List[Dict[str, Any]]:
+        """Fetch one keyset page of the person directory for the name index (bypasses the cache)"""
+        result = self.tg_conn.runInstalledQuery("PersonDirectory", {"after_id": after_id, "page_size": page_size})
+        return result[0]["@@entries"] if result else []
+    
+    def _load_social_adjacency(self, after_id: str, page_size: int) -> List[Dict[str, Any]]:
+        """Fetch one keyset page of friend and follow lists for the social graph snapshot (bypasses the cache)"""
+        result = self.tg_conn.runInstalledQuery("SocialAdjacency", {"after_id": after_id, "page_size": page_size})
+        # A printed vertex set comes back unordered; keyset paging needs the page sorted by ID
+        return sorted((row["attributes"] for row in (result[0]["people"] if result else [])), key=lambda row: row["id"])
+    
+    def _load_people_adjacency(self, person_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch the friend and follow lists of people whose edges changed (POSTed: the ID list can be long)"""
+        result = self.tg_conn.runInstalledQuery("PeopleAdjacency", {"person_ids": person_ids}, usePost=True)
+        return [row["attributes"] for row in (result[0]["people"] if result else [])]
+    
+    def iter_vertices(self, query_name: str, result_key: str, after_id: str = "",
+                      page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream rows of a keyset-paginated listing query without materializing the vertex set"""
+        def fetch_page(cursor: str, size: int) -> List[Dict[str, Any]]:
+            result = self.tg_conn.runInstalledQuery(query_name, {"after_id": cursor, "page_size": size})
+            return result[0][result_key] if result else []
+        
+        return iter_keyset(fetch_page, page_size or config.LIST_PAGE_SIZE, after_id)
+    
+    def _list_page(self, query_name: str, result_key: str, limit: int, after_id: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return at most ``limit`` rows (hard-capped by LIST_MAX_ROWS) and the cursor for the next page"""
+        limit = max(1, min(int(limit), config.LIST_MAX_ROWS))
+        # Fetch one extra row to know whether another page exists
+        rows = list(itertools.islice(
+            self.iter_vertices(query_name, result_key, after_id, page_size=min(limit + 1, config.LIST_PAGE_SIZE)),
+            limit + 1
+        ))
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return rows[:limit], next_cursor
+    
+    def invalidate_cache(self, query_name: Optional[str] = None) -> int:
+        """Drop cached query results; call after loading new data into the graph"""
+        removed = self.query_cache.invalidate(query_name)
+        self.semantic_cache.mark_stale()
+        if query_name is None:
+            self.name_index.mark_stale()
+            self.companies.mark_stale()
+            self.influence.mark_stale()
+            self.analytics.mark_stale()
+            self.social_graph.mark_stale()
+        self.logger.info(f"Invalidated {removed} cached result(s) for {query_name or 'all queries'}")
+        return removed
+    
+    def _encode_result(self, name: str, payload: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        """Encode a tool payload for the LLM and log what it cost in tokens"""
+        text, report = self.result_encoder.encode(name, payload)
+        self.metrics.observe_tool_result(name, len(text.encode("utf-8")), report["tokens"])
+        self.logger.info(
+            f"Tool {name} result: {report['tokens']} tokens as {self.result_encoder.format} "
+            f"({report['baseline_tokens']} as JSON, {report['rows_omitted']} rows omitted)"
+        )
+        return text, report
+    
+    async def call_tool(self, name: str, arguments: Dict[str, Any], encode: bool = True) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Run a tool on the bounded graph executor, reporting progress to a streaming chat
+        
+        Returns the raw payload and, when ``encode`` is set, the text the LLM sees.
+        """
+        fn = self.tool_functions[name]
+        emit = _stream_events.get()
+        call_id = next(self._tool_call_ids)
+        if emit:
+            emit({"event": "tool_start", "call_id": call_id, "tool": name, "arguments": arguments})
+        start = time.perf_counter()
+        if not config.ASYNC_GRAPH_CALLS:
+            payload = fn(**arguments)
+        else:
+            # Run in a copy of this context so graph requests are recorded on the request's trace
+            call = functools.partial(contextvars.copy_context().run, fn, **arguments)
+            if config.SINGLE_FLIGHT_ENABLED:
+                # Identical concurrent calls await the first one instead of each taking an executor thread
+                payload = await self.tool_flights.ado(QueryCache.make_key(name, arguments), call, self.graph_executor)
+            else:
+                loop = asyncio.get_running_loop()
+                payload = await loop.run_in_executor(self.graph_executor, call)
+        text, report = self._encode_result(name, payload) if encode else (None, {})
+        if emit:
+            emit({
+                "event": "tool_end",
+                "call_id": call_id,
+                "tool": name,
+                "status": payload.get("status", "unknown"),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                **report
+            })
+        return payload, text
+    
+    def _instrument_tool(self, fn: Callable[..., Dict[str, Any]], name: str) -> Callable[..., Dict[str, Any]]:
+        """Time a tool's payload function and count its calls by result status"""
+        @functools.wraps(fn)
+        def instrumented(**kwargs) -> Dict[str, Any]:
+            start = time.perf_counter()
+            status = "exception"
+            with span(f"tool:{name}") as attrs:
+                try:
+                    payload = fn(**kwargs)
+                    status = payload.get("status", "unknown")
+                    return payload
+                finally:
+                    attrs["status"] = status
+                    self.metrics.observe_tool(name, time.perf_counter() - start, status)
+                    trace = current_trace()
+                    if trace is not None and status in ("error", "exception"):
+                        trace.count("tool_errors")
+        
+        return instrumented
+    
+    def _make_tool(self, fn: Callable[..., Dict[str, Any]], name: str, description: str) -> "FunctionTool":
+        """Wrap a tool's payload function: the LLM gets the encoded result, and async
+        agents run it on the bounded graph executor"""
+        fn = self._instrument_tool(fn, name)
+        self.tool_functions[name] = fn
+        
+        @functools.wraps(fn)
+        def sync_fn(**kwargs) -> str:
+            return self._encode_result(name, fn(**kwargs))[0]
+        
+        async def async_fn(**kwargs) -> str:
+            return (await self.call_tool(name, kwargs))[1]
+        
+        from llama_index.core.tools import FunctionTool
+        return FunctionTool.from_defaults(fn=sync_fn, async_fn=async_fn, name=name, description=description)
     
-    def _create_tools(self) -> List[FunctionTool]:
-        """Create LlamaIndex tools for each TigerGraph query"""
+    def _create_tools(self) -> List["FunctionTool"]:
+        """Create LlamaIndex tools for each TigerGraph query
+        
+        Tool functions return payload dicts; ``_make_tool`` encodes them for the LLM.
+        """
         
-        def get_person_info(person_id: str) -> str:
+        def get_person_info(person_id: str) -> Dict[str, Any]:
             """Get detailed information about a person by their ID"""
             try:
-                result = self.tg_conn.runInstalledQuery("GetPersonInfo", {"person_id": person_id})
+                result = self._run_query("GetPersonInfo", {"person_id": person_id})
                 if result and len(result[0]["@@result"]) > 0:
                     person_data = result[0]["@@result"][0]
-                    return json.dumps({
+                    return {
                         "status": "success",
                         "person": person_data,
                         "message": f"Found information for {person_data['first_name']} {person_data['last_name']}"
-                    }, indent=2)
+                    }
                 else:
-                    return json.dumps({
+                    return {
                         "status": "not_found",
                         "message": f"No person found with ID: {person_id}"
-                    }, indent=2)
+                    }
             except Exception as e:
-                return json.dumps({
+                return {
                     "status": "error",
                     "message": f"Error retrieving person info: {str(e)}"
-                }, indent=2)
+                }
         
-        def find_connections(source_person: str, target_person: str, max_hops: int = 3) -> str:
-            """Find connections between two people"""
+        def get_people_info(person_ids: List[str]) -> Dict[str, Any]:
+            """Get detailed information about several people by their IDs in one lookup"""
             try:
-                result = self.tg_conn.runInstalledQuery(
+                if isinstance(person_ids, str):
+                    person_ids = re.split(r"[,\s]+", person_ids)
+                ids = list(dict.fromkeys(str(person_id).strip() for person_id in person_ids if str(person_id).strip()))
+                skipped = ids[config.PEOPLE_INFO_MAX_IDS:]
+                ids = ids[:config.PEOPLE_INFO_MAX_IDS]
+                if not ids:
+                    return {"status": "error", "message": "Please provide at least one person ID"}
+                # Cached per person as GetPersonInfo results; the misses are fetched with one GetPeopleInfo query
+                results = self.query_cache.get_many_or_load(
+                    "GetPersonInfo", [{"person_id": person_id} for person_id in ids], self._load_people_info
+                )
+                people = [result[0]["@@result"][0] for result in results if result and result[0]["@@result"]]
+                found = {person["id"] for person in people}
+                not_found = [person_id for person_id in ids if person_id not in found]
+                message = f"Found information for {len(people)} of {len(ids)} people"
+                if not_found:
+                    message += f"; no person found with ID: {', '.join(not_found)}"
+                if skipped:
+                    message += f"; {len(skipped)} more IDs were not looked up (at most {config.PEOPLE_INFO_MAX_IDS} per call)"
+                return {
+                    "status": "success" if people else "not_found",
+                    "people": people,
+                    "not_found": not_found,
+                    "message": message
+                }
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "message": f"Error retrieving people info: {str(e)}"
+                }
+        
+        def find_connections(source_person: str, target_person: str, max_hops: int = 3) -> Dict[str, Any]:
+            """Find the shortest path between two people through friendships, employers or follows"""
+            try:
+                max_hops = max(1, min(int(max_hops), config.PATH_MAX_HOPS))
+                result = self._run_query(
                     "FindConnections", 
                     {
                         "source_person": source_person,
@@ -172,186 +1000,354 @@ class TigerGraphChatbot:
                         "max_hops": max_hops
                     }
                 )
-                connections = result[0]["@@paths"] if result else []
+                path = connection_path(result[0]["path"]) if result else []
                 
-                if connections:
-                    return json.dumps({
+                if path:
+                    hops = len(path) - 1
+                    return {
                         "status": "success",
-                        "connections": connections,
-                        "message": f"Found {len(connections)} connection(s) between {source_person} and {target_person}"
-                    }, indent=2)
+                        "hops": hops,
+                        "path": path,
+                        "description": describe_path(path),
+                        "message": f"{source_person} and {target_person} are {hops} hop(s) apart"
+                    }
                 else:
-                    return json.dumps({
+                    return {
                         "status": "not_found",
                         "message": f"No connections found between {source_person} and {target_person} within {max_hops} hops"
-                    }, indent=2)
+                    }
             except Exception as e:
-                return json.dumps({
+                # VERTEX<Person> parameters reject IDs that do not exist
+                if is_unknown_vertex(e):
+                    return {
+                        "status": "not_found",
+                        "message": f"Unknown person ID in {source_person!r} or {target_person!r}: {str(e)}"
+                    }
+                return {
                     "status": "error",
                     "message": f"Error finding connections: {str(e)}"
-                }, indent=2)
+                }
         
-        def get_company_employees(company_name: str, department: str = "") -> str:
-            """Get employees working at a specific company"""
+        def get_company_employees(company_name: str, department: str = "", page: int = 1, limit: int = 20,
+                                  count_only: bool = False) -> Dict[str, Any]:
+            """Get one page of a company's employees, highest salary first, or only how many there are"""
+            dept_text = f" in {department} department" if department else ""
             try:
-                result = self.tg_conn.runInstalledQuery(
-                    "GetCompanyEmployees",
-                    {
-                        "company_name": company_name,
-                        "department": department
+                company_id = self.companies.resolve(company_name)
+                if company_id is None:
+                    suggestions = self.companies.suggest(company_name)
+                    return {
+                        "status": "not_found",
+                        "message": f"No company named {company_name}" + (
+                            f"; did you mean {', '.join(suggestions)}?" if suggestions else "")
                     }
+                if isinstance(count_only, str):
+                    count_only = count_only.strip().lower() == "true"
+                limit = max(1, min(int(limit), config.LIST_MAX_ROWS))
+                page = max(1, int(page))
+                offset = (page - 1) * limit
+                if offset > config.COMPANY_EMPLOYEES_MAX_OFFSET:
+                    return {
+                        "status": "error",
+                        "message": f"Employee pages stop after the top {config.COMPANY_EMPLOYEES_MAX_OFFSET}; "
+                                   f"filter by department or ask for the count instead"
+                    }
+                result = self._run_query(
+                    "GetCompanyEmployees",
+                    self._employee_params(company_id, department, limit, offset, bool(count_only))
                 )
+                total = result[0]["total"] if result else 0
                 employees = result[0]["@@employees"] if result else []
+                company = self.companies.name_of(company_id) or company_name
                 
-                if employees:
-                    dept_text = f" in {department} department" if department else ""
-                    return json.dumps({
+                if not total:
+                    return {
+                        "status": "not_found",
+                        "message": f"No employees found at {company}{dept_text}"
+                    }
+                if count_only:
+                    return {
                         "status": "success",
-                        "employees": employees,
-                        "count": len(employees),
-                        "message": f"Found {len(employees)} employee(s) at {company_name}{dept_text}"
-                    }, indent=2)
+                        "total": total,
+                        "message": f"{total} employee(s) work at {company}{dept_text}"
+                    }
+                pages = -(-total // limit)
+                has_more = offset + len(employees) < total
+                if employees:
+                    message = (f"Employees {offset + 1}-{offset + len(employees)} of {total} at {company}{dept_text}, "
+                               f"highest salary first (page {page} of {pages})")
                 else:
-                    return json.dumps({
-                        "status": "not_found",
-                        "message": f"No employees found at {company_name}" + (f" in {department} department" if department else "")
-                    }, indent=2)
+                    message = f"Page {page} is past the last page ({pages}) of the {total} employee(s) at {company}{dept_text}"
+                return {
+                    "status": "success",
+                    "employees": employees,
+                    "count": len(employees),
+                    "total": total,
+                    "page": page,
+                    "pages": pages,
+                    "has_more": has_more,
+                    "message": message + (f"; pass page={page + 1} for the next page" if has_more else "")
+                }
             except Exception as e:
-                return json.dumps({
+                return {
                     "status": "error",
                     "message": f"Error retrieving company employees: {str(e)}"
-                }, indent=2)
+                }
         
-        def find_top_influencers(limit_count: int = 10) -> str:
+        def find_top_influencers(limit_count: int = 10) -> Dict[str, Any]:
             """Find the most influential people in the network"""
             try:
-                result = self.tg_conn.runInstalledQuery(
+                limit_count = max(1, min(int(limit_count), config.INFLUENCE_BOARD_SIZE))
+                result = self._run_query(
                     "FindTopInfluencers",
                     {"limit_count": limit_count}
                 )
                 influencers = result[0]["@@influencers"] if result else []
                 
-                return json.dumps({
+                return {
                     "status": "success",
                     "influencers": influencers,
                     "count": len(influencers),
                     "message": f"Found top {len(influencers)} influencer(s) in the network"
-                }, indent=2)
+                }
             except Exception as e:
-                return json.dumps({
+                return {
                     "status": "error",
                     "message": f"Error finding top influencers: {str(e)}"
-                }, indent=2)
+                }
         
-        def get_network_analytics() -> str:
+        def get_network_analytics() -> Dict[str, Any]:
             """Get overall network statistics and analytics"""
             try:
-                result = self.tg_conn.runInstalledQuery("GetNetworkAnalytics")
-                metrics = result[0]["@@metrics"] if result else []
+                result = self.analytics.get()
+                snapshot = result["snapshot"]
+                freshness = " (refresh in progress)" if snapshot["stale"] else ""
                 
-                return json.dumps({
+                return {
                     "status": "success",
-                    "metrics": metrics,
-                    "message": "Network analytics retrieved successfully"
-                }, indent=2)
+                    "metrics": result["metrics"],
+                    "snapshot": snapshot,
+                    "message": f"Network analytics as of {snapshot['computed_at']}, {snapshot['age_seconds']:g}s ago{freshness}"
+                }
             except Exception as e:
-                return json.dumps({
+                return {
                     "status": "error",
                     "message": f"Error retrieving network analytics: {str(e)}"
-                }, indent=2)
+                }
+        
+        def resolve_person(name: str, company: str = "", top_k: int = 5) -> Dict[str, Any]:
+            """Resolve a person's name to candidate person IDs"""
+            try:
+                self.name_index.ensure_fresh()
+                candidates = self.name_index.search(name, company=company, top_k=max(1, min(int(top_k), 20)))
+                if candidates:
+                    return {
+                        "status": "success",
+                        "candidates": candidates,
+                        "message": f"Found {len(candidates)} candidate(s) for '{name}'"
+                    }
+                else:
+                    return {
+                        "status": "not_found",
+                        "message": f"No person found matching '{name}'"
+                    }
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "message": f"Error resolving person name: {str(e)}"
+                }
+        
+        def get_mutual_friends(person_a: str, person_b: str) -> Dict[str, Any]:
+            """Find the friends two people have in common"""
+            try:
+                self.social_graph.ensure_fresh()
+                result = self.social_graph.mutual_friends(person_a, person_b, limit=config.LIST_MAX_ROWS)
+                if result["count"]:
+                    shown = f" (showing {len(result['people'])})" if result["count"] > len(result["people"]) else ""
+                    return {
+                        "status": "success",
+                        **result,
+                        "message": f"{person_a} and {person_b} have {result['count']} mutual friend(s){shown}"
+                    }
+                else:
+                    return {
+                        "status": "not_found",
+                        "friend_counts": result["friend_counts"],
+                        "message": f"{person_a} and {person_b} have no mutual friends"
+                    }
+            except KeyError as e:
+                return {"status": "not_found", "message": e.args[0]}
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "message": f"Error finding mutual friends: {str(e)}"
+                }
+        
+        def suggest_friends(person_id: str, limit: int = 10) -> Dict[str, Any]:
+            """Suggest people someone may know: friends of friends ranked by mutual friends"""
+            try:
+                self.social_graph.ensure_fresh()
+                suggestions = self.social_graph.suggest_friends(person_id, top_k=max(1, min(int(limit), config.LIST_MAX_ROWS)))
+                if suggestions:
+                    return {
+                        "status": "success",
+                        "suggestions": suggestions,
+                        "count": len(suggestions),
+                        "message": f"Found {len(suggestions)} people {person_id} may know"
+                    }
+                else:
+                    return {
+                        "status": "not_found",
+                        "message": f"No friends of friends found for {person_id}"
+                    }
+            except KeyError as e:
+                return {"status": "not_found", "message": e.args[0]}
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "message": f"Error suggesting friends: {str(e)}"
+                }
+        
+        def get_ego_network(person_id: str, hops: int = 2, relation: str = "friends") -> Dict[str, Any]:
+            """Count the people within a few hops of someone, hop by hop"""
+            try:
+                self.social_graph.ensure_fresh()
+                result = self.social_graph.neighbourhood(person_id, hops=hops, relation=relation)
+                return {
+                    "status": "success" if result["total"] else "not_found",
+                    **result,
+                    "message": f"{result['total']} people within {result['hops']} hop(s) of {person_id} over {relation}"
+                }
+            except KeyError as e:
+                return {"status": "not_found", "message": e.args[0]}
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "message": f"Error exploring the network around {person_id}: {str(e)}"
+                }
         
-        def list_available_people() -> str:
-            """List all people in the database with their basic info"""
+        def list_available_people(limit: int = 20, after_id: str = "") -> Dict[str, Any]:
+            """List people in the database one page at a time, ordered by ID"""
             try:
-                # Get all vertices of type Person
-                result = self.tg_conn.getVertices("Person")
-                people = []
-                for person_id, person_data in result.items():
-                    people.append({
-                        "id": person_id,
-                        "name": f"{person_data.get('first_name', '')} {person_data.get('last_name', '')}",
-                        "job_title": person_data.get("job_title", ""),
-                        "age": person_data.get("age", 0)
-                    })
+                people, next_cursor = self._list_page("ListPeople", "@@people", limit, after_id)
+                people = [{
+                    "id": person["id"],
+                    "name": f"{person.get('first_name', '')} {person.get('last_name', '')}",
+                    "job_title": person.get("job_title", ""),
+                    "age": person.get("age", 0)
+                } for person in people]
                 
-                return json.dumps({
+                return {
                     "status": "success",
                     "people": people,
                     "count": len(people),
-                    "message": f"Found {len(people)} people in the database"
-                }, indent=2)
+                    "next_after_id": next_cursor,
+                    "message": f"Listed {len(people)} people" + (
+                        f"; pass after_id='{next_cursor}' for the next page" if next_cursor else "")
+                }
             except Exception as e:
-                return json.dumps({
+                return {
                     "status": "error",
                     "message": f"Error listing people: {str(e)}"
-                }, indent=2)
+                }
         
-        def list_available_companies() -> str:
-            """List all companies in the database"""
+        def list_available_companies(limit: int = 20, after_id: str = "") -> Dict[str, Any]:
+            """List companies in the database one page at a time, ordered by ID"""
             try:
-                result = self.tg_conn.getVertices("Company")
-                companies = []
-                for company_id, company_data in result.items():
-                    companies.append({
-                        "id": company_id,
-                        "name": company_data.get("name", ""),
-                        "industry": company_data.get("industry", ""),
-                        "size": company_data.get("size", "")
-                    })
+                companies, next_cursor = self._list_page("ListCompanies", "@@companies", limit, after_id)
                 
-                return json.dumps({
+                return {
                     "status": "success",
                     "companies": companies,
                     "count": len(companies),
-                    "message": f"Found {len(companies)} companies in the database"
-                }, indent=2)
+                    "next_after_id": next_cursor,
+                    "message": f"Listed {len(companies)} companies" + (
+                        f"; pass after_id='{next_cursor}' for the next page" if next_cursor else "")
+                }
             except Exception as e:
-                return json.dumps({
+                return {
                     "status": "error",
                     "message": f"Error listing companies: {str(e)}"
-                }, indent=2)
+                }
         
         # Create FunctionTool objects
         tools = [
-            FunctionTool.from_defaults(
-                fn=get_person_info,
+            self._make_tool(
+                get_person_info,
                 name="get_person_info",
                 description="Get detailed information about a person by their ID (e.g., person_001, person_002, etc.)"
             ),
-            FunctionTool.from_defaults(
-                fn=find_connections,
+            self._make_tool(
+                get_people_info,
+                name="get_people_info",
+                description=f"Get detailed information about several people at once by their IDs (up to {config.PEOPLE_INFO_MAX_IDS}). Use this instead of repeated get_person_info calls when a question involves more than one person."
+            ),
+            self._make_tool(
+                find_connections,
                 name="find_connections",
-                description="Find how two people are connected through friendships or work relationships"
+                description="Find the shortest path between two people (by person ID) through friendships, shared employers or follows. Returns the hop count and each step with its relation."
             ),
-            FunctionTool.from_defaults(
-                fn=get_company_employees,
+            self._make_tool(
+                get_company_employees,
                 name="get_company_employees",
-                description="Get all employees working at a specific company, optionally filtered by department"
+                description=f"Get employees working at a specific company, optionally filtered by department, highest salary first. Returns the total and one page of at most {config.LIST_MAX_ROWS} (limit); pass page=2, 3, ... for more. Set count_only=true when only the number of employees is needed."
             ),
-            FunctionTool.from_defaults(
-                fn=find_top_influencers,
+            self._make_tool(
+                find_top_influencers,
                 name="find_top_influencers",
-                description="Find the most influential people in the network based on connections and followers"
+                description=f"Find the most influential people in the network (at most {config.INFLUENCE_BOARD_SIZE}), ranked by a precomputed influence score of friends plus twice the followers; each result also has a PageRank"
             ),
-            FunctionTool.from_defaults(
-                fn=get_network_analytics,
+            self._make_tool(
+                get_network_analytics,
                 name="get_network_analytics",
                 description="Get overall statistics and analytics about the social network"
             ),
-            FunctionTool.from_defaults(
-                fn=list_available_people,
+            self._make_tool(
+                resolve_person,
+                name="resolve_person",
+                description="Resolve a person's name (full, partial or misspelled) to the best matching person IDs. Optionally pass a company name to disambiguate. Returns only the top candidates."
+            ),
+            self._make_tool(
+                list_available_people,
                 name="list_available_people",
-                description="List all people in the database with their basic information"
+                description=f"List people with their basic information, at most {config.LIST_MAX_ROWS} per call, ordered by ID. Pass the returned next_after_id as after_id to get the next page. Use resolve_person instead to find a specific person."
             ),
-            FunctionTool.from_defaults(
-                fn=list_available_companies,
+            self._make_tool(
+                list_available_companies,
                 name="list_available_companies",
-                description="List all companies in the database"
+                description=f"List companies, at most {config.LIST_MAX_ROWS} per call, ordered by ID. Pass the returned next_after_id as after_id to get the next page."
             )
         ]
+        if config.GRAPH_SNAPSHOT_ENABLED:
+            tools += [
+                self._make_tool(
+                    get_mutual_friends,
+                    name="get_mutual_friends",
+                    description="Find the friends two people (by person ID) have in common, with the count and the mutual friends' IDs"
+                ),
+                self._make_tool(
+                    suggest_friends,
+                    name="suggest_friends",
+                    description=f"'People you may know' for a person ID: friends of their friends who are not their friends yet, ranked by the number of mutual friends (at most {config.LIST_MAX_ROWS})"
+                ),
+                self._make_tool(
+                    get_ego_network,
+                    name="get_ego_network",
+                    description=f"Explore the network around a person ID: how many people are 1, 2, ... hops away (up to {config.GRAPH_SNAPSHOT_MAX_HOPS}) and the most connected of them at each hop. relation is one of: {', '.join(RELATIONS)}"
+                )
+            ]
         
         return tools
     
+    def _snapshot_capabilities(self) -> str:
+        """System prompt lines for the tools backed by the social graph snapshot, when it is enabled"""
+        if not config.GRAPH_SNAPSHOT_ENABLED:
+            return ""
+        return """10. **get_mutual_friends**: Find the friends two people have in common
+11. **suggest_friends**: Suggest people someone may know (friends of friends, ranked by mutual friends)
+12. **get_ego_network**: Count the people 1, 2, ... hops away from someone over friendships or follows
+"""
+    
     def _get_system_prompt(self) -> str:
         """Get the system prompt for the agent"""
         return f"""You are a helpful AI assistant that helps users explore and analyze a social network database using TigerGraph.
@@ -366,19 +1362,22 @@ The social network contains:
 
 Available capabilities:
 1. **get_person_info**: Get detailed info about a specific person (requires person ID like person_001)
-2. **find_connections**: Find how two people are connected through friendships or work
-3. **get_company_employees**: List employees at a company, optionally filtered by department
-4. **find_top_influencers**: Find the most influential/connected people in the network
-5. **get_network_analytics**: Get overall network statistics and metrics
-6. **list_available_people**: See all people in the database
-7. **list_available_companies**: See all companies in the database
-
+2. **get_people_info**: Get the same details for several people in one call (a list of person IDs)
+3. **find_connections**: Find the shortest path between two people through friendships, shared employers or follows (person IDs, max_hops up to {config.PATH_MAX_HOPS})
+4. **get_company_employees**: List employees at a company one page at a time (or just count them), optionally filtered by department
+5. **find_top_influencers**: Find the most influential/connected people in the network
+6. **get_network_analytics**: Get overall network statistics and metrics
+7. **resolve_person**: Look up the person ID for a name (e.g. "John Smith", optionally with their company)
+8. **list_available_people**: Browse people in the database, one page at a time
+9. **list_available_companies**: Browse companies in the database, one page at a time
+{self._snapshot_capabilities()}
 When users ask questions:
-1. If they mention specific people by name (like "John Smith"), first use list_available_people to find their person ID
+1. If they mention specific people by name (like "John Smith"), first use resolve_person to find their person ID; do not list all people just to find one
 2. If they mention company names, you can use them directly
-3. Be helpful in explaining the results in natural language
-4. If you need more information, ask clarifying questions
-5. Suggest related queries that might be interesting
+3. If a question involves several people, look them all up with one get_people_info call rather than one get_person_info call each
+4. Be helpful in explaining the results in natural language
+5. If you need more information, ask clarifying questions
+6. Suggest related queries that might be interesting
 
 People IDs are in format: person_001, person_002, etc.
 Company names include: TechCorp, DataSystems, CloudVentures, StartupX, FinanceHub, MobileApps Inc, CyberSecurity Pro
@@ -386,23 +1385,285 @@ Company names include: TechCorp, DataSystems, CloudVentures, StartupX, FinanceHu
 Be conversational and helpful. Explain results clearly and suggest interesting follow-up questions.
 """
     
-    async def chat(self, user_message: str) -> Dict[str, Any]:
-        """Process user message and return response"""
+    async def chat(self, user_message: str, session_id: Optional[str] = None,
+                   trace_id: Optional[str] = None, include_trace: bool = False) -> Dict[str, Any]:
+        """Process user message and return response
+        
+        Turns with the same ``session_id`` share conversation memory; without
+        one a new session is started and its ID returned in the result. Every
+        result carries a ``trace_id`` (``trace_id`` if given); with
+        ``include_trace`` it also has the request's span breakdown.
+        """
+        with start_trace(trace_id) as trace:
+            result, path = await self._chat(user_message, session_id, trace)
+            self._finish_trace(trace, path, result["status"])
+            result["trace_id"] = trace.trace_id
+            if include_trace or config.TRACE_RESPONSES:
+                result["trace"] = trace.to_dict()
+            return result
+    
+    @staticmethod
+    def _session_busy(user_message: str, session: Session) -> Dict[str, Any]:
+        """Answer to a message sent while the session's previous turn is still running (HTTP 409)"""
+        return {
+            "status": "error",
+            "response": "Your previous message in this conversation is still being answered. Please wait for it to finish.",
+            "error": "session_busy",
+            "query": user_message,
+            "session_id": session.session_id
+        }
+    
+    async def _chat(self, user_message: str, session_id: Optional[str], trace: Trace) -> Tuple[Dict[str, Any], str]:
+        """The chat itself; also returns which path answered it (fast_path, semantic_cache or agent)"""
+        session = self.sessions.get(session_id)
+        if not self.sessions.begin_turn(session):
+            return self._session_busy(user_message, session), "rejected"
+        # Every graph read of this session goes to one host, when there are several
+        pin = set_session(session.session_id)
+        path = "fast_path"
         try:
-            response = await self.agent.achat(user_message)
+            if config.FAST_PATH_ENABLED:
+                with span("fast_path") as attrs:
+                    fast_result = await self._fast_path(user_message)
+                    attrs["served"] = fast_result is not None
+                if fast_result is not None:
+                    session.record_turn(user_message, fast_result["response"])
+                    with span("finish_turn"):
+                        await self._finish_turn(session)
+                    return {**fast_result, "session_id": session.session_id}, path
+            
+            path = "semantic_cache"
+            with span("semantic_lookup") as attrs:
+                cached, vector = await self._semantic_lookup(session, user_message)
+                attrs["hit"] = cached is not None
+            if cached is not None:
+                session.record_turn(user_message, cached["answer"])
+                with span("finish_turn"):
+                    await self._finish_turn(session)
+                return {
+                    "status": "success",
+                    "response": cached["answer"],
+                    "query": user_message,
+                    "session_id": session.session_id,
+                    "cached": True,
+                    "similarity": cached["similarity"]
+                }, path
+            
+            path = "agent"
+            with span("agent"):
+                response = await self._call_agent(lambda: session.agent.achat(user_message))
+            with span("finish_turn"):
+                await self._finish_turn(session)
+            with span("semantic_store"):
+                await self._semantic_store(vector, user_message, str(response), trace)
             return {
                 "status": "success",
                 "response": str(response),
-                "query": user_message
-            }
+                "query": user_message,
+                "session_id": session.session_id
+            }, path
         except Exception as e:
-            self.logger.error(f"Error in chat: {e}")
+            self.logger.error(f"Error in chat [trace {trace.trace_id}]: {e}")
             return {
                 "status": "error",
                 "response": f"I encountered an error while processing your request: {str(e)}",
-                "query": user_message
+                "query": user_message,
+                "session_id": session.session_id
+            }, path
+        finally:
+            reset_session(pin)
+            self.sessions.end_turn(session)
+    
+    def _finish_trace(self, trace: Trace, path: str, status: str):
+        """Record a finished chat in the metrics, logging where the time went if it was slow"""
+        self.metrics.observe_chat(path, status, trace)
+        elapsed_ms = trace.elapsed() * 1000
+        if config.TRACE_SLOW_CHAT_MS and elapsed_ms >= config.TRACE_SLOW_CHAT_MS:
+            self.logger.warning(f"Slow chat [trace {trace.trace_id}] via {path}: {elapsed_ms:.0f}ms ({trace.summary()})")
+    
+    async def stream_chat(self, user_message: str, session_id: Optional[str] = None,
+                          trace_id: Optional[str] = None, include_trace: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Process a user message, yielding progress events as they happen
+        
+        Events are ``start``, ``tool_start``/``tool_end`` around every tool call,
+        ``token`` for each chunk of the answer, then ``done`` with the full
+        response (or ``error``). ``start`` carries the trace ID; with
+        ``include_trace`` the last event also has the span breakdown. While
+        the session's previous turn is still running, the only event is an
+        ``error`` whose ``error`` is ``session_busy``.
+        """
+        trace = Trace(trace_id)
+        path, status = "fast_path", "error"
+        async for event in self._stream_chat(user_message, session_id, trace):
+            if event["event"] == "start":
+                event["trace_id"] = trace.trace_id
+            elif event["event"] in ("done", "error"):
+                path = event.pop("_path", path)
+                status = event["status"]
+                event["trace_id"] = trace.trace_id
+                if include_trace or config.TRACE_RESPONSES:
+                    event["trace"] = trace.to_dict()
+            yield event
+        self._finish_trace(trace, path, status)
+    
+    async def _stream_chat(self, user_message: str, session_id: Optional[str], trace: Trace) -> AsyncIterator[Dict[str, Any]]:
+        session = self.sessions.get(session_id)
+        if not self.sessions.begin_turn(session):
+            # Sent instead of "start", so callers can still answer with a 409
+            yield {"event": "error", **self._session_busy(user_message, session), "_path": "rejected"}
+            return
+        try:
+            async for event in self._stream_turn(user_message, session, trace):
+                yield event
+        finally:
+            self.sessions.end_turn(session)
+    
+    async def _stream_turn(self, user_message: str, session: Session, trace: Trace) -> AsyncIterator[Dict[str, Any]]:
+        events: asyncio.Queue = asyncio.Queue()
+        # Tools find the queue and the trace through context variables, so run the work in its own context
+        context = contextvars.copy_context()
+        context.run(_stream_events.set, events.put_nowait)
+        context.run(set_trace, trace)
+        
+        async def drain(task: asyncio.Task) -> AsyncIterator[Dict[str, Any]]:
+            """Yield queued events until ``task`` finishes, then whatever is left"""
+            while not task.done():
+                getter = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            while not events.empty():
+                yield events.get_nowait()
+        
+        context.run(set_session, session.session_id)
+        yield {"event": "start", "query": user_message, "session_id": session.session_id}
+        path = "fast_path"
+        try:
+            if config.FAST_PATH_ENABLED:
+                with span("fast_path", trace=trace) as attrs:
+                    task = asyncio.create_task(self._fast_path(user_message), context=context)
+                    async for event in drain(task):
+                        yield event
+                    fast_result = task.result()
+                    attrs["served"] = fast_result is not None
+                if fast_result is not None:
+                    session.record_turn(user_message, fast_result["response"])
+                    with span("finish_turn", trace=trace):
+                        await self._finish_turn(session)
+                    yield {"event": "token", "delta": fast_result["response"]}
+                    yield {"event": "done", **fast_result, "session_id": session.session_id, "_path": path}
+                    return
+            
+            path = "semantic_cache"
+            with span("semantic_lookup", trace=trace) as attrs:
+                cached, vector = await self._semantic_lookup(session, user_message)
+                attrs["hit"] = cached is not None
+            if cached is not None:
+                session.record_turn(user_message, cached["answer"])
+                with span("finish_turn", trace=trace):
+                    await self._finish_turn(session)
+                yield {"event": "token", "delta": cached["answer"]}
+                yield {
+                    "event": "done",
+                    "status": "success",
+                    "response": cached["answer"],
+                    "query": user_message,
+                    "session_id": session.session_id,
+                    "cached": True,
+                    "similarity": cached["similarity"],
+                    "_path": path
+                }
+                return
+            
+            path = "agent"
+            agent_start = trace.clock()
+            deadline = asyncio.get_running_loop().time() + (config.AGENT_TIMEOUT or float("inf"))
+            if self.agent_mode == "function_calling":
+                # This agent does not stream: tool events still arrive as they happen and the
+                # answer is sent as one token
+                task = asyncio.create_task(self._call_agent(lambda: session.agent.achat(user_message)), context=context)
+                async for event in drain(task):
+                    yield event
+                response = task.result()
+                chunks = [str(response)]
+                yield {"event": "token", "delta": chunks[0]}
+            else:
+                task = asyncio.create_task(self._call_agent(lambda: session.agent.astream_chat(user_message)), context=context)
+                async for event in drain(task):
+                    yield event
+                response = task.result()
+            
+                # The ReAct stream starts with the chunk that contained "Answer:"; hold tokens
+                # back until that label can be stripped so the UI only shows the answer itself
+                chunks = []
+                pending = ""
+                async for delta in _until(response.async_response_gen(), deadline):
+                    while not events.empty():
+                        yield events.get_nowait()
+                    if pending is not None:
+                        pending += delta
+                        if len(pending) < len(_ANSWER_LABEL) + 1 and _ANSWER_LABEL.startswith(pending.lstrip()[:len(_ANSWER_LABEL)]):
+                            continue
+                        delta, pending = _strip_answer_label(pending), None
+                        if not delta:
+                            continue
+                    chunks.append(delta)
+                    yield {"event": "token", "delta": delta}
+                if pending:
+                    chunks.append(_strip_answer_label(pending))
+                    yield {"event": "token", "delta": chunks[-1]}
+            trace.add("agent", agent_start, trace.clock() - agent_start)
+            with span("finish_turn", trace=trace):
+                await self._finish_turn(session)
+            answer = "".join(chunks) or str(response)
+            with span("semantic_store", trace=trace):
+                await self._semantic_store(vector, user_message, answer, trace)
+            yield {
+                "event": "done",
+                "status": "success",
+                "response": answer,
+                "query": user_message,
+                "session_id": session.session_id,
+                "_path": path
+            }
+        except Exception as e:
+            self.logger.error(f"Error in streaming chat [trace {trace.trace_id}]: {e}")
+            yield {
+                "event": "error",
+                "status": "error",
+                "response": f"I encountered an error while processing your request: {str(e)}",
+                "query": user_message,
+                "session_id": session.session_id,
+                "_path": path
             }
     
+    def _load_router_companies(self):
+        """Load the company directory and teach the fast-path router the names it can recognise"""
+        try:
+            self.companies.load()
+            self.router.set_companies(itertools.islice(self.companies.names(), config.FAST_PATH_MAX_COMPANIES))
+        except Exception as e:
+            self.logger.warning(f"Could not load company names for the fast-path router: {e}")
+    
+    async def _fast_path(self, user_message: str) -> Optional[Dict[str, Any]]:
+        """Answer common intents with a direct tool call and a templated reply, skipping the agent"""
+        match = self.router.route(user_message)
+        if match is None or match.tool not in self.tool_functions:
+            return None
+        payload, _ = await self.call_tool(match.tool, match.arguments, encode=False)
+        answer = render_answer(match, payload)
+        self.router.record(match.route, served=answer is not None)
+        if answer is None:
+            return None
+        return {
+            "status": "success",
+            "response": answer,
+            "query": user_message,
+            "route": match.route
+        }
+    
     def get_query_descriptions(self) -> Dict[str, Any]:
         """Get descriptions of available queries"""
         return {
@@ -427,7 +1688,51 @@ def index():
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "service": "TigerGraph Chatbot"})
+    """Liveness: the process is serving requests, whether or not startup has finished (see /ready)"""
+    return jsonify({"status": "healthy", "service": "TigerGraph Chatbot", "ready": chatbot.ready})
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: 200 once every required component is up, 503 until then; per-component state and timings"""
+    status = chatbot.startup.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+NOT_READY_RESPONSE = {
+    "status": "error",
+    "response": "The chatbot is still starting up. Please try again in a moment.",
+    "error": "not ready"
+}
+# Seconds clients are asked to wait before retrying a chat sent while starting up
+NOT_READY_RETRY_AFTER = 5
+
+def rejected_response(error: AdmissionRejected) -> Dict[str, Any]:
+    """Body of the 429/503 sent when admission control turns a chat away"""
+    if error.status == 429:
+        message = "You're sending messages too quickly. Please wait a moment and try again."
+    else:
+        message = "The chatbot is busy right now. Please try again in a moment."
+    return {"status": "error", "response": message, "error": error.reason, "retry_after": error.retry_after}
+
+def _session_id(data: Dict[str, Any]) -> Optional[str]:
+    """Session ID from the request body, falling back to the X-Session-ID header"""
+    return (data.get('session_id') or request.headers.get('X-Session-ID') or '').strip() or None
+
+def _admission_options(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Client for rate limiting (X-Client-ID header, else the remote address) and requested priority class"""
+    return {
+        "client": (request.headers.get('X-Client-ID') or '').strip()[:128] or request.remote_addr,
+        "priority": request.headers.get('X-Priority') or data.get('priority')
+    }
+
+def _rejected(error: AdmissionRejected):
+    return jsonify(rejected_response(error)), error.status, {"Retry-After": str(error.retry_after)}
+
+def _trace_options(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Trace ID propagated in the X-Trace-ID header, and whether the body asks for the span breakdown"""
+    return {
+        "trace_id": (request.headers.get('X-Trace-ID') or '').strip()[:64] or None,
+        "include_trace": bool(data.get('trace'))
+    }
 
 @app.route('/api/chat', methods=['POST'])
 async def chat():
@@ -439,8 +1744,19 @@ async def chat():
         if not user_message:
             return jsonify({"error": "Please provide a message"}), 400
         
-        result = await chatbot.chat(user_message)
-        return jsonify(result)
+        if not chatbot.ready:
+            return jsonify(NOT_READY_RESPONSE), 503, {"Retry-After": str(NOT_READY_RETRY_AFTER)}
+        
+        try:
+            async with chatbot.admission.admit(**_admission_options(data)):
+                result = await chatbot.chat(user_message, _session_id(data), **_trace_options(data))
+        except AdmissionRejected as e:
+            return _rejected(e)
+        response = jsonify(result)
+        response.headers['X-Trace-ID'] = result["trace_id"]
+        if result.get("error") == "session_busy":
+            response.status_code = 409
+        return response
         
     except Exception as e:
         logging.error(f"Error in chat endpoint: {e}")
@@ -450,11 +1766,176 @@ async def chat():
             "error": str(e)
         }), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Streaming chat endpoint: tool progress and answer tokens as server-sent events"""
+    data = request.get_json(silent=True) or {}
+    user_message = data.get('message', '').strip()
+    
+    if not user_message:
+        return jsonify({"error": "Please provide a message"}), 400
+    
+    if not chatbot.ready:
+        return jsonify(NOT_READY_RESPONSE), 503, {"Retry-After": str(NOT_READY_RETRY_AFTER)}
+    
+    # Wait for a slot before the response starts, so a rejection is still a plain 429/503
+    try:
+        ticket = chatbot.admission.acquire_blocking(**_admission_options(data))
+    except AdmissionRejected as e:
+        return _rejected(e)
+    
+    # Flask is synchronous, so the async event stream runs on its own loop in a helper thread
+    session_id = _session_id(data)
+    trace_options = _trace_options(data)
+    events: queue.Queue = queue.Queue()
+    # Set when the client goes away; the turn is then cancelled so it stops calling the LLM and
+    # TigerGraph and gives its admission slot back
+    disconnected = threading.Event()
+    cancel_turn: List[Callable[[], None]] = []
+    
+    def produce():
+        async def consume():
+            async for event in chatbot.stream_chat(user_message, session_id, **trace_options):
+                events.put(event)
+        try:
+            with asyncio.Runner() as runner:
+                loop = runner.get_loop()
+                turn = loop.create_task(consume())
+                cancel_turn.append(lambda: loop.call_soon_threadsafe(turn.cancel))
+                if disconnected.is_set():
+                    turn.cancel()
+                try:
+                    loop.run_until_complete(turn)
+                except asyncio.CancelledError:
+                    pass
+        finally:
+            ticket.release()
+            events.put(None)
+    
+    threading.Thread(target=produce, daemon=True).start()
+    
+    # The first event is "start", or the session_busy error, which is still sent as a plain 409
+    first = events.get()
+    if first is not None and first.get("error") == "session_busy":
+        return jsonify({key: value for key, value in first.items() if key != "event"}), 409
+    
+    def generate():
+        try:
+            if first is None:
+                return
+            yield format_sse(first)
+            while True:
+                event = events.get()
+                if event is None:
+                    return
+                yield format_sse(event)
+        finally:
+            disconnected.set()
+            for cancel in cancel_turn:
+                try:
+                    cancel()
+                except RuntimeError:
+                    # The turn already finished and its loop is closed
+                    pass
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @app.route('/api/queries', methods=['GET'])
 def get_available_queries():
     """Get information about available queries"""
     return jsonify(chatbot.get_query_descriptions())
 
+LISTING_QUERIES = {
+    "people": ("ListPeople", "@@people"),
+    "companies": ("ListCompanies", "@@companies")
+}
+
+@app.route('/api/export/<listing>', methods=['GET'])
+def export_listing(listing):
+    """Stream people or companies as newline-delimited JSON, one keyset page at a time"""
+    if listing not in LISTING_QUERIES:
+        return jsonify({"error": f"Unknown listing: {listing}"}), 404
+    query_name, result_key = LISTING_QUERIES[listing]
+    after_id = request.args.get('after_id', '')
+    limit = request.args.get('limit', type=int)
+    rows = chatbot.iter_vertices(query_name, result_key, after_id,
+                                 page_size=min(limit, config.EXPORT_PAGE_SIZE) if limit else config.EXPORT_PAGE_SIZE)
+    if limit:
+        rows = itertools.islice(rows, limit)
+    
+    def generate():
+        for row in rows:
+            yield json.dumps(row) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """Invalidate cached query results, e.g. from a data loading job"""
+    data = request.get_json(silent=True) or {}
+    removed = chatbot.invalidate_cache(data.get('query'))
+    return jsonify({"status": "success", "invalidated": removed})
+
+@app.route('/api/influence/refresh', methods=['POST'])
+def refresh_influence():
+    """Rescore people whose FRIENDS_WITH or FOLLOWS edges changed, or everyone when no IDs are given
+    
+    The same people are queued for the social graph snapshot's next delta refresh. The work runs on
+    the leaderboard's scheduler; ``scheduled`` is false when a check was already queued.
+    """
+    data = request.get_json(silent=True) or {}
+    person_ids = data.get('person_ids') or []
+    if person_ids:
+        chatbot.social_graph.mark_changed(person_ids)
+        pending = chatbot.influence.mark_changed(person_ids)
+        scheduled = chatbot.influence.request_check()
+        return jsonify({"status": "success", "queued": len(person_ids), "pending": pending, "scheduled": scheduled})
+    chatbot.influence.mark_stale()
+    chatbot.social_graph.mark_stale()
+    # Repeated calls while a check is queued share it, so they cost one full rebuild between them
+    scheduled = chatbot.influence.request_check()
+    return jsonify({"status": "success", "refresh": "full", "scheduled": scheduled})
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Connection pool, cache and session statistics"""
+    return jsonify({
+        "pool": chatbot.tg_conn.stats() if chatbot.tg_conn else None,
+        "query_cache": chatbot.query_cache.stats(),
+        "name_index": chatbot.name_index.stats(),
+        "companies": chatbot.companies.stats(),
+        "router": chatbot.router.stats(),
+        "sessions": chatbot.sessions.stats(),
+        "semantic_cache": chatbot.semantic_cache.stats(),
+        "tool_results": chatbot.result_encoder.stats(),
+        "single_flight": {"queries": chatbot.query_flights.stats(), "tools": chatbot.tool_flights.stats()},
+        "influence": chatbot.influence.stats(),
+        "analytics": chatbot.analytics.stats(),
+        "social_graph": chatbot.social_graph.stats(),
+        "startup": chatbot.startup.stats(),
+        "resilience": {
+            "graph": chatbot.tg_conn.breaker.stats() if chatbot.tg_conn and chatbot.tg_conn.breaker else None,
+            "llm": chatbot.llm_breaker.stats()
+        },
+        "llm_routing": chatbot.llm_router.stats() if chatbot.llm_router else None,
+        "admission": chatbot.admission.stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint: chat, LLM, tool and graph latency plus component statistics"""
+    return Response(chatbot.metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
+@app.route('/api/session/<session_id>', methods=['DELETE'])
+def end_session(session_id):
+    """Forget a session's conversation memory"""
+    if not chatbot.sessions.drop(session_id):
+        return jsonify({"error": f"Unknown session: {session_id}"}), 404
+    return jsonify({"status": "success", "session_id": session_id})
+
 @app.route('/api/test-connection', methods=['GET'])
 def test_connection():
     """Test TigerGraph connection"""
@@ -464,7 +1945,8 @@ def test_connection():
             return jsonify({
                 "status": "success",
                 "message": "TigerGraph connection is working",
-                "response": result
+                "response": result,
+                "pool": chatbot.tg_conn.stats()
             })
         else:
             return jsonify({
@@ -0,0 +1,191 @@
+"""ASGI deployment mode for the TigerGraph chatbot.
+
+Run with:  uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4
+
+/api/chat and /api/chat/stream are served natively on the server's event loop, so one worker can
+hold many conversations at once: LLM calls are awaited and graph queries
+run on the chatbot's bounded executor. Chats pass the chatbot's admission
+control first: at most MAX_CONCURRENT_CHATS run per worker, the rest wait
+in a priority queue or are turned away with 429/503. Every other route is
+delegated to the Flask app.
+"""
+
+import json
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+from asgiref.wsgi import WsgiToAsgi
+
+from admission import AdmissionRejected
+from app import app as flask_app, chatbot, config, format_sse, rejected_response, NOT_READY_RESPONSE, NOT_READY_RETRY_AFTER
+
+logger = logging.getLogger(__name__)
+
+flask_asgi = WsgiToAsgi(flask_app)
+_startup_task: Optional[asyncio.Task] = None
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+def _session_id(scope, data: Dict[str, Any]) -> Optional[str]:
+    """Session ID from the request body, falling back to the X-Session-ID header"""
+    header = dict(scope.get("headers") or []).get(b"x-session-id", b"").decode("latin-1")
+    return (data.get("session_id") or header).strip() or None
+
+
+def _admission_options(scope, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Client for rate limiting (X-Client-ID header, else the remote address) and requested priority class"""
+    headers = dict(scope.get("headers") or [])
+    client = headers.get(b"x-client-id", b"").decode("latin-1").strip()[:128]
+    return {
+        "client": client or (scope.get("client") or [None])[0],
+        "priority": headers.get(b"x-priority", b"").decode("latin-1") or data.get("priority")
+    }
+
+
+def _trace_options(scope, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Trace ID propagated in the X-Trace-ID header, and whether the body asks for the span breakdown"""
+    header = dict(scope.get("headers") or []).get(b"x-trace-id", b"").decode("latin-1")
+    return {"trace_id": header.strip()[:64] or None, "include_trace": bool(data.get("trace"))}
+
+
+async def _send_json(send, status: int, payload: Dict[str, Any], extra_headers: Optional[list] = None):
+    body = json.dumps(payload).encode("utf-8")
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"access-control-allow-origin", b"*")
+    ] + (extra_headers or [])
+    if payload.get("trace_id"):
+        headers.append((b"x-trace-id", payload["trace_id"].encode("latin-1")))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": headers
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_not_ready(send):
+    await _send_json(send, 503, NOT_READY_RESPONSE, [(b"retry-after", str(NOT_READY_RETRY_AFTER).encode())])
+
+
+async def _send_rejected(send, error: AdmissionRejected):
+    await _send_json(send, error.status, rejected_response(error), [(b"retry-after", str(error.retry_after).encode())])
+
+
+async def handle_chat(scope, receive, send):
+    """Native async version of the Flask /api/chat view"""
+    try:
+        data = json.loads(await _read_body(receive) or b"{}")
+        user_message = (data.get("message") or "").strip()
+
+        if not user_message:
+            return await _send_json(send, 400, {"error": "Please provide a message"})
+        if not chatbot.ready:
+            return await _send_not_ready(send)
+
+        try:
+            async with chatbot.admission.admit(**_admission_options(scope, data)):
+                result = await chatbot.chat(user_message, _session_id(scope, data), **_trace_options(scope, data))
+        except AdmissionRejected as e:
+            return await _send_rejected(send, e)
+        await _send_json(send, 409 if result.get("error") == "session_busy" else 200, result)
+
+    except Exception as e:
+        logger.error(f"Error in chat endpoint: {e}")
+        await _send_json(send, 500, {
+            "status": "error",
+            "response": "I'm sorry, I encountered an internal error. Please try again.",
+            "error": str(e)
+        })
+
+
+async def handle_chat_stream(scope, receive, send):
+    """Native async version of the Flask /api/chat/stream view"""
+    try:
+        data = json.loads(await _read_body(receive) or b"{}")
+    except ValueError:
+        data = {}
+    user_message = (data.get("message") or "").strip()
+    if not user_message:
+        return await _send_json(send, 400, {"error": "Please provide a message"})
+    if not chatbot.ready:
+        return await _send_not_ready(send)
+    try:
+        ticket = await chatbot.admission.acquire(**_admission_options(scope, data))
+    except AdmissionRejected as e:
+        return await _send_rejected(send, e)
+
+    stream = chatbot.stream_chat(user_message, _session_id(scope, data), **_trace_options(scope, data))
+    try:
+        # The first event is "start", or the session_busy error, which is still sent as a plain 409
+        first = await stream.__anext__()
+        if first.get("error") == "session_busy":
+            return await _send_json(send, 409, {key: value for key, value in first.items() if key != "event"})
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+                (b"access-control-allow-origin", b"*")
+            ]
+        })
+        await send({"type": "http.response.body", "body": format_sse(first).encode("utf-8"), "more_body": True})
+        async for event in stream:
+            await send({"type": "http.response.body", "body": format_sse(event).encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        # Ends the turn now, not when the generator is collected, if the client went away mid-stream
+        await stream.aclose()
+        ticket.release()
+
+
+async def _initialize_in_background():
+    try:
+        await chatbot.initialize()
+    except Exception:
+        # Already logged; /ready keeps reporting the failed step
+        pass
+
+
+async def lifespan(scope, receive, send):
+    global _startup_task
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                if chatbot.startup.started_at is None:
+                    if config.STARTUP_IN_BACKGROUND:
+                        # Accept connections now; /ready answers 503 until startup finishes
+                        _startup_task = asyncio.ensure_future(_initialize_in_background())
+                    else:
+                        await chatbot.initialize()
+                await send({"type": "lifespan.startup.complete"})
+            except Exception as e:
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+        elif message["type"] == "lifespan.shutdown":
+            chatbot.graph_executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(scope, receive, send)
+    if scope["type"] == "http" and scope["method"] == "POST":
+        if scope["path"] == "/api/chat":
+            return await handle_chat(scope, receive, send)
+        if scope["path"] == "/api/chat/stream":
+            return await handle_chat_stream(scope, receive, send)
+    return await flask_asgi(scope, receive, send)
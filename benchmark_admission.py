@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Admission control and priority scheduling on the ASGI chat path.
+
+Sends bursts of /api/chat requests to the ASGI application in-process,
+with a scripted LLM and a fake REST++ server. Every scenario gets its own
+admission controller with a small concurrency limit, so the bursts
+overload it. Scenarios:
+- concurrency: a burst bigger than the limit. Every chat succeeds, and no
+  more than the limit ever run at once.
+- priority: a batch burst, then interactive chats. The interactive chats
+  jump the queue and wait less than the batch ones.
+- overload: a burst far beyond the queue. The overflow is turned away with
+  503 and a Retry-After, without waiting for a slot.
+- shed: a batch burst fills the queue, then interactive chats arrive. They
+  take the place of waiting batch chats and all succeed.
+- timeout: chats that cannot get a slot within the maximum wait give up
+  with 503 after about that long.
+- rate_limit: one client sends more than its burst allowance and gets 429s
+  (on /api/chat/stream as well), while another client is unaffected.
+
+Each scenario prints PASS or FAIL with its counts and latencies. The exit
+status is non-zero if any scenario fails.
+
+    python benchmark_admission.py --llm-latency 0.05 --burst 32
+"""
+
+import sys
+import math
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List, Any, Callable, Optional
+
+import httpx
+
+from admission import AdmissionController
+from fake_llm import ScriptedReActLLM, tool_react_script
+from fake_graph import InMemorySocialGraph
+from fake_tigergraph import FakeRestppServer
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)] if ordered else 0.0
+
+
+def ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+class Burst:
+    """Sends chats and keeps each response's status, Retry-After and latency"""
+
+    def __init__(self, client: httpx.AsyncClient, people: List[str]):
+        self.client = client
+        self.people = people
+        self.results: List[Dict[str, Any]] = []
+        self._count = 0
+
+    async def send(self, priority: str, client_id: Optional[str] = None, path: str = "/api/chat"):
+        self._count += 1
+        headers = {"X-Priority": priority, "X-Client-ID": client_id or f"client-{self._count}"}
+        message = f"Tell me about {self.people[self._count % len(self.people)]}"
+        start = time.perf_counter()
+        response = await self.client.post(path, json={"message": message}, headers=headers)
+        self.results.append({
+            "priority": priority,
+            "client": headers["X-Client-ID"],
+            "status": response.status_code,
+            "retry_after": response.headers.get("retry-after"),
+            "error": response.json().get("error") if response.status_code != 200 else None,
+            "seconds": time.perf_counter() - start
+        })
+
+    def launch(self, count: int, priority: str, client_id: Optional[str] = None) -> List[asyncio.Task]:
+        return [asyncio.ensure_future(self.send(priority, client_id)) for _ in range(count)]
+
+    def of(self, priority: Optional[str] = None, status: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [r for r in self.results
+                if (priority is None or r["priority"] == priority) and (status is None or r["status"] == status)]
+
+
+def use_controller(chatbot, **options) -> AdmissionController:
+    """Give the chatbot a fresh admission controller for one scenario"""
+    options.setdefault("max_queue", 256)
+    options.setdefault("max_wait", 10.0)
+    chatbot.admission = AdmissionController(observer=chatbot.metrics.observe_admission, **options)
+    chatbot.metrics.add_queue_depths(chatbot.admission.queue_depths)
+    return chatbot.admission
+
+
+async def concurrency(chatbot, burst: Burst, args) -> Dict[str, Any]:
+    admission = use_controller(chatbot, max_concurrent=args.limit)
+    await asyncio.gather(*burst.launch(args.burst, "batch"))
+    stats = admission.stats()
+    return {
+        "passed": len(burst.of(status=200)) == args.burst and stats["peak_in_flight"] <= args.limit,
+        "ok": len(burst.of(status=200)),
+        "peak_in_flight": stats["peak_in_flight"],
+        "peak_queued": stats["peak_queued"],
+        "p95_ms": ms(percentile([r["seconds"] for r in burst.results], 0.95))
+    }
+
+
+async def priority(chatbot, burst: Burst, args) -> Dict[str, Any]:
+    admission = use_controller(chatbot, max_concurrent=args.limit)
+    batch = burst.launch(args.burst, "batch")
+    await asyncio.sleep(args.llm_latency)
+    interactive = burst.launch(args.limit * 2, "interactive")
+    await asyncio.gather(*batch, *interactive)
+    waits = admission.stats()["priorities"]
+    return {
+        "passed": len(burst.of(status=200)) == len(burst.results)
+                  and waits["interactive"]["wait_p95_ms"] < waits["batch"]["wait_p50_ms"],
+        "interactive_wait_p95_ms": waits["interactive"]["wait_p95_ms"],
+        "batch_wait_p50_ms": waits["batch"]["wait_p50_ms"],
+        "interactive_p50_ms": ms(statistics.median(r["seconds"] for r in burst.of("interactive"))),
+        "batch_p50_ms": ms(statistics.median(r["seconds"] for r in burst.of("batch")))
+    }
+
+
+async def overload(chatbot, burst: Burst, args) -> Dict[str, Any]:
+    use_controller(chatbot, max_concurrent=2, max_queue=4)
+    await asyncio.gather(*burst.launch(args.burst, "batch"))
+    rejected = burst.of(status=503)
+    return {
+        "passed": len(burst.of(status=200)) == 6 and len(rejected) == args.burst - 6
+                  and all(r["error"] == "queue_full" and int(r["retry_after"]) >= 1 for r in rejected)
+                  and percentile([r["seconds"] for r in rejected], 0.95) < args.llm_latency,
+        "ok": len(burst.of(status=200)),
+        "rejected": len(rejected),
+        "reject_p95_ms": ms(percentile([r["seconds"] for r in rejected], 0.95)),
+        "retry_after": sorted({r["retry_after"] for r in rejected})
+    }
+
+
+async def shed(chatbot, burst: Burst, args) -> Dict[str, Any]:
+    admission = use_controller(chatbot, max_concurrent=2, max_queue=4)
+    batch = burst.launch(6, "batch")
+    await asyncio.sleep(args.llm_latency / 2)
+    interactive = burst.launch(3, "interactive")
+    await asyncio.gather(*batch, *interactive)
+    stats = admission.stats()
+    return {
+        "passed": len(burst.of("interactive", 200)) == 3 and stats["shed"] == 3
+                  and all(r["error"] == "shed" for r in burst.of("batch", 503)),
+        "interactive_ok": len(burst.of("interactive", 200)),
+        "batch_ok": len(burst.of("batch", 200)),
+        "shed": stats["shed"]
+    }
+
+
+async def timeout(chatbot, burst: Burst, args) -> Dict[str, Any]:
+    max_wait = args.llm_latency * 3
+    use_controller(chatbot, max_concurrent=1, max_wait=max_wait)
+    await asyncio.gather(*burst.launch(8, "batch"))
+    timed_out = burst.of(status=503)
+    seconds = [r["seconds"] for r in timed_out]
+    return {
+        "passed": bool(timed_out) and all(r["error"] == "queue_timeout" for r in timed_out)
+                  and min(seconds) >= max_wait and max(seconds) < max_wait + args.llm_latency * 4,
+        "ok": len(burst.of(status=200)),
+        "timed_out": len(timed_out),
+        "max_wait_ms": ms(max_wait),
+        "timeout_after_ms": [ms(min(seconds or [0])), ms(max(seconds or [0]))]
+    }
+
+
+async def rate_limit(chatbot, burst: Burst, args) -> Dict[str, Any]:
+    use_controller(chatbot, max_concurrent=args.burst, client_rate=1.0, client_burst=5)
+    await asyncio.gather(*burst.launch(8, "interactive", "greedy"), *burst.launch(3, "interactive", "polite"))
+    await burst.send("interactive", "greedy", path="/api/chat/stream")
+    greedy = [r for r in burst.results if r["client"] == "greedy"]
+    polite = [r for r in burst.results if r["client"] == "polite"]
+    limited = [r for r in greedy if r["status"] == 429]
+    return {
+        "passed": sum(r["status"] == 200 for r in greedy) == 5 and len(limited) == 4
+                  and all(r["error"] == "rate_limited" and int(r["retry_after"]) >= 1 for r in limited)
+                  and all(r["status"] == 200 for r in polite),
+        "greedy_ok": sum(r["status"] == 200 for r in greedy),
+        "greedy_429": len(limited),
+        "polite_ok": sum(r["status"] == 200 for r in polite),
+        "retry_after": sorted({r["retry_after"] for r in limited})
+    }
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "concurrency": concurrency,
+    "priority": priority,
+    "overload": overload,
+    "shed": shed,
+    "timeout": timeout,
+    "rate_limit": rate_limit
+}
+
+
+async def main(args) -> int:
+    from app import chatbot, config
+    from asgi import application
+
+    graph = InMemorySocialGraph.generate(args.people, seed=args.seed)
+    people = graph.sample_ids("person", 500, args.seed)
+
+    with graph.register(FakeRestppServer()) as fake:
+        config.TIGERGRAPH_HOST = fake.url
+        config.AGENT_VERBOSE = False
+        config.FAST_PATH_ENABLED = False
+        config.SEMANTIC_CACHE_ENABLED = False
+        config.INFLUENCE_REFRESH_ENABLED = False
+        config.STARTUP_WARMUP = False
+        await chatbot.initialize(llm=ScriptedReActLLM(latency=args.llm_latency, script=tool_react_script))
+
+        failures = 0
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name in args.scenarios:
+                result = await SCENARIOS[name](chatbot, Burst(client, people), args)
+                passed = result.pop("passed")
+                failures += not passed
+                details = "  ".join(f"{key}={value}" for key, value in result.items())
+                print(f"{'PASS' if passed else 'FAIL'}  {name:<11} {details}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check admission control, priorities and rate limits on /api/chat")
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--burst", type=int, default=32)
+    parser.add_argument("--limit", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Read balancing, session pinning and failover across several TigerGraph hosts.
+
+Serves the same generated graph from three fake REST++ servers with
+different latencies (a fast primary, a fast replica, a slow replica) and
+points TIGERGRAPH_HOST at all three. The query cache is off, so every
+lookup reaches a host. Scenarios:
+- balance: concurrent person lookups. Every lookup succeeds, and the slow
+  replica gets the smallest share of them.
+- pinning: chat sessions asking several questions each. All of a
+  session's queries reach one host.
+- failover: one replica answers every query with 503, then another hangs
+  past the query timeout. Every lookup still succeeds, and the broken
+  hosts are marked down.
+- recovery: faults are cleared and a health check runs. Every host is
+  healthy again and takes reads.
+- writes: upserts reach only the primary.
+
+Each scenario prints PASS or FAIL with per-host request counts. The exit
+status is non-zero if any scenario fails.
+
+    python benchmark_cluster.py --lookups 600 --concurrency 8
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from typing import Dict, List, Any, Callable
+
+from fake_llm import ScriptedReActLLM, tool_react_script
+from fake_graph import InMemorySocialGraph
+from fake_tigergraph import FakeRestppServer
+
+
+def query_counts(fakes: List[FakeRestppServer]) -> List[int]:
+    return [sum(count for key, count in fake.request_counts.items() if key.startswith("query/")) for fake in fakes]
+
+
+def delta(after: List[int], before: List[int]) -> List[int]:
+    return [a - b for a, b in zip(after, before)]
+
+
+async def lookups(chatbot, people: List[str], concurrency: int) -> int:
+    """Run get_person_info for every person, ``concurrency`` at a time; returns how many failed"""
+    pending = list(people)
+    failed = 0
+
+    async def worker():
+        nonlocal failed
+        while pending:
+            person = pending.pop()
+            payload, _ = await chatbot.call_tool("get_person_info", {"person_id": person}, encode=False)
+            failed += payload["status"] != "success"
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return failed
+
+
+async def balance(chatbot, fakes, people, args) -> Dict[str, Any]:
+    before = query_counts(fakes)
+    start = time.perf_counter()
+    failed = await lookups(chatbot, people[:args.lookups], args.concurrency)
+    elapsed = time.perf_counter() - start
+    counts = delta(query_counts(fakes), before)
+    return {
+        "passed": failed == 0 and counts[2] < min(counts[:2]),
+        "failed": failed,
+        "per_host": counts,
+        "lookups_per_s": round(args.lookups / elapsed)
+    }
+
+
+async def pinning(chatbot, fakes, people, args) -> Dict[str, Any]:
+    spread = []
+    for i in range(args.sessions):
+        before = query_counts(fakes)
+        session_id = f"bench-session-{i}"
+        for person in people[i * 3:i * 3 + 3]:
+            await chatbot.chat(f"Tell me about {person}", session_id=session_id)
+        spread.append(sum(count > 0 for count in delta(query_counts(fakes), before)))
+    hosts_used = {host: stats["pinned_sessions"] for host, stats in chatbot.tg_conn.stats()["hosts"].items()}
+    return {
+        "passed": all(hosts == 1 for hosts in spread) and sum(count > 0 for count in hosts_used.values()) > 1,
+        "sessions": len(spread),
+        "sessions_on_one_host": sum(hosts == 1 for hosts in spread),
+        "pinned_per_host": list(hosts_used.values())
+    }
+
+
+async def failover(chatbot, fakes, people, args) -> Dict[str, Any]:
+    cluster = chatbot.tg_conn
+    fakes[1].inject_faults(rate=1.0, status=503, paths=["query/"])
+    before = query_counts(fakes)
+    failed = await lookups(chatbot, people[1000:1000 + args.lookups // 2], args.concurrency)
+    errored = delta(query_counts(fakes), before)
+    fakes[1].clear_faults()
+
+    fakes[0].inject_faults(rate=1.0, status=200, hang=args.query_timeout * 4, paths=["query/"])
+    before = query_counts(fakes)
+    start = time.perf_counter()
+    failed += await lookups(chatbot, people[2000:2000 + args.lookups // 2], args.concurrency)
+    hung_seconds = time.perf_counter() - start
+    hung = delta(query_counts(fakes), before)
+    fakes[0].clear_faults()
+    hosts = cluster.stats()["hosts"]
+    down = [name for name, host in hosts.items() if not host["healthy"]]
+    return {
+        "passed": failed == 0 and down == [fakes[0].url, fakes[1].url],
+        "failed": failed,
+        "per_host_503": errored,
+        "per_host_hung": hung,
+        "hung_phase_s": round(hung_seconds, 2),
+        "failovers": cluster.stats()["failovers"],
+        "down": len(down)
+    }
+
+
+async def recovery(chatbot, fakes, people, args) -> Dict[str, Any]:
+    await asyncio.get_running_loop().run_in_executor(None, chatbot.tg_conn.check_health)
+    before = query_counts(fakes)
+    failed = await lookups(chatbot, people[3000:3000 + args.lookups], args.concurrency)
+    counts = delta(query_counts(fakes), before)
+    healthy = chatbot.tg_conn.stats()["hosts_healthy"]
+    return {
+        "passed": failed == 0 and healthy == len(fakes) and all(count > 0 for count in counts),
+        "healthy": healthy,
+        "per_host": counts
+    }
+
+
+async def writes(chatbot, fakes, people, args) -> Dict[str, Any]:
+    before = [fake.request_counts.get("upsert", 0) for fake in fakes]
+    for i in range(10):
+        chatbot.tg_conn.upsertVertices("City", [(f"bench_city_{i}", {"name": f"City {i}"})])
+    counts = delta([fake.request_counts.get("upsert", 0) for fake in fakes], before)
+    return {"passed": counts == [10, 0, 0], "per_host": counts}
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "balance": balance,
+    "pinning": pinning,
+    "failover": failover,
+    "recovery": recovery,
+    "writes": writes
+}
+
+
+async def main(args) -> int:
+    from app import chatbot, config
+
+    graph = InMemorySocialGraph.generate(args.people, seed=args.seed)
+    people = graph.sample_ids("person", 4000, args.seed)
+    fakes = [graph.register(FakeRestppServer(latency=latency)).start() for latency in args.latencies]
+    try:
+        config.TIGERGRAPH_HOST = ",".join(fake.url for fake in fakes)
+        config.TIGERGRAPH_QUERY_TIMEOUT = args.query_timeout
+        config.TIGERGRAPH_QUERY_TIMEOUTS = ""
+        config.GRAPH_RETRY_BASE_DELAY = 0.01
+        config.GRAPH_BREAKER_THRESHOLD = 0
+        config.GRAPH_HOST_RECHECK_INTERVAL = 60
+        config.GRAPH_HEALTH_INTERVAL = 0
+        config.AGENT_VERBOSE = False
+        config.SEMANTIC_CACHE_ENABLED = False
+        config.INFLUENCE_REFRESH_ENABLED = False
+        config.STARTUP_WARMUP = False
+        config.SINGLE_FLIGHT_ENABLED = False
+        chatbot.query_cache.ttls.clear()
+        chatbot.query_cache.default_ttl = 0
+        await chatbot.initialize(llm=ScriptedReActLLM(script=tool_react_script))
+
+        failures = 0
+        for name in args.scenarios:
+            result = await SCENARIOS[name](chatbot, fakes, people, args)
+            passed = result.pop("passed")
+            failures += not passed
+            details = "  ".join(f"{key}={value}" for key, value in result.items())
+            print(f"{'PASS' if passed else 'FAIL'}  {name:<9} {details}")
+        chatbot.tg_conn.close()
+    finally:
+        for fake in fakes:
+            fake.stop()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check read balancing, session pinning and failover over several hosts")
+    parser.add_argument("--people", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=600)
+    parser.add_argument("--sessions", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latencies", type=lambda s: [float(x) for x in s.split(",")], default=[0.002, 0.002, 0.05])
+    parser.add_argument("--query-timeout", type=float, default=0.3)
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(asyncio.run(main(parser.parse_args())))
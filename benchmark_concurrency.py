@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Load benchmark for the ASGI chat path.
+
+Drives /api/chat on the ASGI application in-process with a scripted LLM
+and a fake REST++ server, so the numbers isolate how well one worker
+overlaps LLM and graph latency across concurrent chats. Each run is
+repeated with ASYNC_GRAPH_CALLS disabled to show the cost of blocking
+graph calls on the event loop.
+
+    python benchmark_concurrency.py --levels 1,4,16,64 --llm-latency 0.2 --graph-latency 0.1
+"""
+
+import json
+import math
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List, Any
+
+import httpx
+
+from fake_llm import ScriptedReActLLM
+from fake_tigergraph import FakeRestppServer
+
+
+def person_info(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    person_id = params.get("person_id", "person_001")
+    return [{"@@result": [{
+        "id": person_id, "first_name": "Bench", "last_name": "Person", "age": 30,
+        "email": f"{person_id}@example.com", "job_title": "Engineer", "salary": 100000,
+        "company_name": "TechCorp", "city_name": "San Francisco", "state": "CA"
+    }]}]
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, requests_per_worker: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        for i in range(requests_per_worker):
+            message = f"Tell me about person_{(worker_id * requests_per_worker + i) % 999 + 1:03d}"
+            start = time.perf_counter()
+            response = await client.post("/api/chat", json={"message": message})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200 or response.json().get("status") != "success":
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[max(0, math.ceil(len(latencies) * 0.95) - 1)] * 1000, 1)
+    }
+
+
+async def main(args):
+    from app import chatbot, config
+    from asgi import application
+
+    with FakeRestppServer(latency=args.graph_latency) as fake:
+        fake.register_query("GetPersonInfo", person_info)
+        config.TIGERGRAPH_HOST = fake.url
+        config.AGENT_VERBOSE = False
+        config.SEMANTIC_CACHE_ENABLED = False
+        config.INFLUENCE_REFRESH_ENABLED = False
+        # Every request comes from one client, so per-client rate limits would reject most of them
+        chatbot.admission.client_rate = 0
+        chatbot.query_cache.ttls.clear()
+        chatbot.query_cache.default_ttl = 0
+        await chatbot.initialize(llm=ScriptedReActLLM(latency=args.llm_latency))
+
+        results = {"config": vars(args), "runs": []}
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for async_graph_calls in (True, False):
+                config.ASYNC_GRAPH_CALLS = async_graph_calls
+                mode = "executor" if async_graph_calls else "blocking"
+                for level in args.levels:
+                    run = await run_level(client, level, args.requests_per_worker)
+                    run["graph_calls"] = mode
+                    results["runs"].append(run)
+                    print(f"{mode:>9}  c={level:<4} {run['throughput_rps']:>8} req/s  "
+                          f"p50 {run['p50_ms']:>8} ms  p95 {run['p95_ms']:>8} ms  errors {run['errors']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent chats on the ASGI path")
+    parser.add_argument("--levels", type=lambda s: [int(x) for x in s.split(",")], default=[1, 4, 16, 64])
+    parser.add_argument("--requests-per-worker", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--graph-latency", type=float, default=0.1)
+    parser.add_argument("--output", default="")
+    asyncio.run(main(parser.parse_args()))
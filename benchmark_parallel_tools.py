@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Round trips for questions about several people at once.
+
+"Compare person_a, person_b and person_c" is answered four ways, with a
+scripted LLM and the in-memory graph behind the fake REST++ server:
+- react_sequential: the ReAct agent calls get_person_info once per
+  person, so every person costs one LLM round trip and one graph call;
+- react_batched: the ReAct agent calls get_people_info once, which runs
+  one GetPeopleInfo query;
+- function_calling_parallel: the function-calling agent requests every
+  get_person_info call in one reply, and they run concurrently on the
+  graph executor;
+- function_calling_batched: the function-calling agent calls
+  get_people_info once.
+
+Each mode reports LLM calls, graph requests and latency per question for
+every group size. The sequential ReAct mode needs two reasoning steps per
+person, so AGENT_MAX_ITERATIONS is raised to fit the largest group. A
+mode with failed questions is reported as FAIL with its error count and
+no latencies, and the exit status is then non-zero.
+
+    python benchmark_parallel_tools.py --sizes 2,3,5 --llm-latency 0.1 --graph-latency 0.02
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List, Any
+
+from fake_llm import ScriptedReActLLM, ScriptedFunctionCallingLLM, compare_react_script
+from fake_graph import InMemorySocialGraph
+from fake_tigergraph import FakeRestppServer
+
+MODES = ["react_sequential", "react_batched", "function_calling_parallel", "function_calling_batched"]
+
+
+def make_llm(mode: str, latency: float):
+    if mode.startswith("react"):
+        return "react", ScriptedReActLLM(latency=latency, script=compare_react_script(batched=mode == "react_batched"))
+    return "function_calling", ScriptedFunctionCallingLLM(latency=latency, batched=mode == "function_calling_batched")
+
+
+def graph_requests(fake: FakeRestppServer) -> int:
+    return sum(count for key, count in fake.request_counts.items() if key.startswith("query/"))
+
+
+async def run_mode(chatbot, fake: FakeRestppServer, mode: str, questions: List[str], concurrency: int,
+                   llm_latency: float) -> Dict[str, Any]:
+    chatbot.agent_mode, llm = make_llm(mode, llm_latency)
+    chatbot.llm = llm
+    latencies: List[float] = []
+    errors = 0
+    pending = list(questions)
+
+    async def worker():
+        nonlocal errors
+        while pending:
+            question = pending.pop()
+            start = time.perf_counter()
+            result = await chatbot.chat(question)
+            latencies.append(time.perf_counter() - start)
+            if result["status"] != "success":
+                errors += 1
+
+    before = graph_requests(fake)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    row = {
+        "mode": mode,
+        "questions": len(latencies),
+        "errors": errors,
+        "llm_calls_per_question": round(llm.calls / len(latencies), 2),
+        "graph_requests_per_question": round((graph_requests(fake) - before) / len(latencies), 2)
+    }
+    if errors:
+        # Failed questions stop early, so their latencies would flatter the mode
+        return row
+    return {
+        **row,
+        "p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "p95_ms": round(ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)] * 1000, 1),
+        "throughput_rps": round(len(latencies) / elapsed, 2)
+    }
+
+
+async def main(args) -> int:
+    from app import chatbot, config
+
+    graph = InMemorySocialGraph.generate(args.people, seed=args.seed)
+    rng = random.Random(args.seed)
+    people = graph.sample_ids("person", 1000, args.seed)
+
+    with graph.register(FakeRestppServer(latency=args.graph_latency)) as fake:
+        config.TIGERGRAPH_HOST = fake.url
+        config.AGENT_VERBOSE = False
+        config.SEMANTIC_CACHE_ENABLED = False
+        config.INFLUENCE_REFRESH_ENABLED = False
+        config.FAST_PATH_ENABLED = False
+        # Room for one get_person_info action and observation per person, plus the answer
+        config.AGENT_MAX_ITERATIONS = max(config.AGENT_MAX_ITERATIONS, 2 * max(args.sizes) + 2)
+        # Every lookup goes to the graph, so the request counts show the query pattern
+        chatbot.query_cache.ttls.clear()
+        chatbot.query_cache.default_ttl = 0
+        await chatbot.initialize(llm=ScriptedReActLLM())
+
+        results = []
+        for size in args.sizes:
+            questions = ["Compare " + ", ".join(rng.sample(people, size)) for _ in range(args.questions)]
+            print(f"\n{size} people per question")
+            for mode in MODES:
+                row = await run_mode(chatbot, fake, mode, questions, args.concurrency, args.llm_latency)
+                row["people_per_question"] = size
+                results.append(row)
+                counts = f"llm {row['llm_calls_per_question']:>5}/q  graph {row['graph_requests_per_question']:>5}/q"
+                if row["errors"]:
+                    print(f"  FAIL  {mode:<27} {counts}  errors {row['errors']} of {row['questions']}")
+                else:
+                    print(f"  PASS  {mode:<27} {counts}  p50 {row['p50_ms']:>8} ms  p95 {row['p95_ms']:>8} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 1 if any(row["errors"] for row in results) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sequential, batched and parallel tool calls")
+    parser.add_argument("--people", type=int, default=5000)
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[2, 3, 5])
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    parser.add_argument("--graph-latency", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="")
+    sys.exit(asyncio.run(main(parser.parse_args())))
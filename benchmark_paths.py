@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark for the FindConnections path search.
+
+Generates social graphs with a skewed (power-law-like) popularity
+distribution at several sizes. It then times random person-to-person
+searches with the bidirectional BFS used by FindConnections against the
+one-sided BFS it replaces. Both run on the in-memory reference in
+path_search.py, so the numbers show how much of the graph each strategy
+touches; run the installed query against a loaded TigerGraph for
+absolute latencies.
+
+    python benchmark_paths.py --sizes 10000,100000,1000000 --pairs 200 --max-hops 6
+"""
+
+import json
+import math
+import time
+import argparse
+import statistics
+from typing import Dict, List, Any
+
+import numpy as np
+
+from path_search import CSRGraph, FRIENDS_WITH, WORKS_AT, FOLLOWS, bfs, bidirectional_bfs
+from generate_data import power_law_targets
+
+
+def generate_graph(num_vertices: int, rng: np.random.Generator, friends_per_person: float = 8.0,
+                   follows_per_person: float = 4.0, people_per_company: int = 200) -> Dict[str, Any]:
+    """People and companies totalling ``num_vertices``, with friendships, follows and one employer each"""
+    num_companies = max(1, num_vertices // (people_per_company + 1))
+    num_people = num_vertices - num_companies
+    people = np.arange(num_people, dtype=np.int32)
+
+    num_friendships = int(num_people * friends_per_person / 2)
+    friend_src = rng.integers(0, num_people, num_friendships, dtype=np.int32)
+    friend_dst = power_law_targets(rng, num_people, num_friendships, 0.8).astype(np.int32)
+    keep = friend_src != friend_dst
+
+    num_follows = int(num_people * follows_per_person)
+    follow_src = rng.integers(0, num_people, num_follows, dtype=np.int32)
+    follow_dst = power_law_targets(rng, num_people, num_follows, 1.1).astype(np.int32)
+    keep_follows = follow_src != follow_dst
+
+    employer = num_people + power_law_targets(rng, num_companies, num_people, 1.0).astype(np.int32)
+
+    graph = CSRGraph.from_edges(num_vertices, [
+        (friend_src[keep], friend_dst[keep], FRIENDS_WITH),
+        (follow_src[keep_follows], follow_dst[keep_follows], FOLLOWS),
+        (people, employer, WORKS_AT)
+    ])
+    return {"graph": graph, "people": num_people, "companies": num_companies}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
+
+
+def run_size(num_vertices: int, pairs: int, max_hops: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    generated = generate_graph(num_vertices, rng)
+    build_s = time.perf_counter() - start
+    graph = generated["graph"]
+    sources = rng.integers(0, generated["people"], pairs)
+    targets = rng.integers(0, generated["people"], pairs)
+
+    row = {
+        "vertices": num_vertices,
+        "people": generated["people"],
+        "companies": generated["companies"],
+        "edges": graph.num_edges // 2,
+        "build_s": round(build_s, 2),
+        "pairs": pairs,
+        "max_hops": max_hops
+    }
+    for name, search in (("bidirectional", bidirectional_bfs), ("one_sided", bfs)):
+        latencies, explored, hops = [], [], []
+        for source, target in zip(sources, targets):
+            begin = time.perf_counter()
+            result = search(graph, int(source), int(target), max_hops)
+            latencies.append((time.perf_counter() - begin) * 1000)
+            explored.append(result.explored)
+            if result.found:
+                hops.append(result.hops)
+        row[name] = {
+            "found": len(hops),
+            "avg_hops": round(statistics.mean(hops), 2) if hops else None,
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "avg_explored": round(statistics.mean(explored)),
+            "max_explored": max(explored)
+        }
+    # Both searches are exact, so they must agree on which pairs connect and how far apart they are
+    assert row["bidirectional"]["found"] == row["one_sided"]["found"]
+    return row
+
+
+def main(args):
+    results = {"config": vars(args), "runs": []}
+    for size in args.sizes:
+        row = run_size(size, args.pairs, args.max_hops, args.seed)
+        results["runs"].append(row)
+        bi, one = row["bidirectional"], row["one_sided"]
+        print(f"V={size:<9} E={row['edges']:<9} found {bi['found']}/{args.pairs} avg hops {bi['avg_hops']}")
+        print(f"   bidirectional  p50 {bi['p50_ms']:>9} ms  p95 {bi['p95_ms']:>9} ms  explored avg {bi['avg_explored']:>9}")
+        print(f"   one-sided      p50 {one['p50_ms']:>9} ms  p95 {one['p95_ms']:>9} ms  explored avg {one['avg_explored']:>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bidirectional vs one-sided path search")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--max-hops", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="")
+    main(parser.parse_args())
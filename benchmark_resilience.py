@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Fault-injection checks for the resilience layer.
+
+Runs the chatbot against the fake REST++ server and the scripted LLM,
+injects faults into both, and checks how the app behaves:
+- transient_errors: a quarter of graph requests fail with 503. Retries
+  hide every failure and the breaker stays closed.
+- hung_graph: every query hangs past the request timeout. Calls time
+  out, the breaker opens, and later calls fail fast. A person looked up
+  before the outage is still served from the stale cache.
+- graph_recovery: faults are cleared. After the reset timeout one probe
+  closes the breaker again.
+- llm_outage: every LLM call fails. The LLM breaker opens, so agent
+  chats fail immediately. Fast-path questions are still answered.
+- llm_hang: the LLM stalls past AGENT_TIMEOUT, and the chat errors
+  after the timeout instead of waiting.
+
+Three more check the connection pool on its own, against a second fake
+server that requires tokens:
+- pool_tokens: concurrent requests share one token. After the server
+  revokes every token, they get exactly one new one between them.
+- pool_exhausted: more concurrent requests than connections on a slow
+  server. The overflow fails with PoolExhausted after the checkout
+  timeout, and the pool never opens more than its size.
+- pool_discard: a request that times out discards its connection, and
+  the next requests succeed on a fresh one.
+
+Each scenario prints PASS or FAIL with its measurements. The exit status
+is non-zero if any scenario fails.
+
+    python benchmark_resilience.py
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable
+
+from graph_pool import GraphClient, GraphConnectionPool, PoolExhausted, TokenManager, restpp_url_for
+
+from fake_llm import ScriptedReActLLM, tool_react_script
+from fake_graph import InMemorySocialGraph
+from fake_tigergraph import FakeRestppServer
+
+
+async def timed(call) -> tuple:
+    start = time.perf_counter()
+    result = await call
+    return result, time.perf_counter() - start
+
+
+async def person_lookups(chatbot, people: List[str]) -> List[tuple]:
+    """``(status, seconds)`` of get_person_info for each person, one after another"""
+    results = []
+    for person in people:
+        (payload, _), seconds = await timed(chatbot.call_tool("get_person_info", {"person_id": person}, encode=False))
+        results.append((payload["status"], seconds))
+    return results
+
+
+async def transient_errors(chatbot, fake, llm, people, args) -> Dict[str, Any]:
+    fake.inject_faults(rate=0.25, status=503, paths=["query/"], seed=args.seed)
+    before = chatbot.tg_conn.stats()["retries"]
+    results = await person_lookups(chatbot, people[:20])
+    fake.clear_faults()
+    failed = sum(status != "success" for status, _ in results)
+    breaker = chatbot.tg_conn.breaker.stats()
+    return {
+        "passed": failed == 0 and breaker["state"] == "closed",
+        "lookups": len(results),
+        "failed": failed,
+        "faults_injected": fake.faults_injected,
+        "retries": chatbot.tg_conn.stats()["retries"] - before,
+        "breaker": breaker["state"]
+    }
+
+
+async def hung_graph(chatbot, fake, llm, people, args) -> Dict[str, Any]:
+    cached = people[20]
+    await person_lookups(chatbot, [cached])
+    # Let the cached entry expire, so only the stale fallback can answer it
+    await asyncio.sleep(chatbot.query_cache.default_ttl + 0.05)
+    fake.inject_faults(rate=1.0, status=200, hang=args.query_timeout * 4, paths=["query/"])
+    results = await person_lookups(chatbot, people[21:21 + args.breaker_threshold + 3])
+    breaker = chatbot.tg_conn.breaker.stats()
+    fast = results[args.breaker_threshold:]
+    stale_before = chatbot.query_cache.stats()["stale_served"]
+    (stale, _), stale_seconds = await timed(chatbot.call_tool("get_person_info", {"person_id": cached}, encode=False))
+    return {
+        "passed": (breaker["state"] == "open" and all(status == "error" for status, _ in results)
+                   and max(seconds for _, seconds in fast) < 0.1
+                   and stale["status"] == "success" and chatbot.query_cache.stats()["stale_served"] > stale_before),
+        "timed_out_ms": round(1000 * max(seconds for _, seconds in results[:args.breaker_threshold]), 1),
+        "fail_fast_ms": round(1000 * max(seconds for _, seconds in fast), 1),
+        "breaker": breaker["state"],
+        "rejected": breaker["rejected"],
+        "stale_status": stale["status"],
+        "stale_ms": round(1000 * stale_seconds, 1)
+    }
+
+
+async def graph_recovery(chatbot, fake, llm, people, args) -> Dict[str, Any]:
+    fake.clear_faults()
+    await asyncio.sleep(args.breaker_reset + 0.05)
+    results = await person_lookups(chatbot, people[40:42])
+    breaker = chatbot.tg_conn.breaker.stats()
+    return {
+        "passed": all(status == "success" for status, _ in results) and breaker["state"] == "closed",
+        "statuses": [status for status, _ in results],
+        "breaker": breaker["state"],
+        "trips": breaker["trips"]
+    }
+
+
+async def llm_outage(chatbot, fake, llm, people, args) -> Dict[str, Any]:
+    from app import config
+    llm.failure_rate = 1.0
+    config.FAST_PATH_ENABLED = False
+    results = []
+    for person in people[50:50 + args.breaker_threshold + 3]:
+        result, seconds = await timed(chatbot.chat(f"How is {person} connected to {people[0]}?"))
+        results.append((result["status"], seconds))
+    breaker = chatbot.llm_breaker.stats()
+    config.FAST_PATH_ENABLED = True
+    fast_path, _ = await timed(chatbot.chat(f"Tell me about {people[60]}"))
+    llm.failure_rate = 0.0
+    await asyncio.sleep(args.breaker_reset + 0.05)
+    config.FAST_PATH_ENABLED = False
+    recovered = await chatbot.chat(f"How is {people[61]} connected to {people[0]}?")
+    return {
+        "passed": (all(status == "error" for status, _ in results) and breaker["state"] == "open"
+                   and fast_path["status"] == "success" and recovered["status"] == "success"
+                   and chatbot.llm_breaker.state == "closed"),
+        "failed_chats": len(results),
+        "fail_fast_ms": round(1000 * max(seconds for _, seconds in results[args.breaker_threshold:]), 1),
+        "breaker_during": breaker["state"],
+        "fast_path": fast_path["status"],
+        "after_recovery": recovered["status"]
+    }
+
+
+async def llm_hang(chatbot, fake, llm, people, args) -> Dict[str, Any]:
+    from app import config
+    llm.hang = config.AGENT_TIMEOUT * 3
+    result, seconds = await timed(chatbot.chat(f"How is {people[70]} connected to {people[0]}?"))
+    llm.hang = 0.0
+    chatbot.llm_breaker.reset()
+    return {
+        "passed": result["status"] == "error" and seconds < config.AGENT_TIMEOUT + 0.5,
+        "status": result["status"],
+        "seconds": round(seconds, 2),
+        "agent_timeout": config.AGENT_TIMEOUT
+    }
+
+
+def token_pool(server: FakeRestppServer, size: int, checkout_timeout: float = 5.0,
+               timeout: float = 5.0) -> GraphConnectionPool:
+    """A bare pool (no breaker, no retries) against ``server``, authenticating with tokens"""
+    restpp_url = restpp_url_for(server.url)
+    tokens = TokenManager(restpp_url, server.graphname, secret=server.secret)
+    return GraphConnectionPool(lambda: GraphClient(restpp_url, server.graphname, token_manager=tokens, timeout=timeout),
+                               size=size, checkout_timeout=checkout_timeout, token_manager=tokens)
+
+
+def run_concurrently(calls: List[Callable[[], Any]]) -> List[Any]:
+    """Run ``calls`` on one thread each; each result is the return value or the exception raised"""
+    def attempt(call):
+        try:
+            return call()
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        return list(executor.map(attempt, calls))
+
+
+async def pool_tokens(chatbot, fake, llm, people, args) -> Dict[str, Any]:
+    with FakeRestppServer(secret="bench-secret", latency=0.01) as server:
+        pool = token_pool(server, size=8)
+        first = await asyncio.to_thread(run_concurrently, [pool.echo] * 16)
+        issued = server.request_counts.get("requesttoken", 0)
+        server.revoke_tokens()
+        second = await asyncio.to_thread(run_concurrently, [pool.echo] * 16)
+        reissued = server.request_counts.get("requesttoken", 0) - issued
+        stats = pool.stats()
+        pool.close()
+    failed = sum(isinstance(result, Exception) for result in first + second)
+    return {
+        "passed": failed == 0 and issued == 1 and reissued == 1 and stats["created"] <= 8,
+        "failed": failed,
+        "tokens_first": issued,
+        "tokens_after_revoke": reissued,
+        "connections": stats["created"]
+    }
+
+
+async def pool_exhausted(chatbot, fake, llm, people, args) -> Dict[str, Any]:
+    with FakeRestppServer(secret="bench-secret", latency=0.3) as server:
+        pool = token_pool(server, size=2, checkout_timeout=0.1)
+        start = time.perf_counter()
+        results = await asyncio.to_thread(run_concurrently, [pool.echo] * 6)
+        seconds = time.perf_counter() - start
+        stats = pool.stats()
+        pool.close()
+    exhausted = sum(isinstance(result, PoolExhausted) for result in results)
+    return {
+        "passed": exhausted == 4 and stats["exhausted"] == 4 and stats["created"] == 2 and seconds < 1.0,
+        "ok": sum(not isinstance(result, Exception) for result in results),
+        "exhausted": exhausted,
+        "connections": stats["created"],
+        "seconds": round(seconds, 2)
+    }
+
+
+async def pool_discard(chatbot, fake, llm, people, args) -> Dict[str, Any]:
+    with FakeRestppServer(secret="bench-secret") as server:
+        pool = token_pool(server, size=2, timeout=args.query_timeout)
+        pool.echo()
+        server.inject_faults(rate=1.0, status=200, hang=args.query_timeout * 3, paths=["echo"])
+        timed_out = await asyncio.to_thread(run_concurrently, [pool.echo])
+        server.clear_faults()
+        after = await asyncio.to_thread(run_concurrently, [pool.echo] * 4)
+        stats = pool.stats()
+        pool.close()
+    return {
+        "passed": isinstance(timed_out[0], Exception) and stats["discarded"] == 1
+                  and not any(isinstance(result, Exception) for result in after) and stats["in_use"] == 0,
+        "timeout": type(timed_out[0]).__name__,
+        "discarded": stats["discarded"],
+        "after": sum(not isinstance(result, Exception) for result in after),
+        "connections": stats["created"]
+    }
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "transient_errors": transient_errors,
+    "hung_graph": hung_graph,
+    "graph_recovery": graph_recovery,
+    "llm_outage": llm_outage,
+    "llm_hang": llm_hang,
+    "pool_tokens": pool_tokens,
+    "pool_exhausted": pool_exhausted,
+    "pool_discard": pool_discard
+}
+
+
+async def main(args) -> int:
+    from app import chatbot, config
+
+    graph = InMemorySocialGraph.generate(args.people, seed=args.seed)
+    people = graph.sample_ids("person", 100, args.seed)
+    llm = ScriptedReActLLM(script=tool_react_script)
+
+    with graph.register(FakeRestppServer(latency=0.002)) as fake:
+        config.TIGERGRAPH_HOST = fake.url
+        config.TIGERGRAPH_QUERY_TIMEOUT = args.query_timeout
+        config.TIGERGRAPH_QUERY_TIMEOUTS = ""
+        config.GRAPH_RETRY_ATTEMPTS = 4
+        config.GRAPH_RETRY_BASE_DELAY = 0.01
+        config.GRAPH_BREAKER_THRESHOLD = args.breaker_threshold
+        config.GRAPH_BREAKER_RESET = args.breaker_reset
+        config.AGENT_TIMEOUT = args.agent_timeout
+        config.AGENT_VERBOSE = False
+        config.SEMANTIC_CACHE_ENABLED = False
+        config.INFLUENCE_REFRESH_ENABLED = False
+        config.STARTUP_WARMUP = False
+        config.SINGLE_FLIGHT_ENABLED = False
+        chatbot.query_cache.ttls.clear()
+        chatbot.query_cache.default_ttl = 0.2
+        chatbot.llm_breaker.failure_threshold = args.breaker_threshold
+        chatbot.llm_breaker.reset_timeout = args.breaker_reset
+        await chatbot.initialize(llm=llm)
+
+        failures = 0
+        for name in args.scenarios:
+            result = await SCENARIOS[name](chatbot, fake, llm, people, args)
+            passed = result.pop("passed")
+            failures += not passed
+            details = "  ".join(f"{key}={value}" for key, value in result.items())
+            print(f"{'PASS' if passed else 'FAIL'}  {name:<17} {details}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fault-injection checks for timeouts, retries and circuit breakers")
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS))
+    parser.add_argument("--query-timeout", type=float, default=0.3)
+    parser.add_argument("--agent-timeout", type=float, default=1.0)
+    parser.add_argument("--breaker-threshold", type=int, default=3)
+    parser.add_argument("--breaker-reset", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(asyncio.run(main(parser.parse_args())))
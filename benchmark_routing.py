@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Latency, cost and answers with LLM calls routed between two deployments.
+
+A mixed workload is answered by the ReAct agent with two scripted LLMs
+standing in for the deployments: a fast, cheap "small" one and a slow,
+expensive "large" one. Both follow the same script, so routing must not
+change any answer. The workload has one-step questions (a person, a
+path, a company, influencers, network statistics) and "Compare a, b, c"
+questions that take one tool call per person. Scenarios:
+- large_only: LLM_ROUTING=large, every call on the large deployment
+- tiered: easy steps on the small deployment, later steps of the compare
+  questions on the large one
+- flaky_small: as tiered, but a share of small calls fail; they are
+  retried on the large deployment, and once the small breaker opens calls
+  skip it
+- garbled_small: as tiered, but a share of small replies cannot be parsed
+  as ReAct; they are rejected and retried on the large deployment
+
+Each scenario prints PASS or FAIL with its latency, calls and cost per
+deployment. Tiered scenarios must answer every question exactly like
+large_only; tiered must also be cheaper and faster. The exit status is
+non-zero if any scenario fails.
+
+    python benchmark_routing.py --questions 60 --small-latency 0.02 --large-latency 0.2
+"""
+
+import sys
+import math
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List, Any, Callable, Sequence
+
+from fake_llm import ScriptedReActLLM, tool_react_script, compare_react_script
+from fake_graph import InMemorySocialGraph
+from fake_tigergraph import FakeRestppServer
+
+SCENARIOS = ["large_only", "tiered", "flaky_small", "garbled_small"]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
+
+
+def workload_script(garble_rate: float = 0.0, seed: int = 0) -> Callable[[Sequence[Any]], str]:
+    """tool_react_script, with compare questions stepping through people one at a time
+
+    ``garble_rate`` of replies lose their Action/Answer line, as a weaker model sometimes does.
+    """
+    compare = compare_react_script(batched=False)
+    rng = random.Random(seed)
+
+    def script(messages) -> str:
+        questions = [m.content or "" for m in messages if m.role == "user" and not (m.content or "").startswith("Observation:")]
+        reply = compare(messages) if questions and questions[-1].startswith("Compare") else tool_react_script(messages)
+        if garble_rate and rng.random() < garble_rate:
+            return reply.split("\n", 1)[0]
+        return reply
+
+    return script
+
+
+def make_questions(graph: InMemorySocialGraph, count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    people = graph.sample_ids("person", 500, seed)
+    companies = [company["name"] for company in graph.companies.values()]
+    kinds = [
+        lambda: f"Tell me about {rng.choice(people)}",
+        lambda: f"How is {rng.choice(people)} connected to {rng.choice(people)}?",
+        lambda: f"Who works at {rng.choice(companies)}?",
+        lambda: f"Who are the top {rng.randint(3, 10)} influencers?",
+        lambda: "What are the network statistics?",
+        lambda: "Compare " + ", ".join(rng.sample(people, 3))
+    ]
+    return [kinds[i % len(kinds)]() for i in range(count)]
+
+
+async def run_scenario(chatbot, config, name: str, questions: List[str], args) -> Dict[str, Any]:
+    small = ScriptedReActLLM(model_name="small", latency=args.small_latency,
+                             script=workload_script(args.garble_rate if name == "garbled_small" else 0.0, args.seed),
+                             failure_rate=args.failure_rate if name == "flaky_small" else 0.0)
+    large = ScriptedReActLLM(model_name="large", latency=args.large_latency, script=workload_script())
+    config.LLM_ROUTING = "large" if name == "large_only" else "tiered"
+    chatbot.llm = chatbot._route_llm(large, small)
+    chatbot.llm_breaker.reset()
+
+    latencies, answers, errors = [], [], 0
+    for question in questions:
+        start = time.perf_counter()
+        result = await chatbot.chat(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+        answers.append(result.get("response"))
+        errors += result["status"] != "success"
+    stats = chatbot.llm_router.stats()
+    return {
+        "answers": answers,
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "small_calls": stats["deployments"]["small"]["calls"],
+        "large_calls": stats["deployments"]["large"]["calls"],
+        "fallbacks": stats["fallbacks"],
+        "rejected": stats["deployments"]["small"]["rejected_replies"],
+        "cost": stats["cost"],
+        "reasons": stats["reasons"]
+    }
+
+
+async def main(args) -> int:
+    from app import chatbot, config
+
+    graph = InMemorySocialGraph.generate(args.people, seed=args.seed)
+    questions = make_questions(graph, args.questions, args.seed)
+
+    with graph.register(FakeRestppServer()) as fake:
+        config.TIGERGRAPH_HOST = fake.url
+        config.AGENT_VERBOSE = False
+        config.FAST_PATH_ENABLED = False
+        config.SEMANTIC_CACHE_ENABLED = False
+        config.INFLUENCE_REFRESH_ENABLED = False
+        config.STARTUP_WARMUP = False
+        config.LLM_ROUTING = "tiered"
+        config.LLM_SMALL_BREAKER_THRESHOLD = args.breaker_threshold
+        await chatbot.initialize(llm=ScriptedReActLLM(script=workload_script()),
+                                 small_llm=ScriptedReActLLM(script=workload_script()))
+
+        failures, results = 0, {}
+        for name in args.scenarios:
+            result = results[name] = await run_scenario(chatbot, config, name, questions, args)
+            baseline = results.get("large_only")
+            same = baseline is None or result["answers"] == baseline["answers"]
+            passed = result["errors"] == 0 and same
+            if name == "tiered" and baseline is not None:
+                passed = passed and result["cost"] < baseline["cost"] and result["p50_ms"] < baseline["p50_ms"]
+            if name == "tiered":
+                passed = passed and result["reasons"].get("large:multi_step", 0) > 0
+            if name in ("flaky_small", "garbled_small"):
+                passed = passed and result["fallbacks"] > 0
+            failures += not passed
+            print(f"{'PASS' if passed else 'FAIL'}  {name:<14} p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                  f"small={result['small_calls']} large={result['large_calls']} fallbacks={result['fallbacks']} "
+                  f"rejected={result['rejected']} cost=${result['cost']:.4f} errors={result['errors']} same_answers={same}")
+            print(f"      reasons {result['reasons']}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare large-only and tiered LLM routing on a mixed workload")
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=60)
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=SCENARIOS)
+    parser.add_argument("--small-latency", type=float, default=0.02)
+    parser.add_argument("--large-latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.3)
+    parser.add_argument("--garble-rate", type=float, default=0.3)
+    parser.add_argument("--breaker-threshold", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Benchmark and consistency check for the social graph snapshot.
+
+Serves a generated graph from the fake REST++ server, then:
+- times the full build through SocialAdjacency pages, the save, and the
+  memory-mapped reload
+- times k-hop expansion, mutual friends and friend suggestions on random
+  people, and checks every answer against a plain-Python computation
+  over the fake graph's adjacency sets
+- edits the graph (new and removed friendships and follows, a new
+  person, a deleted person), queues the touched people, applies a delta
+  refresh, and checks it matches a full rebuild exactly
+
+The exit status is non-zero if any check fails.
+
+    python benchmark_snapshot.py --people 20000 --samples 200
+"""
+
+import sys
+import math
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+from collections import Counter
+from typing import Dict, List, Any, Set
+
+import numpy as np
+
+from fake_graph import InMemorySocialGraph
+from fake_tigergraph import FakeRestppServer
+from graph_pool import GraphConnectionPool, GraphClient, restpp_url_for
+from social_snapshot import SocialGraphSnapshot
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
+
+
+def timings(values: List[float]) -> str:
+    ms = [v * 1000 for v in values]
+    return f"p50={statistics.median(ms):.3f}ms p95={percentile(ms, 0.95):.3f}ms"
+
+
+def make_snapshot(pool: GraphConnectionPool, path: str, page_size: int) -> SocialGraphSnapshot:
+    def loader(after_id: str, size: int) -> List[Dict[str, Any]]:
+        result = pool.runInstalledQuery("SocialAdjacency", {"after_id": after_id, "page_size": size})
+        return sorted((row["attributes"] for row in result[0]["people"]), key=lambda row: row["id"])
+
+    def fetch_people(ids: List[str]) -> List[Dict[str, Any]]:
+        result = pool.runInstalledQuery("PeopleAdjacency", {"person_ids": ids}, usePost=True)
+        return [row["attributes"] for row in result[0]["people"]]
+
+    return SocialGraphSnapshot(loader, fetch_people, page_size=page_size, path=path)
+
+
+def expected_neighbourhood(graph: InMemorySocialGraph, person: str, hops: int) -> List[int]:
+    seen, frontier, counts = {person}, {person}, []
+    for _ in range(hops):
+        frontier = {friend for p in frontier for friend in graph.friends[p]} - seen
+        if not frontier:
+            break
+        seen |= frontier
+        counts.append(len(frontier))
+    return counts
+
+
+def expected_suggestions(graph: InMemorySocialGraph, person: str, top_k: int) -> List[tuple]:
+    friends = graph.friends[person]
+    mutual = Counter(fof for friend in friends for fof in graph.friends[friend] if fof != person and fof not in friends)
+    return sorted(mutual.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+
+
+def check_queries(snapshot: SocialGraphSnapshot, graph: InMemorySocialGraph, people: List[str],
+                  hops: int) -> Dict[str, Any]:
+    times: Dict[str, List[float]] = {"khop": [], "mutual": [], "suggest": []}
+    mismatches = 0
+    for a, b in zip(people, people[1:] + people[:1]):
+        start = time.perf_counter()
+        result = snapshot.neighbourhood(a, hops=hops)
+        times["khop"].append(time.perf_counter() - start)
+        mismatches += [level["count"] for level in result["levels"]] != expected_neighbourhood(graph, a, hops)
+
+        start = time.perf_counter()
+        result = snapshot.mutual_friends(a, b, limit=1000)
+        times["mutual"].append(time.perf_counter() - start)
+        mismatches += result["people"] != sorted(graph.friends[a] & graph.friends[b])
+
+        start = time.perf_counter()
+        result = snapshot.suggest_friends(a, top_k=10)
+        times["suggest"].append(time.perf_counter() - start)
+        mismatches += [(s["id"], s["mutual_friends"]) for s in result] != expected_suggestions(graph, a, 10)
+    return {"mismatches": mismatches, **{name: timings(values) for name, values in times.items()}}
+
+
+def edit_graph(graph: InMemorySocialGraph, rng: random.Random, edits: int) -> Set[str]:
+    """Random friendship/follow additions and removals, one new and one deleted person; returns touched people"""
+    people = graph.sorted_people
+    touched: Set[str] = set()
+    for _ in range(edits):
+        a, b = rng.sample(people, 2)
+        if rng.random() < 0.5:
+            graph.friends[a].symmetric_difference_update({b})
+            graph.friends[b].symmetric_difference_update({a})
+        else:
+            graph.follows[a].symmetric_difference_update({b})
+        touched |= {a, b}
+
+    newcomer = people[-1] + "_new"
+    graph.people[newcomer] = dict(graph.people[people[0]])
+    graph.friends[newcomer], graph.follows[newcomer] = {people[0]}, {people[1]}
+    graph.friends[people[0]].add(newcomer)
+    touched |= {newcomer, people[0]}
+
+    gone = rng.choice(people[1:-1])
+    for friend in graph.friends.pop(gone):
+        graph.friends[friend].discard(gone)
+        touched.add(friend)
+    for follower, followed in graph.follows.items():
+        if gone in followed:
+            followed.discard(gone)
+            touched.add(follower)
+    del graph.follows[gone], graph.people[gone]
+    touched.add(gone)
+    graph.sorted_people = sorted(graph.people)
+    return touched
+
+
+def same_edges(a: SocialGraphSnapshot, b: SocialGraphSnapshot) -> bool:
+    """Equal friendships and follows by person ID (a delta keeps deleted people as rows without edges)"""
+    def edges(snapshot: SocialGraphSnapshot) -> tuple:
+        graph = snapshot._graph
+        return ({tuple(pair) for pair in graph.ids[np.asarray(graph.friends)].tolist()},
+                {tuple(pair) for pair in graph.ids[np.asarray(graph.follows)].tolist()})
+    return edges(a) == edges(b)
+
+
+def main(args) -> int:
+    graph = InMemorySocialGraph.generate(args.people, seed=args.seed)
+    people = graph.sample_ids("person", args.samples, args.seed)
+    directory = tempfile.mkdtemp(prefix="social_snapshot_")
+    failures = 0
+    try:
+        with graph.register(FakeRestppServer(), vertices=False) as fake:
+            pool = GraphConnectionPool(lambda: GraphClient(restpp_url_for(fake.url), "SocialNetwork"), size=2)
+            snapshot = make_snapshot(pool, directory, args.page_size)
+
+            start = time.perf_counter()
+            snapshot.rebuild()
+            build = time.perf_counter() - start
+            stats = snapshot.stats()
+            print(f"build    {build * 1000:8.1f} ms  people={stats['people']} friendships={stats['friendships']} "
+                  f"follows={stats['follows']} bytes={stats['bytes']} requests={fake.request_counts.get('query/SocialAdjacency', 0)}")
+
+            reloaded = make_snapshot(pool, directory, args.page_size)
+            start = time.perf_counter()
+            loaded = reloaded.load()
+            print(f"reload   {(time.perf_counter() - start) * 1000:8.1f} ms  memory-mapped={loaded}")
+
+            for name, candidate in (("built", snapshot), ("reloaded", reloaded)):
+                result = check_queries(candidate, graph, people, args.hops)
+                passed = not result.pop("mismatches") and loaded
+                failures += not passed
+                print(f"{'PASS' if passed else 'FAIL'}  queries ({name})  " +
+                      "  ".join(f"{key} {value}" for key, value in result.items()))
+
+            touched = edit_graph(graph, random.Random(args.seed), args.edits)
+            snapshot.mark_changed(touched)
+            start = time.perf_counter()
+            refetched = snapshot.refresh()
+            delta = time.perf_counter() - start
+            full = make_snapshot(pool, "", args.page_size)
+            full.rebuild()
+            consistent = same_edges(snapshot, full)
+            failures += not consistent
+            print(f"{'PASS' if consistent else 'FAIL'}  delta refresh {delta * 1000:.1f} ms for {refetched} people "
+                  f"(full rebuild {build * 1000:.1f} ms), matches a rebuild: {consistent}")
+
+            result = check_queries(snapshot, graph, [p for p in people if p in graph.people], args.hops)
+            mismatches = result.pop("mismatches")
+            failures += bool(mismatches)
+            print(f"{'PASS' if not mismatches else 'FAIL'}  queries (after delta)  " +
+                  "  ".join(f"{key} {value}" for key, value in result.items()))
+            pool.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the in-process social graph snapshot")
+    parser.add_argument("--people", type=int, default=20000)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--hops", type=int, default=3)
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Offline end-to-end benchmark for /api/chat.
+
+Runs the full chat path (ASGI app, agent, tools, result encoding, REST++
+client and pool) with no external services:
+- the graph is a generated SocialNetwork held by fake_graph.py behind
+  the fake REST++ server, which answers all five chatbot queries;
+- the LLM is ScriptedReActLLM with a fixed ReAct trace for each
+  question type.
+
+A mix of person, connection, employee, influencer and analytics
+questions is sent at each concurrency level. Each run records:
+- latency percentiles, overall and per question type;
+- throughput;
+- LLM calls and agent tool calls;
+- graph requests;
+- bytes exchanged with REST++, sent to the LLM as tool results, and
+  returned to clients.
+
+Results are written as JSON. --compare prints the change against an
+earlier results file.
+
+    python benchmark_suite.py --people 10000 --levels 1,8,32 --output bench.json
+    python benchmark_suite.py --output new.json --compare bench.json
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+import statistics
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Tuple
+
+import httpx
+
+from fake_llm import ScriptedReActLLM, tool_react_script
+from fake_graph import InMemorySocialGraph
+from fake_tigergraph import FakeRestppServer
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """Parse a ``kind=weight,kind=weight`` question mix"""
+    return {kind.strip(): int(weight) for kind, weight in (item.split("=", 1) for item in spec.split(",") if "=" in item)}
+
+
+def build_questions(graph: InMemorySocialGraph, mix: Dict[str, int], count: int, seed: int) -> List[Tuple[str, str]]:
+    """``count`` (kind, question) pairs drawn from the mix"""
+    rng = random.Random(seed)
+    people = graph.sample_ids("person", 2 * count, seed)
+    companies = graph.sample_ids("company", count, seed)
+    templates = {
+        "person": lambda i: f"Tell me about {people[i]}",
+        "connections": lambda i: f"How is {people[i]} connected to {people[count + i]}?",
+        "employees": lambda i: f"Who works at {companies[i]}?",
+        "influencers": lambda i: f"Who are the top {rng.choice([5, 10, 20])} influencers?",
+        "analytics": lambda i: "Give me an overview of the social network"
+    }
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    return [(kind, templates[kind](i)) for i, kind in enumerate(kinds)]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)] if ordered else 0.0
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(latencies),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else 0.0,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1) if latencies else 0.0
+    }
+
+
+def counters(chatbot, llm: ScriptedReActLLM, fake: FakeRestppServer) -> Dict[str, int]:
+    encoded = chatbot.result_encoder.stats()
+    return {
+        "llm_calls": llm.calls,
+        "tool_calls": encoded["calls"],
+        "tool_result_tokens": encoded["tokens"],
+        "graph_requests": sum(count for key, count in fake.request_counts.items() if key.startswith("query/")),
+        "restpp_bytes": fake.bytes_sent
+    }
+
+
+async def run_level(client: httpx.AsyncClient, questions: List[Tuple[str, str]], concurrency: int,
+                    requests_per_worker: int) -> Dict[str, Any]:
+    per_kind: Dict[str, List[float]] = {}
+    latencies: List[float] = []
+    errors = 0
+    request_bytes = response_bytes = 0
+
+    async def worker(worker_id: int):
+        nonlocal errors, request_bytes, response_bytes
+        for i in range(requests_per_worker):
+            kind, message = questions[(worker_id * requests_per_worker + i) % len(questions)]
+            body = json.dumps({"message": message}).encode("utf-8")
+            start = time.perf_counter()
+            response = await client.post("/api/chat", content=body, headers={"Content-Type": "application/json"})
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            per_kind.setdefault(kind, []).append(elapsed)
+            request_bytes += len(body)
+            response_bytes += len(response.content)
+            if response.status_code != 200 or response.json().get("status") != "success":
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        **{k: v for k, v in summarize(latencies).items() if k != "count"},
+        "per_kind": {kind: summarize(values) for kind, values in sorted(per_kind.items())},
+        "request_bytes": request_bytes,
+        "response_bytes": response_bytes
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def compare(results: Dict[str, Any], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {run["concurrency"]: run for run in json.load(f)["runs"]}
+    print(f"\nChange against {baseline_path}:")
+    for run in results["runs"]:
+        before = baseline.get(run["concurrency"])
+        if not before:
+            continue
+        deltas = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "restpp_bytes_per_request", "llm_calls_per_request"):
+            if before.get(key):
+                deltas.append(f"{key} {100 * (run[key] - before[key]) / before[key]:+.1f}%")
+        print(f"  c={run['concurrency']:<4} " + "  ".join(deltas))
+
+
+async def main(args):
+    from app import chatbot, config
+    from asgi import application
+
+    start = time.perf_counter()
+    graph = InMemorySocialGraph.generate(args.people, seed=args.seed)
+    print(f"Generated {len(graph.people):,} people, {len(graph.companies):,} companies, "
+          f"{sum(graph.edge_counts.values()):,} edges in {time.perf_counter() - start:.1f}s")
+    questions = build_questions(graph, parse_mix(args.mix), args.questions, args.seed)
+    llm = ScriptedReActLLM(latency=args.llm_latency, script=tool_react_script)
+
+    with graph.register(FakeRestppServer(latency=args.graph_latency)) as fake:
+        config.TIGERGRAPH_HOST = fake.url
+        config.AGENT_VERBOSE = False
+        config.SEMANTIC_CACHE_ENABLED = False
+        config.INFLUENCE_REFRESH_ENABLED = False
+        # Every request comes from one client, so per-client rate limits would reject most of them
+        chatbot.admission.client_rate = 0
+        config.FAST_PATH_ENABLED = args.fast_path
+        if not args.query_cache:
+            chatbot.query_cache.ttls.clear()
+            chatbot.query_cache.default_ttl = 0
+        await chatbot.initialize(llm=llm)
+
+        results = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "git_commit": git_commit(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform()
+            },
+            "config": vars(args),
+            "graph": {"people": len(graph.people), "companies": len(graph.companies), "edges": graph.edge_counts},
+            "runs": []
+        }
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for level in args.levels:
+                before = counters(chatbot, llm, fake)
+                run = await run_level(client, questions, level, args.requests_per_worker)
+                after = counters(chatbot, llm, fake)
+                for key in before:
+                    run[key] = after[key] - before[key]
+                for key in ("llm_calls", "tool_calls", "graph_requests", "restpp_bytes"):
+                    run[f"{key}_per_request"] = round(run[key] / run["requests"], 2)
+                results["runs"].append(run)
+                print(f"c={level:<4} {run['throughput_rps']:>8} req/s  p50 {run['p50_ms']:>8} ms  "
+                      f"p95 {run['p95_ms']:>8} ms  p99 {run['p99_ms']:>8} ms  "
+                      f"llm {run['llm_calls_per_request']:>5}/req  tools {run['tool_calls_per_request']:>5}/req  "
+                      f"restpp {run['restpp_bytes_per_request']:>9,.0f} B/req  errors {run['errors']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of /api/chat")
+    parser.add_argument("--people", type=int, default=10_000)
+    parser.add_argument("--levels", type=lambda s: [int(x) for x in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests-per-worker", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--mix", default="person=4,connections=2,employees=2,influencers=1,analytics=1")
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--graph-latency", type=float, default=0.0)
+    parser.add_argument("--fast-path", action="store_true", help="let the intent router answer simple questions")
+    parser.add_argument("--query-cache", action="store_true", help="keep the installed-query result cache on")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="")
+    parser.add_argument("--compare", default="", help="earlier results file to compare against")
+    asyncio.run(main(parser.parse_args()))
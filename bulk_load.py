@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Chunked, parallel bulk upsert of generate_data.py CSVs into TigerGraph.
+
+Each CSV is read as a stream and cut into batches of --batch-size rows.
+The batches are upserted through REST++ (upsertVertices/upsertEdges) on
+--workers threads that share one connection pool. At most
+2 x --workers batches are in flight, so memory stays bounded however
+large the files are. Vertex files are loaded before edge files. Rows per
+second is reported per file and overall.
+
+    python bulk_load.py --data data/ --batch-size 5000 --workers 8
+    python bulk_load.py --data data/ --fake       # against an in-process fake REST++ server
+
+For the largest graphs, loading_job.gsql loads the same files with a
+GSQL loading job on the server instead.
+"""
+
+import os
+import csv
+import json
+import time
+import types
+import argparse
+import itertools
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Iterator, Tuple
+
+import requests
+
+from graph_pool import GraphConnectionPool
+from generate_data import TABLES
+
+LOAD_ORDER = ["cities.csv", "companies.csv", "people.csv", "works_at.csv", "located_in.csv",
+              "friends_with.csv", "follows.csv", "partners_with.csv"]
+
+
+def _convert(value: str, kind: type) -> Any:
+    if kind is bool:
+        return value.strip().lower() in ("true", "1", "yes")
+    return kind(value) if kind is not str else value
+
+
+def read_batches(path: str, columns: Dict[str, type], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Typed rows of a CSV, ``batch_size`` at a time"""
+    with open(path, newline="") as f:
+        rows = ({name: _convert(row[name], kind) for name, kind in columns.items()} for row in csv.DictReader(f))
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+def upsert_batch(pool: GraphConnectionPool, table: Dict[str, Any], batch: List[Dict[str, Any]]) -> int:
+    """Upsert one batch; returns how many rows were accepted"""
+    if "vertex" in table:
+        vertices = [(row.pop("id"), row) for row in batch]
+        return pool.upsertVertices(table["vertex"], vertices)
+    source_type, edge_type, target_type = table["edge"]
+    if source_type is None:
+        # Mixed source types (LOCATED_IN from Person or Company): one upsert per type
+        groups: Dict[str, List[Tuple[str, str, Dict[str, Any]]]] = {}
+        for row in batch:
+            groups.setdefault(row.pop("from_type"), []).append((row.pop("from_id"), row.pop("to_id"), row))
+        return sum(pool.upsertEdges(source, edge_type, target_type, edges) for source, edges in groups.items())
+    edges = [(row.pop("from_id"), row.pop("to_id"), row) for row in batch]
+    return pool.upsertEdges(source_type, edge_type, target_type, edges)
+
+
+def load_file(pool: GraphConnectionPool, executor: ThreadPoolExecutor, path: str, table: Dict[str, Any],
+              batch_size: int, max_in_flight: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    rows = accepted = batches = 0
+    in_flight = set()
+    for batch in read_batches(path, table["columns"], batch_size):
+        rows += len(batch)
+        batches += 1
+        in_flight.add(executor.submit(upsert_batch, pool, table, batch))
+        if len(in_flight) >= max_in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            accepted += sum(future.result() for future in done)
+    accepted += sum(future.result() for future in in_flight)
+    elapsed = time.perf_counter() - start
+    return {
+        "file": os.path.basename(path),
+        "rows": rows,
+        "accepted": accepted,
+        "batches": batches,
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed) if elapsed else rows
+    }
+
+
+def make_pool(args) -> GraphConnectionPool:
+    settings = types.SimpleNamespace(
+        TIGERGRAPH_HOST=args.host, TIGERGRAPH_RESTPP_PORT=args.restpp_port, TIGERGRAPH_GRAPH_NAME=args.graph,
+        TIGERGRAPH_USERNAME=args.username, TIGERGRAPH_PASSWORD=args.password, TIGERGRAPH_SECRET=args.secret,
+        TIGERGRAPH_TOKEN_LIFETIME=86400, TIGERGRAPH_QUERY_TIMEOUT=args.timeout,
+        TIGERGRAPH_POOL_SIZE=args.workers, TIGERGRAPH_POOL_TIMEOUT=args.timeout,
+        # Upserts are never retried; a failed batch fails the load instead of tripping a breaker
+        GRAPH_BREAKER_THRESHOLD=0, GRAPH_BREAKER_RESET=0, GRAPH_RETRY_ATTEMPTS=1,
+        GRAPH_RETRY_BASE_DELAY=0, GRAPH_RETRY_MAX_DELAY=0, GRAPH_NO_RETRY_QUERIES=""
+    )
+    return GraphConnectionPool.from_config(settings)
+
+
+def run(args) -> Dict[str, Any]:
+    pool = make_pool(args)
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("password", "secret")}, "files": []}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="bulk-load") as executor:
+        for filename in LOAD_ORDER:
+            path = os.path.join(args.data, filename)
+            if not os.path.exists(path):
+                continue
+            row = load_file(pool, executor, path, TABLES[filename], args.batch_size, 2 * args.workers)
+            report["files"].append(row)
+            print(f"  {row['file']:<18} {row['rows']:>12,} rows {row['accepted']:>12,} accepted "
+                  f"{row['seconds']:>8.2f}s {row['rows_per_s']:>10,} rows/s")
+    elapsed = time.perf_counter() - start
+    total = sum(row["rows"] for row in report["files"])
+    report["total"] = {"rows": total, "seconds": round(elapsed, 2), "rows_per_s": round(total / elapsed) if elapsed else total}
+    report["pool"] = pool.stats()
+    pool.close()
+    print(f"Loaded {total:,} rows in {elapsed:.1f}s ({report['total']['rows_per_s']:,} rows/s)")
+
+    if args.invalidate_url:
+        # Let a running chatbot drop cached results and rebuild its derived data
+        requests.post(args.invalidate_url, json={}, timeout=10).raise_for_status()
+        print(f"Invalidated caches at {args.invalidate_url}")
+    return report
+
+
+def main(args):
+    if args.fake:
+        from fake_tigergraph import FakeRestppServer
+
+        with FakeRestppServer(graphname=args.graph, latency=args.fake_latency) as fake:
+            args.host, args.secret = fake.url, ""
+            report = run(args)
+            report["fake_server"] = {"vertices": {t: len(v) for t, v in fake.vertices.items()},
+                                     "edges": dict(fake.edge_counts)}
+    else:
+        report = run(args)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk upsert generated SocialNetwork CSVs into TigerGraph")
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--host", default=os.getenv("TIGERGRAPH_HOST", "http://localhost"))
+    parser.add_argument("--restpp-port", default=os.getenv("TIGERGRAPH_RESTPP_PORT", "9000"))
+    parser.add_argument("--graph", default=os.getenv("TIGERGRAPH_GRAPH_NAME", "SocialNetwork"))
+    parser.add_argument("--username", default=os.getenv("TIGERGRAPH_USERNAME", "tigergraph"))
+    parser.add_argument("--password", default=os.getenv("TIGERGRAPH_PASSWORD", "tigergraph"))
+    parser.add_argument("--secret", default=os.getenv("TIGERGRAPH_SECRET", ""))
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--invalidate-url", default="", help="e.g. http://localhost:5000/api/cache/invalidate")
+    parser.add_argument("--fake", action="store_true", help="load into an in-process fake REST++ server")
+    parser.add_argument("--fake-latency", type=float, default=0.0)
+    parser.add_argument("--output", default="")
+    main(parser.parse_args())
@@ -0,0 +1,34 @@
+from typing import List, Optional
+
+from llama_index.core.base.llms.types import ChatMessage
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.memory import ChatSummaryMemoryBuffer
+
+
+class SessionMemory(ChatSummaryMemoryBuffer):
+    """Chat memory for one session, kept within ``token_limit`` tokens.
+
+    Recent messages are kept verbatim. Older ones are folded into a single
+    summary message by the LLM, or dropped when no LLM is set. Call
+    ``compact()`` off the event loop after each turn. The agent's own
+    ``get()`` then always finds the history within budget and never has
+    to summarize in the middle of a request.
+    """
+
+    _summaries: int = PrivateAttr(default=0)
+
+    @property
+    def summaries(self) -> int:
+        return self._summaries
+
+    def _summarize_oldest_chat_history(self, chat_history_to_be_summarized: List[ChatMessage]) -> ChatMessage:
+        self._summaries += 1
+        return super()._summarize_oldest_chat_history(chat_history_to_be_summarized)
+
+    def compact(self) -> int:
+        """Summarize or trim the history down to the token budget; returns its token count"""
+        return self.token_count(self.get())
+
+    def token_count(self, messages: Optional[List[ChatMessage]] = None) -> int:
+        messages = self.get_all() if messages is None else messages
+        return sum(self._token_count_for_messages([message]) for message in messages)
@@ -0,0 +1,85 @@
+import time
+import difflib
+import logging
+import threading
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_name(name: str) -> str:
+    return " ".join((name or "").lower().split())
+
+
+class CompanyDirectory:
+    """Company name -> vertex ID map.
+
+    Lets GetCompanyEmployees start from the company vertex instead of
+    scanning every Company for a matching name. ``loader()`` yields dicts
+    with ``id`` and ``name`` (e.g. the ListCompanies pages). Names match
+    case- and whitespace-insensitively; if two companies share a name, the
+    lower ID wins. A name that is not found triggers a reload, at most
+    once every ``min_reload_interval`` seconds, so new companies are
+    picked up without a reload on every typo.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[Dict[str, Any]]], min_reload_interval: float = 30.0):
+        self.loader = loader
+        self.min_reload_interval = min_reload_interval
+        self._ids: Dict[str, str] = {}
+        self._names: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.last_load = 0.0
+        self.stats_counters = {"lookups": 0, "misses": 0, "loads": 0}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def load(self) -> int:
+        """Reload every company; returns how many there are"""
+        with self._lock:
+            ids: Dict[str, str] = {}
+            names: Dict[str, str] = {}
+            for company in self.loader():
+                company_id, name = str(company["id"]), company.get("name", "")
+                names[company_id] = name
+                ids.setdefault(normalize_name(name), company_id)
+            self._ids, self._names = ids, names
+            self.last_load = time.time()
+            self.stats_counters["loads"] += 1
+            logger.info(f"Company directory loaded with {len(names)} companies")
+            return len(names)
+
+    def names(self) -> List[str]:
+        return list(self._names.values())
+
+    def name_of(self, company_id: str) -> str:
+        return self._names.get(company_id, "")
+
+    def _find(self, name_or_id: str) -> Optional[str]:
+        if name_or_id in self._names:
+            return name_or_id
+        return self._ids.get(normalize_name(name_or_id))
+
+    def resolve(self, name_or_id: str) -> Optional[str]:
+        """Vertex ID for a company name (or an ID passed as is), None if there is no such company"""
+        self.stats_counters["lookups"] += 1
+        company_id = self._find(name_or_id)
+        if company_id is None and time.time() - self.last_load > self.min_reload_interval:
+            self.load()
+            company_id = self._find(name_or_id)
+        if company_id is None:
+            self.stats_counters["misses"] += 1
+        return company_id
+
+    def suggest(self, name: str, n: int = 3) -> List[str]:
+        """Known company names closest to ``name``"""
+        matches = difflib.get_close_matches(normalize_name(name), list(self._ids), n=n, cutoff=0.6)
+        return [self._names[self._ids[match]] for match in matches]
+
+    def mark_stale(self):
+        """Reload on the next lookup that misses, e.g. after a data load"""
+        self.last_load = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.stats_counters, "companies": len(self._names), "last_load": self.last_load}
@@ -0,0 +1,47 @@
+"""Offline stand-in for the Azure OpenAI embedding deployment.
+
+HashingEmbedding maps text to a fixed-size vector by hashing its words and
+word pairs into buckets, so rephrasings that share most of their words
+land close together. It needs no network and is deterministic across
+processes, which is all the semantic cache needs in tests and benchmarks.
+"""
+
+import re
+import zlib
+import asyncio
+from typing import List
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import Field
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+class HashingEmbedding(BaseEmbedding):
+    """Bag-of-words embedding built by feature hashing"""
+
+    dim: int = Field(default=256, description="Vector size")
+    latency: float = Field(default=0.0, description="Simulated seconds per async embedding call")
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "hashing_embedding"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            vector[digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        return vector
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return self._embed(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
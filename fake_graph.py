@@ -0,0 +1,250 @@
+"""In-memory SocialNetwork graph behind the fake REST++ server.
+
+InMemorySocialGraph holds a generated graph (see generate_data.py) and
+answers the installed queries with the same result shapes as the GSQL in
+setup_tigergraph.gsql: the chatbot queries (including the batched
+GetPeopleInfo), the keyset listings, the person directory and the adjacency export
+for the social graph snapshot.
+``register(server)`` installs them on a FakeRestppServer along with the
+vertices and edge counts for getVertices and the statistics builtins.
+Benchmarks and offline runs can then drive the whole chatbot without a
+TigerGraph instance.
+"""
+
+import heapq
+import bisect
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from generate_data import SocialNetworkGenerator
+from path_search import CSRGraph, FRIENDS_WITH, WORKS_AT, FOLLOWS, bidirectional_bfs, restpp_path
+from analytics_snapshot import network_metrics
+
+
+class InMemorySocialGraph:
+    """A generated SocialNetwork graph with Python implementations of the installed queries"""
+
+    def __init__(self, generator: SocialNetworkGenerator):
+        self.cities: Dict[str, Dict[str, Any]] = {}
+        self.companies: Dict[str, Dict[str, Any]] = {}
+        self.people: Dict[str, Dict[str, Any]] = {}
+        self.employment: Dict[str, Dict[str, Any]] = {}
+        self.edge_counts: Dict[str, int] = {}
+        edges: Dict[str, List[tuple]] = {"FRIENDS_WITH": [], "FOLLOWS": []}
+
+        for row in (row for chunk in generator.city_rows() for row in chunk):
+            self.cities[row[0]] = dict(zip(("name", "state", "country", "population", "latitude", "longitude"), row[1:]))
+        for row in (row for chunk in generator.company_rows() for row in chunk):
+            self.companies[row[0]] = dict(zip(("name", "industry", "size", "city_id", "founded_year", "revenue"), row[1:]))
+        for row in (row for chunk in generator.person_rows() for row in chunk):
+            self.people[row[0]] = dict(zip(("first_name", "last_name", "age", "email", "city_id",
+                                            "job_title", "salary", "created_date"), row[1:]))
+        for person_id, company_id, _, position, department, _ in (row for chunk in generator.works_at_rows() for row in chunk):
+            self.employment[person_id] = {"company_id": company_id, "position": position, "department": department}
+        for name, rows in (("FRIENDS_WITH", generator.friends_with_rows()), ("FOLLOWS", generator.follows_rows())):
+            for chunk in rows:
+                edges[name].extend((row[0], row[1]) for row in chunk)
+        self.edge_counts = {
+            "FRIENDS_WITH": len(edges["FRIENDS_WITH"]),
+            "FOLLOWS": len(edges["FOLLOWS"]),
+            "WORKS_AT": len(self.employment),
+            "LOCATED_IN": len(self.people) + len(self.companies)
+        }
+
+        # Vertex numbering for the path search: people first, then companies
+        self.vertex_ids = list(self.people) + list(self.companies)
+        self.vertex_index = {vid: i for i, vid in enumerate(self.vertex_ids)}
+        index = self.vertex_index
+
+        def pairs(rows: List[tuple]) -> tuple:
+            return (np.array([index[a] for a, _ in rows], dtype=np.int32),
+                    np.array([index[b] for _, b in rows], dtype=np.int32))
+
+        employed = list(self.employment.items())
+        self.csr = CSRGraph.from_edges(len(self.vertex_ids), [
+            (*pairs(edges["FRIENDS_WITH"]), FRIENDS_WITH),
+            (*pairs(edges["FOLLOWS"]), FOLLOWS),
+            (*pairs([(p, job["company_id"]) for p, job in employed]), WORKS_AT)
+        ])
+
+        friends = np.zeros(len(self.people), dtype=np.int64)
+        followers = np.zeros(len(self.people), dtype=np.int64)
+        for a, b in edges["FRIENDS_WITH"]:
+            friends[index[a]] += 1
+            friends[index[b]] += 1
+        for _, b in edges["FOLLOWS"]:
+            followers[index[b]] += 1
+        self.friend_counts, self.follower_counts = friends, followers
+
+        # Out-edges per person as SocialAdjacency returns them; FRIENDS_WITH has a same-named reverse edge
+        self.friends: Dict[str, set] = {p: set() for p in self.people}
+        self.follows: Dict[str, set] = {p: set() for p in self.people}
+        for a, b in edges["FRIENDS_WITH"]:
+            self.friends[a].add(b)
+            self.friends[b].add(a)
+        for a, b in edges["FOLLOWS"]:
+            self.follows[a].add(b)
+
+        self.employees: Dict[str, List[str]] = {}
+        for person_id, job in employed:
+            self.employees.setdefault(job["company_id"], []).append(person_id)
+        self.company_by_name = {company["name"]: company_id for company_id, company in self.companies.items()}
+        self.sorted_people = sorted(self.people)
+        self.sorted_companies = sorted(self.companies)
+
+    @classmethod
+    def generate(cls, people: int = 10_000, seed: int = 7, **kwargs) -> "InMemorySocialGraph":
+        return cls(SocialNetworkGenerator(people, seed=seed, **kwargs))
+
+    def _company_name(self, person_id: str) -> str:
+        job = self.employment.get(person_id)
+        return self.companies[job["company_id"]]["name"] if job else ""
+
+    def _full_name(self, person_id: str) -> str:
+        person = self.people[person_id]
+        return f"{person['first_name']} {person['last_name']}"
+
+    # Installed queries: each takes the REST++ parameters and returns the ``results`` list
+
+    def get_person_info(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        person_id = params.get("person_id", "")
+        person, job = self.people.get(person_id), self.employment.get(person_id)
+        if not person or not job:
+            return [{"@@result": []}]
+        company = self.companies[job["company_id"]]
+        city = self.cities.get(company["city_id"], {})
+        return [{"@@result": [{
+            "id": person_id, "first_name": person["first_name"], "last_name": person["last_name"],
+            "age": person["age"], "email": person["email"], "job_title": person["job_title"],
+            "salary": person["salary"], "company_name": company["name"],
+            "city_name": city.get("name", ""), "state": city.get("state", "")
+        }]}]
+
+    def get_people_info(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        ids = params.get("person_ids", [])
+        # A single repeated query parameter arrives as a plain string
+        ids = [ids] if isinstance(ids, str) else ids
+        rows = [row for person_id in dict.fromkeys(ids)
+                for row in self.get_person_info({"person_id": person_id})[0]["@@result"]]
+        return [{"@@result": rows}]
+
+    def find_connections(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        source, target = params.get("source_person"), params.get("target_person")
+        for person_id in (source, target):
+            if person_id not in self.people:
+                raise ValueError(f"Failed to convert user vertex id for parameter: {person_id}")
+        result = bidirectional_bfs(self.csr, self.vertex_index[source], self.vertex_index[target],
+                                   int(params.get("max_hops", 3)))
+        vid = self.vertex_ids.__getitem__
+
+        def vertex_type(v: int) -> str:
+            return "Person" if v < len(self.people) else "Company"
+
+        def label(v: int) -> str:
+            return self._full_name(vid(v)) if v < len(self.people) else self.companies[vid(v)]["name"]
+
+        return [{"path": restpp_path(result, vid, vertex_type, label),
+                 "hops": result.hops if result.found else 2 ** 31 - 1,
+                 "explored": result.explored}]
+
+    def get_company_employees(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        company_id = params.get("company", "")
+        if company_id not in self.companies:
+            raise ValueError(f"Failed to convert user vertex id for parameter: {company_id}")
+        department = params.get("department", "")
+        page_size, offset = int(params.get("page_size", 20)), int(params.get("offset", 0))
+        rows = []
+        for person_id in self.employees.get(company_id, []):
+            job, person = self.employment[person_id], self.people[person_id]
+            if department and job["department"] != department:
+                continue
+            rows.append({"person_id": person_id, "full_name": self._full_name(person_id),
+                         "job_title": person["job_title"], "department": job["department"],
+                         "salary": person["salary"], "email": person["email"]})
+        if str(params.get("count_only", False)).lower() == "true":
+            return [{"total": len(rows), "@@employees": []}]
+        top = heapq.nsmallest(offset + page_size, rows, key=lambda row: (-row["salary"], row["person_id"]))
+        return [{"total": len(rows), "@@employees": top[offset:]}]
+
+    def find_top_influencers(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        limit = int(params.get("limit_count", 10))
+        scores = self.friend_counts + 2.0 * self.follower_counts
+        top = heapq.nlargest(limit, range(len(scores)), key=lambda i: (scores[i], -i))
+        return [{"@@influencers": [{
+            "person_id": self.vertex_ids[i], "full_name": self._full_name(self.vertex_ids[i]),
+            "job_title": self.people[self.vertex_ids[i]]["job_title"],
+            "company_name": self._company_name(self.vertex_ids[i]),
+            "friend_count": int(self.friend_counts[i]), "follower_count": int(self.follower_counts[i]),
+            "influence_score": float(scores[i]), "pagerank": 0.0
+        } for i in top]}]
+
+    def get_network_analytics(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        vertex_counts = {"Person": len(self.people), "Company": len(self.companies), "City": len(self.cities)}
+        return [{"@@metrics": network_metrics(vertex_counts, self.edge_counts)}]
+
+    def _page(self, ids: List[str], params: Dict[str, Any], default_size: int) -> List[str]:
+        start = bisect.bisect_right(ids, params.get("after_id", ""))
+        return ids[start:start + int(params.get("page_size", default_size))]
+
+    def person_directory(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"@@entries": [{
+            "id": p, "first_name": self.people[p]["first_name"], "last_name": self.people[p]["last_name"],
+            "company_name": self._company_name(p)
+        } for p in self._page(self.sorted_people, params, 5000)]}]
+
+    def list_people(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"@@people": [{
+            "id": p, "first_name": self.people[p]["first_name"], "last_name": self.people[p]["last_name"],
+            "job_title": self.people[p]["job_title"], "age": self.people[p]["age"]
+        } for p in self._page(self.sorted_people, params, 500)]}]
+
+    def list_companies(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"@@companies": [{
+            "id": c, "name": self.companies[c]["name"], "industry": self.companies[c]["industry"],
+            "size": self.companies[c]["size"]
+        } for c in self._page(self.sorted_companies, params, 500)]}]
+
+    def _adjacency_rows(self, ids: List[str]) -> List[Dict[str, Any]]:
+        return [{"v_id": p, "v_type": "Person", "attributes": {
+            "id": p, "friends": sorted(self.friends[p]), "follows": sorted(self.follows[p])
+        }} for p in ids if p in self.people]
+
+    def social_adjacency(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"people": self._adjacency_rows(self._page(self.sorted_people, params, 5000))}]
+
+    def people_adjacency(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        ids = params.get("person_ids", [])
+        return [{"people": self._adjacency_rows([ids] if isinstance(ids, str) else ids)}]
+
+    def register(self, server: Any, vertices: bool = True) -> Any:
+        """Install the queries (and optionally the vertices for getVertices) on a FakeRestppServer"""
+        for name, handler in (
+            ("GetPersonInfo", self.get_person_info),
+            ("GetPeopleInfo", self.get_people_info),
+            ("FindConnections", self.find_connections),
+            ("GetCompanyEmployees", self.get_company_employees),
+            ("FindTopInfluencers", self.find_top_influencers),
+            ("GetNetworkAnalytics", self.get_network_analytics),
+            ("PersonDirectory", self.person_directory),
+            ("ListPeople", self.list_people),
+            ("ListCompanies", self.list_companies),
+            ("SocialAdjacency", self.social_adjacency),
+            ("PeopleAdjacency", self.people_adjacency)
+        ):
+            server.register_query(name, handler)
+        if vertices:
+            server.add_vertices("Person", self.people)
+            server.add_vertices("Company", self.companies)
+            server.add_vertices("City", self.cities)
+        for edge_type, count in self.edge_counts.items():
+            server.add_edges(edge_type, count)
+        return server
+
+    def sample_ids(self, kind: str, count: int, seed: Optional[int] = None) -> List[str]:
+        """Random people or company names, for building benchmark questions"""
+        rng = np.random.default_rng(seed)
+        if kind == "company":
+            names = [self.companies[c]["name"] for c in self.sorted_companies]
+            return [names[i] for i in rng.integers(0, len(names), count)]
+        return [self.sorted_people[i] for i in rng.integers(0, len(self.sorted_people), count)]
@@ -0,0 +1,288 @@
+"""Scripted stand-in for Azure OpenAI.
+
+ScriptedReActLLM replies with fixed ReAct traces instead of calling a
+model, so the agent loop, tools and graph layer can be exercised offline.
+ScriptedFunctionCallingLLM does the same for the function-calling agent,
+requesting several tool calls in one reply. Latency is simulated with
+``asyncio.sleep`` on the async path, which is what a real network-bound
+LLM call looks like to the event loop. ScriptedReActLLM can also fail
+or stall on purpose (``failure_rate``, ``hang``) to exercise timeouts
+and the circuit breaker.
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseAsyncGen,
+    ChatResponseGen,
+    CompletionResponse,
+    CompletionResponseGen,
+    LLMMetadata,
+    MessageRole,
+)
+from llama_index.core.base.llms.generic_utils import completion_response_to_chat_response
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms import CustomLLM
+from llama_index.core.llms.callbacks import llm_chat_callback, llm_completion_callback
+from llama_index.core.llms.function_calling import FunctionCallingLLM
+from llama_index.core.llms.llm import ToolSelection
+
+_PERSON_RE = re.compile(r"person_\d+")
+_COMPANY_RE = re.compile(r"\b(?:at|for) ([A-Z][\w&.\- ]*?)\s*\??$")
+_NUMBER_RE = re.compile(r"\b(\d+)\b")
+
+
+def default_react_script(messages: Sequence[ChatMessage]) -> str:
+    """Look up the first person ID mentioned, then answer from the observation
+
+    Summary requests from session memory get a one-line summary naming the
+    person IDs in the transcript.
+    """
+    last = (messages[-1].content or "") if messages else ""
+    if last.startswith('"Transcript so far'):
+        # Session memory asking for a summary of older turns
+        people = sorted(set(_PERSON_RE.findall(last)))
+        return "The user asked about " + (", ".join(people) if people else "the network") + "."
+    if last.startswith("Observation:"):
+        return "Thought: I can answer without using any more tools.\nAnswer: " + last[len("Observation:"):].strip()[:200]
+
+    user_messages = [m.content or "" for m in messages if m.role == MessageRole.USER]
+    match = _PERSON_RE.search(user_messages[-1] if user_messages else "")
+    if not match:
+        return "Thought: I can answer without using any more tools.\nAnswer: Please mention a person ID like person_001."
+    return (
+        "Thought: I need to look up this person.\n"
+        "Action: get_person_info\n"
+        f'Action Input: {{"person_id": "{match.group(0)}"}}'
+    )
+
+
+def _action(thought: str, tool: str, arguments: str) -> str:
+    return f"Thought: {thought}\nAction: {tool}\nAction Input: {arguments}"
+
+
+def tool_react_script(messages: Sequence[ChatMessage]) -> str:
+    """One fixed ReAct trace per question type, covering every graph tool
+
+    Two person IDs go to find_connections and one to get_person_info. "at
+    <Company>" goes to get_company_employees, influencer questions to
+    find_top_influencers (with the first number as the limit), and
+    anything else to get_network_analytics. Each is answered from the
+    first observation.
+    """
+    last = (messages[-1].content or "") if messages else ""
+    if last.startswith('"Transcript so far') or last.startswith("Observation:"):
+        return default_react_script(messages)
+
+    user_messages = [m.content or "" for m in messages if m.role == MessageRole.USER]
+    question = user_messages[-1] if user_messages else ""
+    people = _PERSON_RE.findall(question)
+    company = _COMPANY_RE.search(question)
+    if len(people) >= 2:
+        return _action("I need the path between these people.", "find_connections",
+                       f'{{"source_person": "{people[0]}", "target_person": "{people[1]}", "max_hops": 4}}')
+    if people:
+        return _action("I need to look up this person.", "get_person_info", f'{{"person_id": "{people[0]}"}}')
+    if company:
+        return _action("I need the employee list.", "get_company_employees",
+                       f'{{"company_name": "{company.group(1).strip()}"}}')
+    if "influen" in question.lower():
+        number = _NUMBER_RE.search(question)
+        return _action("I need the top influencers.", "find_top_influencers",
+                       f'{{"limit_count": {number.group(1) if number else 10}}}')
+    return _action("I need the network statistics.", "get_network_analytics", "{}")
+
+
+def _question_and_observations(messages: Sequence[ChatMessage]) -> tuple:
+    """The user's question and how many ReAct observations followed it"""
+    observations = 0
+    for message in reversed(messages):
+        content = message.content or ""
+        if message.role != MessageRole.USER:
+            continue
+        if not content.startswith("Observation:"):
+            return content, observations
+        observations += 1
+    return "", observations
+
+
+def compare_react_script(batched: bool = False) -> Callable[[Sequence[ChatMessage]], str]:
+    """ReAct trace for "Compare person_a, person_b, ..." questions
+
+    Sequential: one get_person_info call per person, one LLM round trip
+    each. Batched: a single get_people_info call for everyone.
+    """
+    def script(messages: Sequence[ChatMessage]) -> str:
+        last = (messages[-1].content or "") if messages else ""
+        if last.startswith('"Transcript so far'):
+            return default_react_script(messages)
+        question, observations = _question_and_observations(messages)
+        people = list(dict.fromkeys(_PERSON_RE.findall(question)))
+        pending = people[observations:] if not batched else (people if not observations else [])
+        if not pending:
+            return "Thought: I can answer without using any more tools.\nAnswer: Compared " + ", ".join(people) + "."
+        if batched:
+            return _action("I need all of these people.", "get_people_info", json.dumps({"person_ids": people}))
+        return _action("I need to look up the next person.", "get_person_info", json.dumps({"person_id": pending[0]}))
+
+    return script
+
+
+class ScriptedReActLLM(CustomLLM):
+    """LLM whose replies come from ``script(messages)`` after a fixed delay"""
+
+    latency: float = Field(default=0.0, description="Simulated seconds per LLM call")
+    script: Callable[[Sequence[ChatMessage]], str] = Field(default=default_react_script, exclude=True)
+    failure_rate: float = Field(default=0.0, description="Share of calls that fail with a connection error")
+    hang: float = Field(default=0.0, description="Extra seconds every call takes, like a stalled deployment")
+    model_name: str = Field(default="scripted-react", description="Reported model name, e.g. to tell routed deployments apart")
+    _calls: int = PrivateAttr(default=0)
+    _rng: random.Random = PrivateAttr(default_factory=lambda: random.Random(0))
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name=self.model_name, is_chat_model=True)
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def _reply(self, messages: Sequence[ChatMessage]) -> CompletionResponse:
+        self._calls += 1
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise ConnectionError("Injected LLM failure")
+        return CompletionResponse(text=self.script(messages))
+
+    @llm_chat_callback()
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        time.sleep(self.latency + self.hang)
+        return completion_response_to_chat_response(self._reply(messages))
+
+    @llm_chat_callback()
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        await asyncio.sleep(self.latency + self.hang)
+        return completion_response_to_chat_response(self._reply(messages))
+
+    def _stream(self, text: str):
+        """Split a reply into word-sized chunks the way a streaming model delivers it"""
+        content = ""
+        for delta in re.split(r"(?<=\s)", text):
+            content += delta
+            yield ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content=content), delta=delta)
+
+    @llm_chat_callback()
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        time.sleep(self.latency + self.hang)
+        return self._stream(self._reply(messages).text)
+
+    @llm_chat_callback()
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        await asyncio.sleep(self.latency + self.hang)
+        chunks = self._stream(self._reply(messages).text)
+
+        async def gen() -> ChatResponseAsyncGen:
+            for chunk in chunks:
+                yield chunk
+
+        return gen()
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        time.sleep(self.latency + self.hang)
+        return self._reply([ChatMessage(role=MessageRole.USER, content=prompt)])
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        response = self.complete(prompt, formatted=formatted, **kwargs)
+        yield CompletionResponse(text=response.text, delta=response.text)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "scripted_react_llm"
+
+
+class ScriptedFunctionCallingLLM(FunctionCallingLLM, CustomLLM):
+    """Function-calling LLM that asks for every person in the question at once
+
+    The first reply requests one get_person_info call per person ID, all in
+    the same message (or a single get_people_info call when ``batched``);
+    once the tool results are in, it answers.
+    """
+
+    latency: float = Field(default=0.0, description="Simulated seconds per LLM call")
+    batched: bool = Field(default=False, description="Ask for get_people_info instead of parallel get_person_info calls")
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name="scripted-function-calling", is_chat_model=True, is_function_calling_model=True)
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def _prepare_chat_with_tools(self, tools: List[Any], user_msg: Optional[Union[str, ChatMessage]] = None,
+                                 chat_history: Optional[List[ChatMessage]] = None, verbose: bool = False,
+                                 allow_parallel_tool_calls: bool = False, **kwargs: Any) -> Dict[str, Any]:
+        messages = list(chat_history or [])
+        if isinstance(user_msg, str):
+            messages.append(ChatMessage(role=MessageRole.USER, content=user_msg))
+        elif user_msg is not None:
+            messages.append(user_msg)
+        return {"messages": messages, "tools": tools}
+
+    def get_tool_calls_from_response(self, response: ChatResponse, error_on_no_tool_call: bool = True,
+                                     **kwargs: Any) -> List[ToolSelection]:
+        calls = response.message.additional_kwargs.get("tool_calls", [])
+        if not calls and error_on_no_tool_call:
+            raise ValueError("Expected at least one tool call")
+        return [ToolSelection(tool_id=call["id"], tool_name=call["name"], tool_kwargs=call["arguments"]) for call in calls]
+
+    def _reply(self, messages: Sequence[ChatMessage]) -> ChatResponse:
+        self._calls += 1
+        last = messages[-1] if messages else ChatMessage(role=MessageRole.USER, content="")
+        if (last.content or "").startswith('"Transcript so far'):
+            return ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content=default_react_script(messages)))
+        question = next((m.content or "" for m in reversed(messages) if m.role == MessageRole.USER), "")
+        people = list(dict.fromkeys(_PERSON_RE.findall(question)))
+        if last.role == MessageRole.TOOL or not people:
+            return ChatResponse(message=ChatMessage(
+                role=MessageRole.ASSISTANT, content="Compared " + (", ".join(people) or "nobody") + "."))
+        if self.batched:
+            calls = [{"id": "call_0", "name": "get_people_info", "arguments": {"person_ids": people}}]
+        else:
+            calls = [{"id": f"call_{i}", "name": "get_person_info", "arguments": {"person_id": person}}
+                     for i, person in enumerate(people)]
+        return ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content="",
+                                                additional_kwargs={"tool_calls": calls}))
+
+    @llm_chat_callback()
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        time.sleep(self.latency)
+        return self._reply(messages)
+
+    @llm_chat_callback()
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        time.sleep(self.latency)
+        return CompletionResponse(text=self._reply([ChatMessage(role=MessageRole.USER, content=prompt)]).message.content)
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        response = self.complete(prompt, formatted=formatted, **kwargs)
+        yield CompletionResponse(text=response.text, delta=response.text)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "scripted_function_calling_llm"
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Local stand-in for the TigerGraph REST++ server.
+
+Serves the handful of endpoints the chatbot uses (echo, requesttoken,
+installed queries, vertex listing, upserts and the vertex/edge count builtins) from in-process Python callables so
+the client layer can be exercised without a live TigerGraph instance.
+Faults (error responses, hung requests) can be injected to exercise the
+retry and circuit-breaker paths.
+"""
+
+import json
+import time
+import uuid
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Callable
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeRestppServer:
+    """Threaded HTTP server that mimics REST++ responses.
+
+    Queries are registered as callables taking the request parameters and
+    returning the ``results`` list. Vertices are stored per type as
+    ``{primary_id: attributes}`` and edge counts per type. ``latency`` adds a fixed delay to every
+    request, which is useful for exercising pool backpressure. ``inject_faults`` makes a
+    share of requests fail or hang until ``clear_faults`` is called.
+    """
+
+    def __init__(self, graphname: str = "SocialNetwork", host: str = "127.0.0.1", port: int = 0,
+                 secret: str = "", token_lifetime: int = 3600, latency: float = 0.0):
+        self.graphname = graphname
+        self.secret = secret
+        self.token_lifetime = token_lifetime
+        self.latency = latency
+        self.queries: Dict[str, Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = {}
+        self.vertices: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.edge_counts: Dict[str, int] = {}
+        self.tokens: Dict[str, float] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.connections = 0
+        self.bytes_sent = 0
+        self.faults_injected = 0
+        self._faults: Optional[Dict[str, Any]] = None
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def register_query(self, name: str, handler: Callable[[Dict[str, Any]], List[Dict[str, Any]]]):
+        self.queries[name] = handler
+
+    def add_vertices(self, vertex_type: str, vertices: Dict[str, Dict[str, Any]]):
+        self.vertices.setdefault(vertex_type, {}).update(vertices)
+
+    def add_edges(self, edge_type: str, count: int):
+        with self._lock:
+            self.edge_counts[edge_type] = self.edge_counts.get(edge_type, 0) + count
+
+    def issue_token(self) -> str:
+        token = uuid.uuid4().hex
+        with self._lock:
+            self.tokens[token] = time.time() + self.token_lifetime
+        return token
+
+    def revoke_tokens(self):
+        with self._lock:
+            self.tokens.clear()
+
+    def inject_faults(self, rate: float = 1.0, status: int = 503, hang: float = 0.0, paths: Optional[List[str]] = None,
+                      seed: Optional[int] = None):
+        """Fail ``rate`` of the requests with ``status``, or first stall them ``hang`` seconds
+
+        With ``hang`` set, affected requests sleep and are then answered
+        normally, which looks like a hung node to a client with a shorter
+        timeout; pass ``status=200`` to only delay them. ``paths`` limits
+        the faults to request paths starting with one of the prefixes,
+        e.g. ``["query/FindConnections"]``. ``seed`` makes the choice of
+        failing requests repeatable.
+        """
+        with self._lock:
+            if seed is not None:
+                self._rng.seed(seed)
+            self._faults = {"rate": rate, "status": status, "hang": hang, "paths": paths}
+
+    def clear_faults(self):
+        with self._lock:
+            self._faults = None
+
+    def _fault_for(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            faults = self._faults
+            if faults is None or path == "requesttoken":
+                return None
+            if faults["paths"] and not any(path.startswith(prefix) for prefix in faults["paths"]):
+                return None
+            if self._rng.random() >= faults["rate"]:
+                return None
+            self.faults_injected += 1
+            return faults
+
+    def start(self) -> "FakeRestppServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeRestppServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+    def _authorized(self, headers) -> bool:
+        if not self.secret:
+            return True
+        auth = headers.get("Authorization", "")
+        if not auth.startswith("Bearer "):
+            return False
+        with self._lock:
+            expires = self.tokens.get(auth[len("Bearer "):])
+        return expires is not None and expires > time.time()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Dict[str, Any]):
+                payload = json.dumps(body).encode("utf-8")
+                with server._lock:
+                    server.bytes_sent += len(payload)
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up waiting, e.g. on a request stalled by an injected fault
+                    self.close_connection = True
+
+            def _error(self, status: int, message: str):
+                self._send(status, {"error": True, "message": message})
+
+            def _params(self) -> Dict[str, Any]:
+                parsed = urlparse(self.path)
+                params = {k: v[0] if len(v) == 1 else v for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    params.update(json.loads(self.rfile.read(length) or b"{}"))
+                return params
+
+            def do_GET(self):
+                self._dispatch()
+
+            def do_POST(self):
+                self._dispatch()
+
+            def _dispatch(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                path = urlparse(self.path).path.rstrip("/")
+                if path.startswith("/restpp"):
+                    path = path[len("/restpp"):]
+                params = self._params()
+                parts = path.strip("/").split("/")
+                fault = server._fault_for("/".join(parts[:1] + parts[2:]) if len(parts) > 2 else "/".join(parts))
+                if fault is not None:
+                    if fault["hang"]:
+                        time.sleep(fault["hang"])
+                    if fault["status"] != 200:
+                        return self._error(fault["status"], "Injected fault")
+
+                if parts == ["requesttoken"]:
+                    server._count("requesttoken")
+                    if params.get("secret") != server.secret:
+                        return self._error(401, "Invalid secret")
+                    return self._send(200, {
+                        "error": False,
+                        "expiration": time.time() + server.token_lifetime,
+                        "results": {"token": server.issue_token()}
+                    })
+
+                if not server._authorized(self.headers):
+                    return self._error(401, "Unauthorized: invalid or expired token")
+
+                if parts == ["echo"]:
+                    server._count("echo")
+                    return self._send(200, {"error": False, "message": "Hello GSQL"})
+
+                if len(parts) == 3 and parts[0] == "query" and parts[1] == server.graphname:
+                    server._count(f"query/{parts[2]}")
+                    handler = server.queries.get(parts[2])
+                    if handler is None:
+                        return self._error(404, f"Query {parts[2]} is not installed")
+                    try:
+                        return self._send(200, {"error": False, "results": handler(params)})
+                    except ValueError as e:
+                        # Bad parameters (e.g. an unknown vertex ID) come back as a REST++ error body
+                        return self._send(200, {"error": True, "message": str(e), "code": "REST-30000"})
+                    except Exception as e:
+                        return self._error(500, str(e))
+
+                if parts == ["builtins", server.graphname]:
+                    function = params.get("function")
+                    server._count(f"builtins/{function}")
+                    if function == "stat_vertex_number":
+                        counts, key = {t: len(v) for t, v in server.vertices.items()}, "v_type"
+                    elif function == "stat_edge_number":
+                        counts, key = dict(server.edge_counts), "e_type"
+                    else:
+                        return self._error(400, f"Unknown builtin function {function}")
+                    wanted = params.get("type", "*")
+                    if wanted != "*":
+                        counts = {wanted: counts.get(wanted, 0)}
+                    return self._send(200, {"error": False, "results": [{key: t, "count": c} for t, c in counts.items()]})
+
+                if parts == ["graph", server.graphname] and self.command == "POST":
+                    server._count("upsert")
+                    accepted_vertices = accepted_edges = 0
+                    for vertex_type, vertices in params.get("vertices", {}).items():
+                        server.add_vertices(vertex_type, {
+                            vid: {k: v["value"] for k, v in attributes.items()} for vid, attributes in vertices.items()
+                        })
+                        accepted_vertices += len(vertices)
+                    for sources in params.get("edges", {}).values():
+                        for edge_types in sources.values():
+                            for edge_type, target_types in edge_types.items():
+                                count = sum(len(targets) for targets in target_types.values())
+                                server.add_edges(edge_type, count)
+                                accepted_edges += count
+                    return self._send(200, {"error": False, "results": [{
+                        "accepted_vertices": accepted_vertices, "accepted_edges": accepted_edges
+                    }]})
+
+                if len(parts) == 4 and parts[:2] == ["graph", server.graphname] and parts[2] == "vertices":
+                    server._count(f"vertices/{parts[3]}")
+                    store = server.vertices.get(parts[3], {})
+                    select = [f for f in str(params.get("select", "")).split(",") if f]
+                    ids = sorted(store)
+                    if params.get("limit"):
+                        ids = ids[:int(params["limit"])]
+                    results = []
+                    for vid in ids:
+                        attributes = store[vid]
+                        if select:
+                            attributes = {k: v for k, v in attributes.items() if k in select}
+                        results.append({"v_id": vid, "v_type": parts[3], "attributes": attributes})
+                    return self._send(200, {"error": False, "results": results})
+
+                return self._error(404, f"Endpoint {path} not found")
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a fake TigerGraph REST++ server")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--secret", default="")
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeRestppServer(port=args.port, secret=args.secret, latency=args.latency)
+    fake.register_query("GetNetworkAnalytics", lambda params: [{"@@metrics": []}])
+    print(f"🐅 Fake REST++ server listening on {fake.url}")
+    fake.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
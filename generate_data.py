@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Synthetic SocialNetwork data at configurable scale.
+
+Writes one CSV per vertex and edge type of setup_tigergraph.gsql to an
+output directory. Each table is generated and written one chunk at a
+time, so memory stays flat even at millions of edges, apart from one
+int64 key per FRIENDS_WITH/FOLLOWS edge kept to drop repeated edges
+across chunks. Friendship and follow targets are drawn with power-law popularity, which gives the
+heavy-tailed degree distribution of a real social network. Company sizes
+and city populations are skewed the same way. The output is
+deterministic for a given --seed. Load it with bulk_load.py or the
+loading job in loading_job.gsql.
+
+    python generate_data.py --people 1000000 --out data/
+"""
+
+import os
+import csv
+import time
+import zlib
+import argparse
+from typing import Dict, List, Any, Iterator, Tuple, Callable
+
+import numpy as np
+
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+               "Daniel", "Emily", "Matthew", "Lisa", "Anthony", "Nancy", "Mark", "Sandra", "Steven", "Ashley",
+               "Andrew", "Kimberly", "Kevin", "Emma", "Brian", "Olivia", "Wei", "Priya", "Carlos", "Aisha"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+              "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+              "Walker", "Young", "Allen", "King", "Wright", "Scott", "Chen", "Patel", "Nguyen", "Kim"]
+DEPARTMENTS = {
+    "Engineering": ["Software Engineer", "Senior Developer", "DevOps Engineer", "Engineering Manager"],
+    "Data": ["Data Scientist", "Data Engineer", "ML Engineer", "Analyst"],
+    "Product": ["Product Manager", "UX Designer", "Product Analyst"],
+    "Sales": ["Account Executive", "Sales Manager", "Sales Engineer"],
+    "Marketing": ["Marketing Manager", "Content Strategist", "Growth Analyst"],
+    "Finance": ["Financial Analyst", "Controller", "Accountant"],
+    "Security": ["Security Engineer", "Security Analyst"]
+}
+INDUSTRIES = ["Technology", "Finance", "Healthcare", "Retail", "Cloud Computing", "Cybersecurity", "Media", "Energy"]
+COMPANY_WORDS = ["Tech", "Data", "Cloud", "Cyber", "Quantum", "Blue", "Apex", "Nova", "Bright", "Summit", "Vertex", "Pulse"]
+COMPANY_SUFFIXES = ["Corp", "Systems", "Labs", "Ventures", "Works", "Hub", "Inc", "Group"]
+STATES = ["CA", "NY", "WA", "TX", "MA", "IL", "CO", "GA", "FL", "OR"]
+PARTNERSHIP_TYPES = ["Technology", "Strategic", "Reseller", "Research"]
+
+_TITLES = [(department, title) for department, titles in DEPARTMENTS.items() for title in titles]
+_EPOCH = np.datetime64("2015-01-01T00:00:00", "s")
+
+# Columns per CSV and how bulk_load.py maps them onto the schema. Vertex tables
+# start with the primary ID; edge tables with the source and target IDs.
+TABLES: Dict[str, Dict[str, Any]] = {
+    "cities.csv": {"vertex": "City", "columns": {
+        "id": str, "name": str, "state": str, "country": str, "population": int, "latitude": float, "longitude": float}},
+    "companies.csv": {"vertex": "Company", "columns": {
+        "id": str, "name": str, "industry": str, "size": str, "city_id": str, "founded_year": int, "revenue": float}},
+    "people.csv": {"vertex": "Person", "columns": {
+        "id": str, "first_name": str, "last_name": str, "age": int, "email": str, "city_id": str,
+        "job_title": str, "salary": int, "created_date": str}},
+    "works_at.csv": {"edge": ("Person", "WORKS_AT", "Company"), "columns": {
+        "from_id": str, "to_id": str, "start_date": str, "position": str, "department": str, "is_current": bool}},
+    "located_in.csv": {"edge": (None, "LOCATED_IN", "City"), "columns": {
+        "from_id": str, "to_id": str, "from_type": str, "since_date": str}},
+    "friends_with.csv": {"edge": ("Person", "FRIENDS_WITH", "Person"), "columns": {
+        "from_id": str, "to_id": str, "since_date": str, "strength": float}},
+    "follows.csv": {"edge": ("Person", "FOLLOWS", "Person"), "columns": {
+        "from_id": str, "to_id": str, "follow_date": str}},
+    "partners_with.csv": {"edge": ("Company", "PARTNERS_WITH", "Company"), "columns": {
+        "from_id": str, "to_id": str, "partnership_type": str, "start_date": str, "contract_value": float}}
+}
+
+
+def power_law_targets(rng: np.random.Generator, population: int, size: int, exponent: float,
+                      cumulative: np.ndarray = None, order: np.ndarray = None) -> np.ndarray:
+    """``size`` draws from ``range(population)`` where rank r is picked with weight (r + 1) ** -exponent
+
+    Pass ``cumulative`` (the running sum of the weights) and ``order`` (which
+    ID holds each rank) to reuse them across chunks.
+    """
+    if cumulative is None:
+        cumulative = np.cumsum(np.arange(1, population + 1, dtype=np.float64) ** -exponent)
+    if order is None:
+        # Shuffle which IDs are popular so popularity is unrelated to ID order
+        order = rng.permutation(population)
+    draws = np.searchsorted(cumulative, rng.random(size) * cumulative[-1])
+    return order[np.minimum(draws, population - 1)]
+
+
+def _format_ids(prefix: str, numbers: np.ndarray, width: int) -> List[str]:
+    return [f"{prefix}{n:0{width}d}" for n in numbers.tolist()]
+
+
+def _dates(rng: np.random.Generator, size: int, max_days: int = 3650) -> List[str]:
+    seconds = rng.integers(0, max_days * 86400, size)
+    return [d.replace("T", " ") for d in np.datetime_as_string(_EPOCH + seconds.astype("timedelta64[s]"), unit="s")]
+
+
+class SocialNetworkGenerator:
+    """Generates each table of the SocialNetwork schema as a stream of row chunks.
+
+    Every chunk draws from its own RNG keyed on (seed, table, chunk), so
+    tables can be streamed independently and still agree with each other,
+    e.g. a person's city in people.csv and located_in.csv.
+    """
+
+    def __init__(self, people: int, companies: int = 0, cities: int = 0, friends_per_person: float = 8.0,
+                 follows_per_person: float = 4.0, partners_per_company: float = 2.0,
+                 friend_exponent: float = 0.8, follow_exponent: float = 1.1, seed: int = 7,
+                 chunk_size: int = 100_000):
+        self.people = people
+        self.companies = companies or max(1, people // 200)
+        self.cities = cities or max(1, min(1000, people // 1000))
+        self.friends_per_person = friends_per_person
+        self.follows_per_person = follows_per_person
+        self.partners_per_company = partners_per_company
+        self.friend_exponent = friend_exponent
+        self.follow_exponent = follow_exponent
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.widths = {kind: max(3, len(str(count))) for kind, count in
+                       (("person", self.people), ("company", self.companies), ("city", self.cities))}
+        self._popularity: Dict[Tuple[str, int, float], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _rng(self, table: int, chunk: int = 0) -> np.random.Generator:
+        return np.random.default_rng([self.seed, table, chunk])
+
+    def _ids(self, kind: str, numbers: np.ndarray) -> List[str]:
+        return _format_ids(f"{kind}_", numbers + 1, self.widths[kind])
+
+    def _targets(self, key: str, population: int, exponent: float, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Power-law draws whose popularity ranking is fixed for the whole table"""
+        cache_key = (key, population, exponent)
+        if cache_key not in self._popularity:
+            ranking = self._rng(zlib.crc32(key.encode()) % 1000 + 100)
+            self._popularity[cache_key] = (
+                np.cumsum(np.arange(1, population + 1, dtype=np.float64) ** -exponent),
+                ranking.permutation(population)
+            )
+        cumulative, order = self._popularity[cache_key]
+        return power_law_targets(rng, population, size, exponent, cumulative, order)
+
+    def _new_edges(self, seen: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions in ``keys`` of edges not seen before (first copy only, in draw order), and the grown ``seen``
+
+        ``seen`` is the sorted keys of edges written by earlier chunks.
+        """
+        unique, first = np.unique(keys, return_index=True)
+        new = ~np.isin(unique, seen, assume_unique=True)
+        return np.sort(first[new]), np.union1d(seen, unique[new])
+
+    def _chunks(self, total: int) -> Iterator[Tuple[int, int, int]]:
+        for index, start in enumerate(range(0, total, self.chunk_size)):
+            yield index, start, min(total, start + self.chunk_size)
+
+    def _person_cities(self, chunk: int, size: int) -> np.ndarray:
+        return self._targets("city", self.cities, 1.0, self._rng(10, chunk), size)
+
+    def city_rows(self) -> Iterator[List[List[Any]]]:
+        rng = self._rng(1)
+        numbers = np.arange(self.cities)
+        # Zipf-like populations: the largest city has ~8M people
+        populations = (8_000_000 / (rng.permutation(self.cities) + 1) ** 0.9).astype(int) + 10_000
+        yield [[city_id, f"City {n + 1}", STATES[n % len(STATES)], "USA", int(population),
+                round(float(lat), 4), round(float(lon), 4)]
+               for city_id, n, population, lat, lon in zip(
+                   self._ids("city", numbers), numbers.tolist(), populations,
+                   rng.uniform(25, 49, self.cities), rng.uniform(-124, -67, self.cities))]
+
+    def company_rows(self) -> Iterator[List[List[Any]]]:
+        for index, start, end in self._chunks(self.companies):
+            rng = self._rng(2, index)
+            numbers = np.arange(start, end)
+            size = end - start
+            words = rng.integers(0, len(COMPANY_WORDS), size)
+            suffixes = rng.integers(0, len(COMPANY_SUFFIXES), size)
+            cities = self._targets("city", self.cities, 1.0, rng, size)
+            yield [[company_id, f"{COMPANY_WORDS[w]}{COMPANY_SUFFIXES[x]} {n + 1}", INDUSTRIES[n % len(INDUSTRIES)],
+                    ("Small", "Medium", "Large")[n % 3], city_id, int(year), round(float(revenue), 2)]
+                   for company_id, n, w, x, city_id, year, revenue in zip(
+                       self._ids("company", numbers), numbers.tolist(), words, suffixes, self._ids("city", cities),
+                       rng.integers(1950, 2024, size), rng.lognormal(16, 1.5, size))]
+
+    def person_rows(self) -> Iterator[List[List[Any]]]:
+        for index, start, end in self._chunks(self.people):
+            rng = self._rng(3, index)
+            numbers = np.arange(start, end)
+            size = end - start
+            first = rng.integers(0, len(FIRST_NAMES), size)
+            last = rng.integers(0, len(LAST_NAMES), size)
+            titles = rng.integers(0, len(_TITLES), size)
+            yield [[person_id, FIRST_NAMES[f], LAST_NAMES[l], int(age),
+                    f"{FIRST_NAMES[f].lower()}.{LAST_NAMES[l].lower()}{n + 1}@example.com",
+                    city_id, _TITLES[t][1], int(salary), created]
+                   for person_id, n, f, l, age, city_id, t, salary, created in zip(
+                       self._ids("person", numbers), numbers.tolist(), first, last, rng.integers(21, 66, size),
+                       self._ids("city", self._person_cities(index, size)), titles,
+                       rng.integers(50, 250, size) * 1000, _dates(rng, size))]
+
+    def works_at_rows(self) -> Iterator[List[List[Any]]]:
+        for index, start, end in self._chunks(self.people):
+            rng = self._rng(4, index)
+            size = end - start
+            employers = self._targets("company", self.companies, 1.0, rng, size)
+            titles = rng.integers(0, len(_TITLES), size)
+            yield [[person_id, company_id, started, _TITLES[t][1], _TITLES[t][0], True]
+                   for person_id, company_id, t, started in zip(
+                       self._ids("person", np.arange(start, end)), self._ids("company", employers),
+                       titles, _dates(rng, size))]
+
+    def located_in_rows(self) -> Iterator[List[List[Any]]]:
+        for index, start, end in self._chunks(self.people):
+            rng = self._rng(5, index)
+            size = end - start
+            yield [[person_id, city_id, "Person", since]
+                   for person_id, city_id, since in zip(
+                       self._ids("person", np.arange(start, end)),
+                       self._ids("city", self._person_cities(index, size)), _dates(rng, size))]
+        for chunk in self.company_rows():
+            yield [[row[0], row[4], "Company", "2020-01-01 00:00:00"] for row in chunk]
+
+    def friends_with_rows(self) -> Iterator[List[List[Any]]]:
+        total = int(self.people * self.friends_per_person / 2)
+        seen = np.empty(0, dtype=np.int64)
+        for index, start, end in self._chunks(total):
+            rng = self._rng(6, index)
+            size = end - start
+            sources = rng.integers(0, self.people, size)
+            targets = self._targets("friends", self.people, self.friend_exponent, rng, size)
+            # Store each friendship once (lower ID first); drop self-loops and pairs already written
+            pairs = np.stack([np.minimum(sources, targets), np.maximum(sources, targets)], axis=1)
+            pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+            keep, seen = self._new_edges(seen, pairs[:, 0].astype(np.int64) * self.people + pairs[:, 1])
+            pairs = pairs[keep]
+            yield [[a, b, since, round(float(strength), 2)]
+                   for a, b, since, strength in zip(
+                       self._ids("person", pairs[:, 0]), self._ids("person", pairs[:, 1]),
+                       _dates(rng, len(pairs)), rng.uniform(0.1, 1.0, len(pairs)))]
+
+    def follows_rows(self) -> Iterator[List[List[Any]]]:
+        total = int(self.people * self.follows_per_person)
+        seen = np.empty(0, dtype=np.int64)
+        for index, start, end in self._chunks(total):
+            rng = self._rng(7, index)
+            size = end - start
+            sources = rng.integers(0, self.people, size)
+            targets = self._targets("follows", self.people, self.follow_exponent, rng, size)
+            # Drop self-follows and follows already written
+            sources, targets = sources[sources != targets], targets[sources != targets]
+            keep, seen = self._new_edges(seen, sources.astype(np.int64) * self.people + targets)
+            yield [[a, b, since] for a, b, since in zip(
+                self._ids("person", sources[keep]), self._ids("person", targets[keep]), _dates(rng, len(keep)))]
+
+    def partners_with_rows(self) -> Iterator[List[List[Any]]]:
+        total = int(self.companies * self.partners_per_company / 2)
+        for index, start, end in self._chunks(total):
+            rng = self._rng(8, index)
+            size = end - start
+            sources = rng.integers(0, self.companies, size)
+            targets = self._targets("partners", self.companies, 1.0, rng, size)
+            keep = sources != targets
+            kept = int(keep.sum())
+            yield [[a, b, PARTNERSHIP_TYPES[t], started, round(float(value), 2)]
+                   for a, b, t, started, value in zip(
+                       self._ids("company", sources[keep]), self._ids("company", targets[keep]),
+                       rng.integers(0, len(PARTNERSHIP_TYPES), kept), _dates(rng, kept),
+                       rng.lognormal(13, 1.0, kept))]
+
+    def tables(self) -> List[Tuple[str, Callable[[], Iterator[List[List[Any]]]]]]:
+        """(file name, chunk generator) for every table, vertices first"""
+        return [
+            ("cities.csv", self.city_rows),
+            ("companies.csv", self.company_rows),
+            ("people.csv", self.person_rows),
+            ("works_at.csv", self.works_at_rows),
+            ("located_in.csv", self.located_in_rows),
+            ("friends_with.csv", self.friends_with_rows),
+            ("follows.csv", self.follows_rows),
+            ("partners_with.csv", self.partners_with_rows)
+        ]
+
+
+def write_csv(generator: SocialNetworkGenerator, out_dir: str) -> List[Dict[str, Any]]:
+    """Stream every table to ``out_dir``; returns rows, bytes and seconds per file"""
+    os.makedirs(out_dir, exist_ok=True)
+    report = []
+    for filename, rows in generator.tables():
+        path = os.path.join(out_dir, filename)
+        start = time.perf_counter()
+        count = 0
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(TABLES[filename]["columns"])
+            for chunk in rows():
+                writer.writerows(chunk)
+                count += len(chunk)
+        elapsed = time.perf_counter() - start
+        report.append({
+            "file": filename,
+            "rows": count,
+            "bytes": os.path.getsize(path),
+            "seconds": round(elapsed, 2),
+            "rows_per_s": round(count / elapsed) if elapsed else count
+        })
+    return report
+
+
+def main(args):
+    generator = SocialNetworkGenerator(
+        args.people, companies=args.companies, cities=args.cities,
+        friends_per_person=args.friends_per_person, follows_per_person=args.follows_per_person,
+        friend_exponent=args.friend_exponent, follow_exponent=args.follow_exponent,
+        seed=args.seed, chunk_size=args.chunk_size
+    )
+    print(f"Generating {generator.people:,} people, {generator.companies:,} companies and "
+          f"{generator.cities:,} cities into {args.out}")
+    for row in write_csv(generator, args.out):
+        print(f"  {row['file']:<18} {row['rows']:>12,} rows {row['bytes'] / 1e6:>9.1f} MB "
+              f"{row['seconds']:>7.2f}s {row['rows_per_s']:>10,} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic SocialNetwork CSV data")
+    parser.add_argument("--people", type=int, default=100_000)
+    parser.add_argument("--companies", type=int, default=0, help="default: one per 200 people")
+    parser.add_argument("--cities", type=int, default=0, help="default: one per 1000 people, at most 1000")
+    parser.add_argument("--friends-per-person", type=float, default=8.0)
+    parser.add_argument("--follows-per-person", type=float, default=4.0)
+    parser.add_argument("--friend-exponent", type=float, default=0.8)
+    parser.add_argument("--follow-exponent", type=float, default=1.1)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="data")
+    main(parser.parse_args())
@@ -0,0 +1,329 @@
+import time
+import random
+import logging
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+from graph_pool import GraphConnectionPool, GraphUnavailable
+from resilience import RetryPolicy, is_transient
+
+logger = logging.getLogger(__name__)
+
+# Session whose reads should all go to the same host; set per chat turn, copied into tool threads
+_current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("graph_session", default=None)
+
+
+def parse_hosts(spec: str) -> List[str]:
+    """``"http://tg1,http://tg2:14240"`` -> host list, in order (the first one takes writes)"""
+    return [host.strip() for host in spec.split(",") if host.strip()]
+
+
+def set_session(session_id: Optional[str]) -> contextvars.Token:
+    """Pin the current context's graph reads to ``session_id``'s host; undo with ``reset_session``"""
+    return _current_session.set(session_id)
+
+
+def reset_session(token: contextvars.Token):
+    _current_session.reset(token)
+
+
+@contextmanager
+def pinned_session(session_id: Optional[str]):
+    token = set_session(session_id)
+    try:
+        yield
+    finally:
+        reset_session(token)
+
+
+class GraphHost:
+    """One TigerGraph node: its pool, health and latency"""
+
+    def __init__(self, name: str, pool: GraphConnectionPool, primary: bool = False, window: int = 256):
+        self.name = name
+        self.pool = pool
+        self.primary = primary
+        self.latency: Optional[float] = None
+        self.down_until = 0.0
+        self.last_error = ""
+        self.recent: deque = deque(maxlen=window)
+        self.counters = {"requests": 0, "errors": 0, "retried_elsewhere": 0, "health_checks": 0, "health_failures": 0}
+
+    def available(self, now: float) -> bool:
+        """Not marked down, and its circuit breaker lets calls through"""
+        return now >= self.down_until and (self.pool.breaker is None or self.pool.breaker.state != "open")
+
+    def stats(self, now: float, pinned: int) -> Dict[str, Any]:
+        ordered = sorted(self.recent)
+        return {
+            **self.counters,
+            "role": "primary" if self.primary else "replica",
+            "healthy": self.available(now),
+            "latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2) if ordered else None,
+            "in_use": self.pool.in_use,
+            "pinned_sessions": pinned,
+            "breaker": self.pool.breaker.state if self.pool.breaker is not None else "disabled",
+            "down_for": round(max(0.0, self.down_until - now), 1),
+            "last_error": self.last_error
+        }
+
+
+class GraphCluster:
+    """Several TigerGraph hosts behind the GraphConnectionPool API.
+
+    Writes (upserts and the ``writes`` queries) go to the first host, the
+    primary, and are never retried. Reads are balanced over the healthy
+    hosts, weighted towards fast and idle ones: a host's weight is the
+    inverse of its smoothed request latency times its connections in use.
+    A read that fails transiently marks its host down for
+    ``recheck_interval`` seconds and is retried at once on another host;
+    only when every host has been tried does the retry back off. Each host
+    also has its own circuit breaker, and ``check_health`` (run every
+    ``health_interval`` seconds by ``start``) probes every host with an
+    echo, so a recovered host is used again without waiting.
+
+    Reads made while a session is set (``set_session``/``pinned_session``)
+    all go to the host that session was pinned to, so a conversation does
+    not see replicas at different points of replication. The pin moves
+    only when that host is unavailable. With ``pin_sessions`` off every
+    read is balanced.
+
+    ``observer(operation, name, seconds, failed)`` sees every request as
+    with a single pool; ``host_observer(host, seconds, failed)`` sees them
+    per host.
+    """
+
+    def __init__(self, hosts: List[Tuple[str, GraphConnectionPool]], retry: Optional[RetryPolicy] = None,
+                 writes: Iterable[str] = (), recheck_interval: float = 10.0, health_interval: float = 10.0,
+                 pin_sessions: bool = True, max_pins: int = 10000, smoothing: float = 0.2,
+                 rng: Optional[random.Random] = None):
+        if not hosts:
+            raise ValueError("A cluster needs at least one host")
+        self.hosts = [GraphHost(name, pool, primary=i == 0) for i, (name, pool) in enumerate(hosts)]
+        self.retry = retry
+        self.writes = set(writes)
+        self.recheck_interval = recheck_interval
+        self.health_interval = health_interval
+        self.pin_sessions = pin_sessions
+        self.max_pins = max_pins
+        self.smoothing = smoothing
+        self.observer: Optional[Callable[[str, str, float, bool], None]] = None
+        self.host_observer: Optional[Callable[[str, float, bool], None]] = None
+        # The per-host breakers are in stats(); there is no single one for the cluster
+        self.breaker = None
+        self._rng = rng or random.Random()
+        self._pins: "OrderedDict[str, GraphHost]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"requests": 0, "failovers": 0, "retries": 0, "repins": 0, "unavailable": 0}
+        for host in self.hosts:
+            host.pool.observer = self._observer_for(host)
+
+    @classmethod
+    def from_config(cls, config, timeouts: Optional[Dict[str, float]] = None) -> "GraphCluster":
+        hosts = []
+        for name in parse_hosts(config.TIGERGRAPH_HOST):
+            pool = GraphConnectionPool.from_config(config, timeouts=timeouts, host=name)
+            # Failed reads are retried on another host by the cluster, not on the same one by the pool
+            pool.retry = None
+            hosts.append((name, pool))
+        return cls(
+            hosts,
+            retry=RetryPolicy(config.GRAPH_RETRY_ATTEMPTS, config.GRAPH_RETRY_BASE_DELAY, config.GRAPH_RETRY_MAX_DELAY),
+            writes=[name.strip() for name in config.GRAPH_NO_RETRY_QUERIES.split(",") if name.strip()],
+            recheck_interval=config.GRAPH_HOST_RECHECK_INTERVAL,
+            health_interval=config.GRAPH_HEALTH_INTERVAL,
+            pin_sessions=config.GRAPH_SESSION_PINNING
+        )
+
+    def _observer_for(self, host: GraphHost) -> Callable[[str, str, float, bool], None]:
+        def observe(operation: str, name: str, seconds: float, failed: bool):
+            with self._lock:
+                host.counters["requests"] += 1
+                if failed:
+                    host.counters["errors"] += 1
+                else:
+                    host.recent.append(seconds)
+                    host.latency = seconds if host.latency is None else (
+                        host.latency + self.smoothing * (seconds - host.latency))
+            if self.observer is not None:
+                self.observer(operation, name, seconds, failed)
+            if self.host_observer is not None:
+                self.host_observer(host.name, seconds, failed)
+        return observe
+
+    def _mark_down(self, host: GraphHost, error: BaseException):
+        with self._lock:
+            host.down_until = time.monotonic() + self.recheck_interval
+            host.last_error = str(error)[:200]
+        logger.warning(f"TigerGraph host {host.name} marked down for {self.recheck_interval:.0f}s: {error}")
+
+    def _weighted(self, candidates: List[GraphHost]) -> GraphHost:
+        known = [host.latency for host in candidates if host.latency is not None]
+        # A host with no measurements yet is assumed to be as fast as the fastest known one
+        default = min(known) if known else 0.0
+        weights = [1.0 / ((1000 * (host.latency if host.latency is not None else default) + 1) * (1 + host.pool.in_use))
+                   for host in candidates]
+        return self._rng.choices(candidates, weights)[0]
+
+    def _pick(self, tried: List[GraphHost]) -> Optional[GraphHost]:
+        """Host for the next read attempt, or None when no host can take it"""
+        now = time.monotonic()
+        session = _current_session.get() if self.pin_sessions else None
+        with self._lock:
+            pinned = self._pins.get(session) if session is not None else None
+            if pinned is not None:
+                self._pins.move_to_end(session)
+                if pinned not in tried and pinned.available(now):
+                    return pinned
+            available = [host for host in self.hosts if host.available(now)]
+            # Prefer hosts this call has not failed on; retry one it has only when nothing else is left
+            candidates = [host for host in available if host not in tried] or available
+            if not candidates:
+                return None
+            host = self._weighted(candidates)
+            if session is not None:
+                if pinned is not None:
+                    self._stats["repins"] += 1
+                self._pins[session] = host
+                self._pins.move_to_end(session)
+                while len(self._pins) > self.max_pins:
+                    self._pins.popitem(last=False)
+            return host
+
+    def _write(self, operation: str, name: str, fn: Callable[[GraphConnectionPool], Any]) -> Any:
+        with self._lock:
+            self._stats["requests"] += 1
+        return fn(self.hosts[0].pool)
+
+    def _read(self, operation: str, name: str, fn: Callable[[GraphConnectionPool], Any]) -> Any:
+        attempts = max(1, self.retry.attempts) if self.retry is not None else 1
+        tried: List[GraphHost] = []
+        with self._lock:
+            self._stats["requests"] += 1
+        for attempt in range(attempts):
+            host = self._pick(tried)
+            if host is None:
+                with self._lock:
+                    self._stats["unavailable"] += 1
+                raise GraphUnavailable(f"No TigerGraph host is available; not running {name or operation}")
+            if host in tried:
+                # Every host has failed this call once: back off before going round again
+                time.sleep(self.retry.delay(attempt))
+            elif tried:
+                with self._lock:
+                    self._stats["failovers"] += 1
+            try:
+                return fn(host.pool)
+            except Exception as e:
+                if not (isinstance(e, GraphUnavailable) or is_transient(e)):
+                    raise
+                if not isinstance(e, GraphUnavailable):
+                    self._mark_down(host, e)
+                tried.append(host)
+                if attempt + 1 >= attempts:
+                    raise
+                with self._lock:
+                    self._stats["retries"] += 1
+                    host.counters["retried_elsewhere"] += 1
+                logger.warning(f"TigerGraph {name or operation} failed on {host.name} ({e}); retrying")
+
+    def check_health(self) -> Dict[str, bool]:
+        """Echo every host; a host that answers is used again straight away, one that does not is marked down"""
+        results = {}
+        for host in self.hosts:
+            with self._lock:
+                host.counters["health_checks"] += 1
+            try:
+                host.pool.echo()
+            except Exception as e:
+                with self._lock:
+                    host.counters["health_failures"] += 1
+                self._mark_down(host, e)
+                results[host.name] = False
+                continue
+            with self._lock:
+                host.down_until = 0.0
+            results[host.name] = True
+        return results
+
+    def start(self):
+        """Run ``check_health`` every ``health_interval`` seconds on a daemon thread"""
+        if self._thread is not None or self.health_interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tigergraph-health", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.health_interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.warning(f"TigerGraph health check failed: {e}")
+
+    def echo(self) -> str:
+        return self._read("echo", "", lambda pool: pool.echo())
+
+    def runInstalledQuery(self, queryName: str, params: Optional[Dict[str, Any]] = None,
+                          timeout: Optional[float] = None, usePost: bool = False) -> List[Dict[str, Any]]:
+        call = self._write if queryName in self.writes else self._read
+        return call("query", queryName,
+                    lambda pool: pool.runInstalledQuery(queryName, params, timeout=timeout, usePost=usePost))
+
+    def getVertices(self, vertexType: str, select: str = "", where: str = "",
+                    limit: Optional[int] = None, sort: str = "",
+                    timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._read("vertices", vertexType, lambda pool: pool.getVertices(
+            vertexType, select=select, where=where, limit=limit, sort=sort, timeout=timeout))
+
+    def getVertexCount(self, vertexType: str = "*", timeout: Optional[float] = None) -> Any:
+        return self._read("vertex_count", vertexType, lambda pool: pool.getVertexCount(vertexType, timeout=timeout))
+
+    def getEdgeCount(self, edgeType: str = "*", timeout: Optional[float] = None) -> Any:
+        return self._read("edge_count", edgeType, lambda pool: pool.getEdgeCount(edgeType, timeout=timeout))
+
+    def upsertData(self, data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, int]:
+        return self._write("upsert", "", lambda pool: pool.upsertData(data, timeout=timeout))
+
+    def upsertVertices(self, vertexType: str, vertices: List[Any], timeout: Optional[float] = None) -> int:
+        return self._write("upsert", vertexType, lambda pool: pool.upsertVertices(vertexType, vertices, timeout=timeout))
+
+    def upsertEdges(self, sourceVertexType: str, edgeType: str, targetVertexType: str, edges: List[Any],
+                    timeout: Optional[float] = None) -> int:
+        return self._write("upsert", edgeType, lambda pool: pool.upsertEdges(
+            sourceVertexType, edgeType, targetVertexType, edges, timeout=timeout))
+
+    def stats(self) -> Dict[str, Any]:
+        """Cluster counters, pool totals over all hosts, and per-host health, latency and errors"""
+        pools = [host.pool.stats() for host in self.hosts]
+        now = time.monotonic()
+        with self._lock:
+            stats = dict(self._stats)
+            pinned: Dict[str, int] = {}
+            for host in self._pins.values():
+                pinned[host.name] = pinned.get(host.name, 0) + 1
+            hosts = {host.name: host.stats(now, pinned.get(host.name, 0)) for host in self.hosts}
+        for key in ("size", "created", "in_use", "idle", "checkouts", "waits", "exhausted", "errors", "discarded",
+                    "rejected"):
+            stats[key] = sum(pool[key] for pool in pools)
+        stats.update({
+            "hosts_total": len(self.hosts),
+            "hosts_healthy": sum(host["healthy"] for host in hosts.values()),
+            "pinned_sessions": len(self._pins),
+            "hosts": hosts
+        })
+        return stats
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        for host in self.hosts:
+            host.pool.close()
@@ -0,0 +1,521 @@
+import json
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Iterator, Iterable
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from resilience import CircuitBreaker, RetryPolicy, is_transient
+
+logger = logging.getLogger(__name__)
+
+
+class GraphError(Exception):
+    """Raised when REST++ reports an error for a request; ``code`` is its error code, if it gave one"""
+
+    def __init__(self, message: str = "", code: str = ""):
+        super().__init__(message)
+        self.code = code
+
+
+class PoolExhausted(GraphError):
+    """Raised when no pooled connection became free within the checkout timeout"""
+
+
+class GraphUnavailable(GraphError):
+    """Raised without calling TigerGraph while its circuit breaker is open"""
+
+
+# REST++ rejects a parameter it cannot convert with this code; for a VERTEX parameter whose ID does
+# not exist the message is "Failed to convert user vertex id for parameter ..."
+PARAMETER_ERROR_CODE = "REST-30000"
+
+
+def is_unknown_vertex(error: Exception) -> bool:
+    """Whether REST++ rejected a request because a vertex ID parameter does not exist"""
+    return (isinstance(error, GraphError) and error.code == PARAMETER_ERROR_CODE
+            and "convert user vertex id" in str(error).lower())
+
+
+def restpp_url_for(host: str, restpp_port: str = "9000") -> str:
+    """Build the REST++ base URL for a TigerGraph host.
+
+    A host that already carries a port (e.g. http://localhost:14240) is
+    treated as the TigerGraph 4.x nginx endpoint, which serves REST++ under
+    /restpp. Otherwise the dedicated REST++ port is appended.
+    """
+    host = host.rstrip("/")
+    if urlparse(host).port:
+        return f"{host}/restpp"
+    return f"{host}:{restpp_port}"
+
+
+def iter_keyset(fetch_page: Callable[[str, int], List[Dict[str, Any]]], page_size: int,
+                after_id: str = "", key: str = "id") -> Iterator[Dict[str, Any]]:
+    """Stream rows from a keyset-paginated source one page at a time.
+
+    ``fetch_page(after_id, page_size)`` must return rows ordered by ``key``
+    that sort strictly after ``after_id``. Only one page is held in memory,
+    so callers can stop early (e.g. with itertools.islice) without the rest
+    of the vertex set ever being fetched.
+    """
+    while True:
+        page = fetch_page(after_id, page_size)
+        if not page:
+            return
+        yield from page
+        if len(page) < page_size:
+            return
+        after_id = str(page[-1][key])
+
+
+class TokenManager:
+    """Shares one REST++ token between all pooled connections and refreshes it before expiry"""
+
+    def __init__(self, restpp_url: str, graphname: str, secret: str = "",
+                 lifetime: int = 86400, refresh_margin: int = 300, timeout: float = 10.0):
+        self.restpp_url = restpp_url
+        self.graphname = graphname
+        self.secret = secret
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self.refreshes = 0
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.secret)
+
+    def get(self, session: requests.Session) -> Optional[str]:
+        """Return a valid token, requesting a new one only when the cached one is close to expiry"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._token and time.time() < self._expires_at - self.refresh_margin:
+                return self._token
+            response = session.get(
+                f"{self.restpp_url}/requesttoken",
+                params={"secret": self.secret, "lifetime": self.lifetime},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            body = response.json()
+            if body.get("error"):
+                raise GraphError(f"Token request failed: {body.get('message')}")
+            self._token = body["results"]["token"]
+            self._expires_at = float(body.get("expiration") or time.time() + self.lifetime)
+            self.refreshes += 1
+            logger.info("Obtained new TigerGraph REST++ token")
+            return self._token
+
+    def invalidate(self, token: Optional[str] = None):
+        """Drop the cached token; with ``token``, only if it is still the cached one
+
+        Connections that were all turned away with the same expired token
+        then trigger one refresh between them instead of one each.
+        """
+        with self._lock:
+            if token is not None and token != self._token:
+                return
+            self._token = None
+            self._expires_at = 0.0
+
+
+class GraphClient:
+    """A single keep-alive REST++ connection.
+
+    Exposes the subset of the pyTigerGraph.TigerGraphConnection API the
+    chatbot uses, with the same return shapes, so a pool of these can stand
+    in for the shared connection. Instances are not thread-safe; they are
+    meant to be checked out of a GraphConnectionPool by one caller at a time.
+    """
+
+    def __init__(self, restpp_url: str, graphname: str, username: str = "tigergraph",
+                 password: str = "tigergraph", token_manager: Optional[TokenManager] = None,
+                 timeout: float = 30.0):
+        self.restpp_url = restpp_url
+        self.graphname = graphname
+        self.timeout = timeout
+        self.token_manager = token_manager
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        if not (token_manager and token_manager.enabled):
+            self.session.auth = (username, password)
+        self.session.headers.update({"X-User-Agent": "tigergraph-chatbot"})
+
+    def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                 data: Any = None, headers: Optional[Dict[str, str]] = None,
+                 timeout: Optional[float] = None, res_key: Optional[str] = "results") -> Any:
+        timeout = timeout or self.timeout
+        _headers = dict(headers or {})
+        # Ask the server to stop the query at the same deadline we stop waiting
+        _headers.setdefault("GSQL-TIMEOUT", str(int(timeout * 1000)))
+
+        for attempt in range(2):
+            token = self.token_manager.get(self.session) if self.token_manager else None
+            if token:
+                _headers["Authorization"] = f"Bearer {token}"
+            response = self.session.request(
+                method, f"{self.restpp_url}{path}", params=params,
+                data=json.dumps(data) if data is not None else None,
+                headers=_headers, timeout=timeout
+            )
+            # An expired or revoked token gets one refresh and retry
+            if response.status_code == 401 and token and attempt == 0:
+                self.token_manager.invalidate(token)
+                continue
+            break
+
+        response.raise_for_status()
+        body = response.json()
+        if body.get("error"):
+            raise GraphError(body.get("message", "Unknown REST++ error"), code=body.get("code", ""))
+        return body.get(res_key) if res_key else body
+
+    def echo(self) -> str:
+        return self._request("GET", "/echo", res_key="message")
+
+    def runInstalledQuery(self, queryName: str, params: Optional[Dict[str, Any]] = None,
+                          timeout: Optional[float] = None, usePost: bool = False) -> List[Dict[str, Any]]:
+        path = f"/query/{self.graphname}/{queryName}"
+        if usePost:
+            return self._request("POST", path, data=params or {}, timeout=timeout)
+        return self._request("GET", path, params=params or {}, timeout=timeout)
+
+    def getVertices(self, vertexType: str, select: str = "", where: str = "",
+                    limit: Optional[int] = None, sort: str = "",
+                    timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        params = {}
+        if select:
+            params["select"] = select
+        if where:
+            params["filter"] = where
+        if limit:
+            params["limit"] = limit
+        if sort:
+            params["sort"] = sort
+        return self._request("GET", f"/graph/{self.graphname}/vertices/{vertexType}",
+                             params=params, timeout=timeout)
+
+    def _stat(self, function: str, type_key: str, type_name: str,
+              timeout: Optional[float] = None) -> Any:
+        results = self._request("POST", f"/builtins/{self.graphname}",
+                                data={"function": function, "type": type_name}, timeout=timeout)
+        counts = {row[type_key]: row["count"] for row in results or []}
+        return counts if type_name == "*" else counts.get(type_name, 0)
+
+    def getVertexCount(self, vertexType: str = "*", timeout: Optional[float] = None) -> Any:
+        """Vertices of one type, or a ``{type: count}`` dict for ``*``, from the stored statistics"""
+        return self._stat("stat_vertex_number", "v_type", vertexType, timeout=timeout)
+
+    def getEdgeCount(self, edgeType: str = "*", timeout: Optional[float] = None) -> Any:
+        """Edges of one type, or a ``{type: count}`` dict for ``*``, from the stored statistics"""
+        return self._stat("stat_edge_number", "e_type", edgeType, timeout=timeout)
+
+    def upsertData(self, data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, int]:
+        """Upsert a REST++ ``{"vertices": ..., "edges": ...}`` payload; returns the accepted counts"""
+        results = self._request("POST", f"/graph/{self.graphname}", data=data, timeout=timeout)
+        return results[0] if results else {"accepted_vertices": 0, "accepted_edges": 0}
+
+    def upsertVertices(self, vertexType: str, vertices: List[Any], timeout: Optional[float] = None) -> int:
+        """Upsert ``(primary_id, {attribute: value})`` pairs; returns how many were accepted"""
+        payload = {vertexType: {str(vid): {k: {"value": v} for k, v in attributes.items()}
+                                for vid, attributes in vertices}}
+        return self.upsertData({"vertices": payload}, timeout=timeout)["accepted_vertices"]
+
+    def upsertEdges(self, sourceVertexType: str, edgeType: str, targetVertexType: str, edges: List[Any],
+                    timeout: Optional[float] = None) -> int:
+        """Upsert ``(source_id, target_id, {attribute: value})`` triples; returns how many were accepted"""
+        payload: Dict[str, Any] = {}
+        for source, target, attributes in edges:
+            targets = payload.setdefault(str(source), {}).setdefault(edgeType, {}).setdefault(targetVertexType, {})
+            targets[str(target)] = {k: {"value": v} for k, v in attributes.items()}
+        return self.upsertData({"edges": {sourceVertexType: payload}}, timeout=timeout)["accepted_edges"]
+
+    def close(self):
+        self.session.close()
+
+
+class GraphConnectionPool:
+    """Bounded pool of GraphClient connections with checkout backpressure.
+
+    Connections are created lazily up to ``size``. When all of them are in
+    use, callers wait up to ``checkout_timeout`` seconds for one to be
+    returned and then fail fast with PoolExhausted instead of piling up.
+    The pool proxies the GraphClient methods so it can be used
+    wherever a single connection was used before. ``observer``, if set, is
+    called as ``observer(operation, name, seconds, failed)`` after every
+    proxied request attempt, e.g. to feed latency metrics.
+
+    Proxied requests go through ``breaker`` and ``retry`` when given:
+    - While the breaker is open, requests fail at once with GraphUnavailable.
+    - Reads that fail transiently (connection errors, timeouts, 5xx) are
+      retried with backoff. Upserts and the queries in ``no_retry`` are
+      never retried.
+    - ``timeouts`` sets a per-query timeout in seconds, used when the
+      caller does not pass one.
+    """
+
+    def __init__(self, factory: Callable[[], GraphClient], size: int = 8, checkout_timeout: float = 10.0,
+                 token_manager: Optional[TokenManager] = None,
+                 observer: Optional[Callable[[str, str, float, bool], None]] = None,
+                 breaker: Optional[CircuitBreaker] = None, retry: Optional[RetryPolicy] = None,
+                 timeouts: Optional[Dict[str, float]] = None, no_retry: Iterable[str] = ()):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.factory = factory
+        self.token_manager = token_manager
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.observer = observer
+        self.breaker = breaker
+        self.retry = retry
+        self.timeouts = dict(timeouts or {})
+        self.no_retry = set(no_retry)
+        self._idle: "queue.LifoQueue[GraphClient]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "exhausted": 0,
+            "errors": 0,
+            "discarded": 0,
+            "retries": 0,
+            "rejected": 0
+        }
+
+    @classmethod
+    def from_config(cls, config, timeouts: Optional[Dict[str, float]] = None,
+                    host: Optional[str] = None) -> "GraphConnectionPool":
+        """Pool for TIGERGRAPH_HOST, or for ``host`` (one node of a cluster, with its own breaker)"""
+        restpp_url = restpp_url_for(host or config.TIGERGRAPH_HOST, config.TIGERGRAPH_RESTPP_PORT)
+        token_manager = TokenManager(
+            restpp_url, config.TIGERGRAPH_GRAPH_NAME,
+            secret=config.TIGERGRAPH_SECRET,
+            lifetime=config.TIGERGRAPH_TOKEN_LIFETIME
+        )
+
+        def factory() -> GraphClient:
+            return GraphClient(
+                restpp_url, config.TIGERGRAPH_GRAPH_NAME,
+                username=config.TIGERGRAPH_USERNAME,
+                password=config.TIGERGRAPH_PASSWORD,
+                token_manager=token_manager,
+                timeout=config.TIGERGRAPH_QUERY_TIMEOUT
+            )
+
+        return cls(
+            factory, size=config.TIGERGRAPH_POOL_SIZE,
+            checkout_timeout=config.TIGERGRAPH_POOL_TIMEOUT, token_manager=token_manager,
+            breaker=CircuitBreaker(f"tigergraph:{host}" if host else "tigergraph",
+                                   config.GRAPH_BREAKER_THRESHOLD, config.GRAPH_BREAKER_RESET),
+            retry=RetryPolicy(config.GRAPH_RETRY_ATTEMPTS, config.GRAPH_RETRY_BASE_DELAY, config.GRAPH_RETRY_MAX_DELAY),
+            timeouts=timeouts,
+            no_retry=[name.strip() for name in config.GRAPH_NO_RETRY_QUERIES.split(",") if name.strip()]
+        )
+
+    @property
+    def in_use(self) -> int:
+        """Connections currently checked out"""
+        return self._in_use
+
+    def _acquire(self) -> GraphClient:
+        start = time.perf_counter()
+        waited = False
+        while True:
+            if self._closed:
+                raise GraphError("Connection pool is closed")
+            try:
+                client = self._idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    client = self.factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                break
+            remaining = self.checkout_timeout - (time.perf_counter() - start)
+            if remaining <= 0:
+                with self._lock:
+                    self._stats["exhausted"] += 1
+                raise PoolExhausted(
+                    f"No TigerGraph connection available after {self.checkout_timeout:.1f}s "
+                    f"({self.size} in use)"
+                )
+            waited = True
+            try:
+                client = self._idle.get(timeout=remaining)
+                break
+            except queue.Empty:
+                continue
+
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            self._stats["total_wait_ms"] += wait_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+            if waited:
+                self._stats["waits"] += 1
+        return client
+
+    def _release(self, client: GraphClient, broken: bool = False):
+        with self._lock:
+            self._in_use -= 1
+            if broken:
+                self._created -= 1
+                self._stats["discarded"] += 1
+        if broken or self._closed:
+            client.close()
+        else:
+            self._idle.put(client)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the block"""
+        client = self._acquire()
+        broken = False
+        try:
+            yield client
+        except (GraphError, requests.HTTPError):
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        except Exception:
+            # Transport-level failures may leave the session in a bad state
+            with self._lock:
+                self._stats["errors"] += 1
+            broken = True
+            raise
+        finally:
+            self._release(client, broken=broken)
+
+    @contextmanager
+    def _observed(self, operation: str, name: str = ""):
+        """Check out a connection, reporting the request's latency (including the checkout) to the observer"""
+        start = time.perf_counter()
+        failed = True
+        try:
+            with self.connection() as conn:
+                yield conn
+            failed = False
+        finally:
+            if self.observer is not None:
+                self.observer(operation, name, time.perf_counter() - start, failed)
+
+    def _call(self, operation: str, name: str, fn: Callable[[GraphClient], Any], idempotent: bool = True) -> Any:
+        """Run ``fn`` on a pooled connection, behind the circuit breaker and with retries for idempotent reads"""
+        if self.breaker is not None and not self.breaker.allow():
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise GraphUnavailable(
+                f"TigerGraph is unavailable (circuit open after repeated failures); not running {name or operation}"
+            )
+        attempts = self.retry.attempts if self.retry is not None and idempotent and name not in self.no_retry else 1
+        for attempt in range(max(1, attempts)):
+            try:
+                with self._observed(operation, name) as conn:
+                    result = fn(conn)
+            except Exception as e:
+                if not is_transient(e):
+                    # TigerGraph answered (e.g. a bad parameter), so it is up
+                    if self.breaker is not None:
+                        self.breaker.record_success()
+                    raise
+                if attempt + 1 >= attempts or (self.breaker is not None and self.breaker.state == "open"):
+                    if self.breaker is not None:
+                        self.breaker.record_failure()
+                    raise
+                with self._lock:
+                    self._stats["retries"] += 1
+                delay = self.retry.delay(attempt)
+                logger.warning(f"TigerGraph {name or operation} failed ({e}); retry {attempt + 1} in {delay * 1000:.0f}ms")
+                time.sleep(delay)
+                continue
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return result
+
+    def echo(self) -> str:
+        return self._call("echo", "", lambda conn: conn.echo())
+
+    def runInstalledQuery(self, queryName: str, params: Optional[Dict[str, Any]] = None,
+                          timeout: Optional[float] = None, usePost: bool = False) -> List[Dict[str, Any]]:
+        timeout = timeout or self.timeouts.get(queryName)
+        return self._call("query", queryName,
+                          lambda conn: conn.runInstalledQuery(queryName, params, timeout=timeout, usePost=usePost))
+
+    def getVertices(self, vertexType: str, select: str = "", where: str = "",
+                    limit: Optional[int] = None, sort: str = "",
+                    timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._call("vertices", vertexType, lambda conn: conn.getVertices(
+            vertexType, select=select, where=where, limit=limit, sort=sort, timeout=timeout))
+
+    def getVertexCount(self, vertexType: str = "*", timeout: Optional[float] = None) -> Any:
+        return self._call("vertex_count", vertexType, lambda conn: conn.getVertexCount(vertexType, timeout=timeout))
+
+    def getEdgeCount(self, edgeType: str = "*", timeout: Optional[float] = None) -> Any:
+        return self._call("edge_count", edgeType, lambda conn: conn.getEdgeCount(edgeType, timeout=timeout))
+
+    def upsertData(self, data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, int]:
+        return self._call("upsert", "", lambda conn: conn.upsertData(data, timeout=timeout), idempotent=False)
+
+    def upsertVertices(self, vertexType: str, vertices: List[Any], timeout: Optional[float] = None) -> int:
+        return self._call("upsert", vertexType, lambda conn: conn.upsertVertices(vertexType, vertices, timeout=timeout),
+                          idempotent=False)
+
+    def upsertEdges(self, sourceVertexType: str, edgeType: str, targetVertexType: str, edges: List[Any],
+                    timeout: Optional[float] = None) -> int:
+        return self._call("upsert", edgeType, lambda conn: conn.upsertEdges(
+            sourceVertexType, edgeType, targetVertexType, edges, timeout=timeout), idempotent=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool utilisation for monitoring"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "avg_wait_ms": round(stats["total_wait_ms"] / stats["checkouts"], 3) if stats["checkouts"] else 0.0,
+                "total_wait_ms": round(stats["total_wait_ms"], 3),
+                "max_wait_ms": round(stats["max_wait_ms"], 3)
+            })
+        if self.token_manager is not None:
+            stats["token_refreshes"] = self.token_manager.refreshes
+        if self.breaker is not None:
+            stats["breaker"] = self.breaker.stats()
+        return stats
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
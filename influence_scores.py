@@ -0,0 +1,185 @@
+import time
+import logging
+import threading
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InfluenceLeaderboard:
+    """Keeps the precomputed influencer leaderboard in TigerGraph fresh.
+
+    FindTopInfluencers only reads the leaderboard, so its scores are as
+    fresh as the last refresh. A full ComputeInfluenceScores run rescoring
+    everyone (and re-running PageRank) happens every ``refresh_interval``
+    seconds. People whose FRIENDS_WITH or FOLLOWS edges changed can be
+    queued with ``mark_changed`` in the meantime; they are rescored in
+    batches of ``batch_size`` by RefreshInfluenceScores.
+
+    ``run_query(name, params)`` runs an installed query uncached.
+    ``on_update()`` is called after every refresh so cached top-k results
+    can be dropped. ``start()`` runs the schedule on a daemon thread that
+    wakes every ``check_interval`` seconds, or sooner after
+    ``request_check()``. Requests coalesce: while one check is queued,
+    further requests are dropped.
+    """
+
+    def __init__(self, run_query: Callable[[str, Dict[str, Any]], List[Dict[str, Any]]],
+                 board_size: int = 1000, refresh_interval: float = 3600.0, batch_size: int = 500,
+                 with_pagerank: bool = True, check_interval: float = 30.0,
+                 on_update: Optional[Callable[[], None]] = None):
+        self.run_query = run_query
+        self.board_size = board_size
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.with_pagerank = with_pagerank
+        self.check_interval = check_interval
+        self.on_update = on_update
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._pending: set = set()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._check_requested = False
+        self._helper: Optional[threading.Thread] = None
+        self._thread: Optional[threading.Thread] = None
+        self.last_full_refresh = 0.0
+        self.last_incremental = 0.0
+        self.last_result: Dict[str, Any] = {}
+        self.stats_counters = {"full_refreshes": 0, "incremental_refreshes": 0, "rescored": 0, "refresh_errors": 0,
+                               "check_requests": 0, "check_requests_dropped": 0}
+
+    def mark_changed(self, person_ids: Iterable[str]) -> int:
+        """Queue people whose friendships or follows changed; returns the queue length"""
+        with self._lock:
+            self._pending.update(str(person_id) for person_id in person_ids)
+            return len(self._pending)
+
+    def mark_stale(self):
+        """Force a full refresh on the next check, e.g. after a bulk data load"""
+        self.last_full_refresh = 0.0
+
+    def refresh(self) -> Dict[str, Any]:
+        """Rescore everyone and rebuild the board"""
+        with self._refresh_lock:
+            with self._lock:
+                # A full run covers everything queued before it started
+                self._pending.clear()
+            result = self.run_query("ComputeInfluenceScores", {
+                "board_size": self.board_size,
+                "with_pagerank": self.with_pagerank
+            })
+            self.last_result = result[0] if result else {}
+            self.last_full_refresh = self.last_incremental = time.time()
+            self.stats_counters["full_refreshes"] += 1
+            logger.info(f"Influence leaderboard rebuilt: {self.last_result}")
+        self._notify()
+        return self.last_result
+
+    def flush(self) -> int:
+        """Rescore queued people in batches; returns how many were rescored"""
+        rescored = 0
+        with self._refresh_lock:
+            while True:
+                with self._lock:
+                    batch = sorted(self._pending)[:self.batch_size]
+                    self._pending.difference_update(batch)
+                if not batch:
+                    break
+                try:
+                    self.run_query("RefreshInfluenceScores", {"people": batch, "board_size": self.board_size})
+                except Exception:
+                    self.mark_changed(batch)
+                    raise
+                rescored += len(batch)
+            if rescored:
+                self.last_incremental = time.time()
+                self.stats_counters["incremental_refreshes"] += 1
+                self.stats_counters["rescored"] += rescored
+        if rescored:
+            self._notify()
+        return rescored
+
+    def _notify(self):
+        if self.on_update:
+            self.on_update()
+
+    def request_check(self) -> bool:
+        """Have a check run soon, without waiting for it; False if one is already queued
+
+        Wakes the scheduler thread, or a single helper thread when the
+        schedule is not started. A check that is already running does not
+        count as queued: new changes may have arrived after it read the
+        queue.
+        """
+        with self._lock:
+            if self._check_requested:
+                self.stats_counters["check_requests_dropped"] += 1
+                return False
+            self._check_requested = True
+            self.stats_counters["check_requests"] += 1
+            helper = None
+            if self._thread is None and self._helper is None:
+                helper = self._helper = threading.Thread(target=self._run_requested, name="influence-check", daemon=True)
+        if self._thread is not None:
+            self._wake.set()
+        elif helper is not None:
+            helper.start()
+        return True
+
+    def _run_requested(self):
+        while True:
+            with self._lock:
+                if not self._check_requested:
+                    self._helper = None
+                    return
+            self.check()
+
+    def check(self):
+        """Run whatever refresh is due: a full one when stale, otherwise queued people"""
+        with self._lock:
+            self._check_requested = False
+        try:
+            if time.time() - self.last_full_refresh > self.refresh_interval:
+                self.refresh()
+            elif self._pending:
+                self.flush()
+        except Exception as e:
+            self.stats_counters["refresh_errors"] += 1
+            logger.warning(f"Influence leaderboard refresh failed: {e}")
+
+    def start(self, initial_delay: Optional[float] = None):
+        """Check on a daemon thread every ``check_interval`` seconds"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            # Give the app time to finish starting before the first (possibly full) refresh
+            self._wake.wait(self.check_interval if initial_delay is None else initial_delay)
+            while not self._stop.is_set():
+                self._wake.clear()
+                self.check()
+                self._wake.wait(self.check_interval)
+
+        self._thread = threading.Thread(target=run, name="influence-leaderboard", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            **self.stats_counters,
+            "board_size": self.board_size,
+            "pending": pending,
+            "last_full_refresh": self.last_full_refresh,
+            "last_incremental": self.last_incremental,
+            "last_result": self.last_result
+        }
@@ -0,0 +1,296 @@
+import re
+import difflib
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Iterable, Callable, Tuple
+
+_PERSON_RE = re.compile(r"\bperson_\d+\b", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"\b\d{1,3}\b")
+_DEPARTMENT_RE = re.compile(r"\b([a-z]+) (?:department|dept|team)\b", re.IGNORECASE)
+_WORD_RE = re.compile(r"<\w+>|[a-z']+")
+
+# Words that signal a question needs reasoning the templates can't do
+_COMPLEX_CUES = {"compare", "why", "and", "versus", "vs", "between", "both", "difference", "recommend", "should"}
+
+# Complex cues that are part of a route's own phrasing ("between person_001 and person_002")
+_ROUTE_ALLOWED_CUES = {"connections": {"and", "between"}}
+
+# Route name -> (tool name, installed query whose example questions seed the route)
+ROUTES = {
+    "person_info": ("get_person_info", "GetPersonInfo"),
+    "connections": ("find_connections", "FindConnections"),
+    "company_employees": ("get_company_employees", "GetCompanyEmployees"),
+    "top_influencers": ("find_top_influencers", "FindTopInfluencers"),
+    "network_analytics": ("get_network_analytics", "GetNetworkAnalytics")
+}
+
+# Keywords that must appear for a route to be considered at all
+_ROUTE_CUES = {
+    "person_info": {"about", "details", "info", "information", "who", "profile", "show", "tell"},
+    "connections": {"connected", "connection", "connections", "relationship", "path", "link", "linked", "know"},
+    "company_employees": {"works", "work", "working", "employees", "employee", "staff", "employs"},
+    "top_influencers": {"influencers", "influential", "influencer", "connected", "popular"},
+    "network_analytics": {"statistics", "stats", "analytics", "overview", "metrics", "summary"}
+}
+
+# Filler words that never change what a question asks for
+_FILLER = {"a", "an", "the", "me", "please", "can", "could", "you", "i", "want", "to", "know", "what", "is", "are", "of", "in", "on", "for", "at", "do", "give", "show", "tell", "list", "all"}
+
+# Extra phrasings on top of the query_descriptions examples
+_EXTRA_EXAMPLES = {
+    "person_info": ["Who is person_001?", "Give me the profile of person_002"],
+    "company_employees": ["Who is employed by TechCorp?", "List the staff at DataSystems"],
+    "top_influencers": ["Who are the 10 most influential people?"],
+    "network_analytics": ["Network stats", "Summarize the network metrics"]
+}
+
+
+@dataclass
+class RouteMatch:
+    route: str
+    tool: str
+    arguments: Dict[str, Any]
+    confidence: float
+
+
+@dataclass
+class _Entities:
+    people: List[str] = field(default_factory=list)
+    companies: List[str] = field(default_factory=list)
+    numbers: List[int] = field(default_factory=list)
+    department: str = ""
+
+
+class IntentRouter:
+    """Deterministic fast path for common questions.
+
+    Each message is reduced to a token sequence with entities replaced by
+    placeholders (``<person>``, ``<company>``, ``<num>``, ``<dept>``) and
+    compared against the example questions in the chatbot's
+    query_descriptions. A route is only taken when its cue words are
+    present, the entities it needs are there (and no unused ones are), and
+    confidence clears ``min_confidence``; everything else falls back to the
+    agent. Per-route hit and fallback counts are kept for monitoring.
+    """
+
+    def __init__(self, query_descriptions: Dict[str, Any], companies: Iterable[str] = (),
+                 min_confidence: float = 0.65, max_words: int = 16):
+        self.min_confidence = min_confidence
+        self.max_words = max_words
+        self._lock = threading.Lock()
+        self._companies: Dict[str, str] = {}
+        self.set_companies(companies)
+        self._examples: Dict[str, List[List[str]]] = {}
+        self._vocabulary: Dict[str, set] = {}
+        for route, (_, query_name) in ROUTES.items():
+            examples = list(query_descriptions.get(query_name, {}).get("example_questions", []))
+            examples += _EXTRA_EXAMPLES.get(route, [])
+            self._examples[route] = [self._normalize(example)[0] for example in examples]
+            self._vocabulary[route] = _FILLER.union(_ROUTE_CUES[route], *self._examples[route])
+        self._metrics = {"messages": 0, "routed": 0, "fallbacks": 0}
+        self._route_metrics = {route: {"hits": 0, "low_confidence": 0, "tool_fallbacks": 0} for route in ROUTES}
+
+    def set_companies(self, companies: Iterable[str]):
+        """Replace the known company names used for entity matching"""
+        names = {name.lower(): name for name in companies if name}
+        with self._lock:
+            self._companies = names
+
+    def _extract(self, message: str) -> _Entities:
+        entities = _Entities()
+        entities.people = [match.lower() for match in _PERSON_RE.findall(message)]
+        lowered = message.lower()
+        # Longest names first so "MobileApps Inc" wins over a shorter overlapping name
+        for key in sorted(self._companies, key=len, reverse=True):
+            if re.search(rf"\b{re.escape(key)}\b", lowered) and not any(key in c.lower() for c in entities.companies):
+                entities.companies.append(self._companies[key])
+        department = _DEPARTMENT_RE.search(message)
+        if department:
+            entities.department = department.group(1).capitalize()
+        without_ids = _PERSON_RE.sub(" ", message)
+        entities.numbers = [int(n) for n in _NUMBER_RE.findall(without_ids)]
+        return entities
+
+    def entity_signature(self, message: str) -> str:
+        """Canonical string of the entities a message mentions; equal for questions about the same things"""
+        entities = self._extract(message)
+        return "|".join([
+            ",".join(sorted(set(entities.people))),
+            ",".join(sorted(company.lower() for company in entities.companies)),
+            ",".join(str(n) for n in sorted(set(entities.numbers))),
+            entities.department.lower()
+        ])
+
+    def _normalize(self, message: str) -> Tuple[List[str], _Entities]:
+        entities = self._extract(message)
+        text = _PERSON_RE.sub(" <person> ", message)
+        for company in entities.companies:
+            text = re.sub(rf"\b{re.escape(company)}\b", " <company> ", text, flags=re.IGNORECASE)
+        if entities.department:
+            text = _DEPARTMENT_RE.sub(" <dept> ", text)
+        text = _NUMBER_RE.sub(" <num> ", text)
+        return _WORD_RE.findall(text.lower()), entities
+
+    def _arguments(self, route: str, entities: _Entities) -> Optional[Dict[str, Any]]:
+        """Tool arguments for a route, or None when the entities don't fit it exactly"""
+        people, companies, numbers = entities.people, entities.companies, entities.numbers
+        if route == "person_info":
+            if len(people) == 1 and not companies and not numbers:
+                return {"person_id": people[0]}
+        elif route == "connections":
+            if len(people) == 2 and not companies and not numbers:
+                return {"source_person": people[0], "target_person": people[1]}
+        elif route == "company_employees":
+            if len(companies) == 1 and not people and not numbers:
+                return {"company_name": companies[0], "department": entities.department}
+        elif route == "top_influencers":
+            if not people and not companies and len(numbers) <= 1:
+                return {"limit_count": max(1, min(numbers[0], 50))} if numbers else {}
+        elif route == "network_analytics":
+            if not people and not companies and not numbers:
+                return {}
+        return None
+
+    def match(self, message: str) -> Optional[RouteMatch]:
+        """Best route for a message, or None when the agent should handle it"""
+        tokens, entities = self._normalize(message)
+        if not tokens or len(tokens) > self.max_words:
+            return None
+        complex_cues = _COMPLEX_CUES.intersection(tokens)
+
+        candidates: List[RouteMatch] = []
+        for route, (tool, _) in ROUTES.items():
+            if complex_cues - _ROUTE_ALLOWED_CUES.get(route, set()):
+                continue
+            if not _ROUTE_CUES[route].intersection(tokens):
+                continue
+            arguments = self._arguments(route, entities)
+            if arguments is None:
+                continue
+            similarity = max(
+                (difflib.SequenceMatcher(None, tokens, example).ratio() for example in self._examples[route]),
+                default=0.0
+            )
+            # Words the route has never seen ("manager", "salary") suggest a question the template can't answer
+            unknown = sum(1 for token in tokens if token not in self._vocabulary[route])
+            confidence = similarity * (1 - 0.5 * unknown / len(tokens))
+            candidates.append(RouteMatch(route, tool, arguments, round(confidence, 3)))
+
+        if not candidates:
+            return None
+        candidates.sort(key=lambda candidate: candidate.confidence, reverse=True)
+        best = candidates[0]
+        # Two routes that fit about equally well is ambiguous; let the agent decide
+        if len(candidates) > 1 and best.confidence - candidates[1].confidence < 0.1:
+            return None
+        return best
+
+    def route(self, message: str) -> Optional[RouteMatch]:
+        """Match a message and record the outcome in the routing metrics"""
+        result = self.match(message)
+        with self._lock:
+            self._metrics["messages"] += 1
+            if result is None:
+                self._metrics["fallbacks"] += 1
+                return None
+            if result.confidence < self.min_confidence:
+                self._metrics["fallbacks"] += 1
+                self._route_metrics[result.route]["low_confidence"] += 1
+                return None
+        return result
+
+    def record(self, route: str, served: bool):
+        """Record whether a matched route was answered or had to fall back to the agent"""
+        with self._lock:
+            if served:
+                self._metrics["routed"] += 1
+                self._route_metrics[route]["hits"] += 1
+            else:
+                self._metrics["fallbacks"] += 1
+                self._route_metrics[route]["tool_fallbacks"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            messages = self._metrics["messages"]
+            routes = {}
+            for route, counts in self._route_metrics.items():
+                attempts = sum(counts.values())
+                routes[route] = {**counts, "hit_rate": round(counts["hits"] / attempts, 4) if attempts else 0.0}
+            return {
+                **self._metrics,
+                "hit_rate": round(self._metrics["routed"] / messages, 4) if messages else 0.0,
+                "known_companies": len(self._companies),
+                "routes": routes
+            }
+
+
+def _render_person(payload: Dict[str, Any], arguments: Dict[str, Any]) -> str:
+    p = payload["person"]
+    return (
+        f"**{p['first_name']} {p['last_name']}** ({p['id']}) works as {p['job_title']} at {p['company_name']} "
+        f"and is based in {p['city_name']}, {p['state']}. They are {p['age']} years old and can be reached at {p['email']}."
+    )
+
+
+def _render_connections(payload: Dict[str, Any], arguments: Dict[str, Any]) -> str:
+    return (
+        f"{arguments['source_person']} and {arguments['target_person']} are {payload['hops']} hop(s) apart:\n"
+        f"{payload['description']}"
+    )
+
+
+def _render_employees(payload: Dict[str, Any], arguments: Dict[str, Any], max_rows: int = 20) -> str:
+    employees = payload["employees"]
+    total = payload.get("total", len(employees))
+    dept_text = f" in the {arguments['department']} department" if arguments.get("department") else ""
+    lines = [f"{total} employee(s) work at {arguments['company_name']}{dept_text}:"]
+    for e in employees[:max_rows]:
+        lines.append(f"- {e['full_name']} ({e['person_id']}): {e['job_title']}, {e['department']}")
+    if total > min(len(employees), max_rows):
+        lines.append(f"...and {total - min(len(employees), max_rows)} more.")
+    return "\n".join(lines)
+
+
+def _render_influencers(payload: Dict[str, Any], arguments: Dict[str, Any]) -> str:
+    lines = [f"Top {len(payload['influencers'])} influencer(s) in the network:"]
+    for rank, i in enumerate(payload["influencers"], 1):
+        lines.append(
+            f"{rank}. {i['full_name']} ({i['person_id']}), {i['job_title']} at {i['company_name']}: "
+            f"{i['friend_count']} friends, {i['follower_count']} followers, influence score {i['influence_score']:g}"
+        )
+    return "\n".join(lines)
+
+
+def _render_analytics(payload: Dict[str, Any], arguments: Dict[str, Any]) -> str:
+    lines = ["Here are the current network statistics:"]
+    for metric in payload["metrics"]:
+        value = metric["value"]
+        value = f"{value:,.0f}" if float(value).is_integer() else f"{value:.4f}"
+        lines.append(f"- {metric['description']}: {value}")
+    snapshot = payload.get("snapshot")
+    if snapshot:
+        note = "; a refresh is in progress" if snapshot["stale"] else ""
+        lines.append(f"_As of {snapshot['computed_at']} ({snapshot['age_seconds']:g}s ago{note})._")
+    return "\n".join(lines)
+
+
+RENDERERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], str]] = {
+    "person_info": _render_person,
+    "connections": _render_connections,
+    "company_employees": _render_employees,
+    "top_influencers": _render_influencers,
+    "network_analytics": _render_analytics
+}
+
+
+def render_answer(match: RouteMatch, payload: Dict[str, Any]) -> Optional[str]:
+    """Templated answer for a tool result; None means the agent should take over"""
+    status = payload.get("status")
+    if status == "not_found":
+        return payload.get("message")
+    if status != "success":
+        return None
+    try:
+        return RENDERERS[match.route](payload, match.arguments)
+    except (KeyError, TypeError, ValueError):
+        return None
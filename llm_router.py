@@ -0,0 +1,428 @@
+"""Route each LLM call to a small or a large deployment.
+
+Most ReAct steps are easy: picking get_person_info for an explicit
+person_001, or turning a single observation into an answer. ``RoutedLLM``
+sends those to a small, fast deployment. The large one gets the steps
+that need it:
+- multi-step reasoning, i.e. anything after the first few tool results
+- turns where a tool just reported an error
+- prompts too long for the small deployment
+- calls the small deployment failed, or answered with a ReAct reply the
+  agent could not parse (the call is retried on the large deployment)
+
+The decision is made per call by a ``RoutingPolicy`` from the messages
+alone, so it works the same for the ReAct and function-calling agents
+and for session summaries. A circuit breaker keeps calls off the small
+deployment while it is failing. Every call is counted per deployment:
+latency, prompt and completion tokens (estimated when the backend does
+not report them, as the scripted test LLMs do) and the cost they imply.
+"""
+
+import re
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Any, Callable, Optional, Sequence, Tuple
+
+from llama_index.core.agent.react.output_parser import ReActOutputParser
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseAsyncGen,
+    ChatResponseGen,
+    CompletionResponse,
+    CompletionResponseGen,
+    LLMMetadata,
+    MessageRole,
+)
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms import CustomLLM
+from llama_index.core.llms.callbacks import llm_chat_callback, llm_completion_callback
+from llama_index.core.llms.function_calling import FunctionCallingLLM
+
+from llm_telemetry import response_usage
+from metrics import current_trace
+from resilience import CircuitBreaker, is_transient
+
+MODES = ("tiered", "small", "large")
+
+# A tool result reporting a failure: our tools' {"status": "error"} payloads in any result format,
+# and the "Error: ..." observations the ReAct agent writes for unknown tools or bad arguments
+_TOOL_ERROR_RE = re.compile(r'^(?:Observation:\s*)?Error\b|"?status"?\s*:\s*"?error\b', re.MULTILINE)
+_REACT_HEADER = "Action Input:"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token), for routing and for backends that report no usage"""
+    return (len(text) + 3) // 4
+
+
+def _is_observation(message: ChatMessage) -> bool:
+    return message.role == MessageRole.TOOL or (
+        message.role == MessageRole.USER and (message.content or "").startswith("Observation:"))
+
+
+def conversation_state(messages: Sequence[ChatMessage]) -> Tuple[int, bool]:
+    """Agent steps taken since the user's latest question, and whether a tool result since then is an error
+
+    Each step is one assistant message: a ReAct action, or a function-calling
+    reply requesting tools. Observations follow as user (ReAct) or tool
+    (function calling) messages.
+    """
+    steps, tool_error = 0, False
+    for message in reversed(messages):
+        if message.role == MessageRole.ASSISTANT:
+            steps += 1
+        elif _is_observation(message):
+            tool_error = tool_error or bool(_TOOL_ERROR_RE.search(message.content or ""))
+        elif message.role == MessageRole.USER:
+            break
+    return steps, tool_error
+
+
+def parse_prices(spec: str) -> Tuple[float, float]:
+    """``"prompt,completion"`` price per 1K tokens, e.g. ``"0.03,0.06"``; empty means not priced"""
+    if not spec.strip():
+        return 0.0, 0.0
+    prompt, _, completion = spec.partition(",")
+    return float(prompt), float(completion or prompt)
+
+
+@dataclass
+class RoutingPolicy:
+    """Which deployment a call goes to, judged from its messages
+
+    ``mode``: ``tiered`` (small first, large when needed), ``small`` or
+    ``large`` (everything on one deployment; ``small`` still falls back to
+    the large one on failures). ``small_max_steps``: agent steps already
+    taken in the turn that the small deployment still handles; one covers
+    choosing a tool and answering from its result. Prompts estimated above
+    ``small_max_prompt_tokens`` go to the large deployment, as do steps
+    right after a tool error when ``escalate_on_tool_error``.
+    """
+
+    mode: str = "tiered"
+    small_max_steps: int = 1
+    small_max_prompt_tokens: int = 6000
+    escalate_on_tool_error: bool = True
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown LLM routing mode {self.mode!r}; expected one of {', '.join(MODES)}")
+
+    def route(self, messages: Sequence[ChatMessage]) -> Tuple[str, str]:
+        """``(tier, reason)`` for one call"""
+        if self.mode != "tiered":
+            return self.mode, "policy"
+        steps, tool_error = conversation_state(messages)
+        if tool_error and self.escalate_on_tool_error:
+            return "large", "tool_error"
+        if steps > self.small_max_steps:
+            return "large", "multi_step"
+        if sum(estimate_tokens(m.content or "") for m in messages) > self.small_max_prompt_tokens:
+            return "large", "long_prompt"
+        return "small", "first_step" if steps == 0 else "early_step"
+
+
+def react_reply_ok(messages: Sequence[ChatMessage], text: str) -> bool:
+    """Whether the ReAct agent can parse ``text``; replies to anything but a ReAct prompt always pass"""
+    if not any(m.role == MessageRole.SYSTEM and _REACT_HEADER in (m.content or "") for m in messages):
+        return True
+    try:
+        ReActOutputParser().parse(text)
+    except Exception:
+        return False
+    return True
+
+
+class _DeploymentStats:
+    """Counters for one deployment; callers hold the router's lock"""
+
+    def __init__(self, name: str, prices: Tuple[float, float], window: int = 512):
+        self.name = name
+        self.prices = prices
+        self.counters = {"calls": 0, "errors": 0, "rejected_replies": 0, "prompt_tokens": 0,
+                         "completion_tokens": 0, "estimated_token_calls": 0}
+        self.total_seconds = 0.0
+        self.recent: deque = deque(maxlen=window)
+
+    def record(self, seconds: float, usage: Dict[str, int], estimated: bool, failed: bool):
+        self.counters["calls"] += 1
+        self.counters["errors"] += failed
+        self.counters["estimated_token_calls"] += estimated and not failed
+        for kind in ("prompt_tokens", "completion_tokens"):
+            self.counters[kind] += usage.get(kind, 0)
+        self.total_seconds += seconds
+        self.recent.append(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.recent)
+        calls = self.counters["calls"]
+        cost = (self.counters["prompt_tokens"] * self.prices[0] + self.counters["completion_tokens"] * self.prices[1]) / 1000
+        return {
+            "deployment": self.name,
+            **self.counters,
+            "avg_ms": round(1000 * self.total_seconds / calls, 1) if calls else 0.0,
+            "p50_ms": round(1000 * ordered[len(ordered) // 2], 1) if ordered else 0.0,
+            "p95_ms": round(1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1) if ordered else 0.0,
+            "cost": round(cost, 6)
+        }
+
+
+class RoutedLLM(FunctionCallingLLM, CustomLLM):
+    """LLM that forwards each call to ``small`` or ``large`` as ``policy`` decides
+
+    Function-calling requests are prepared by the large deployment and sent
+    to whichever is chosen, so both should speak the same tool format (two
+    Azure OpenAI deployments do). ``observer(deployment, reason, seconds,
+    failed, usage)`` is told about every backend call, e.g. to export
+    per-deployment metrics.
+    """
+
+    small: Any = Field(exclude=True, description="Cheap, fast deployment for easy steps")
+    large: Any = Field(exclude=True, description="Deployment for multi-step reasoning and fallbacks")
+    policy: Any = Field(default_factory=RoutingPolicy, exclude=True)
+    small_name: str = Field(default="small", description="Small deployment name, for stats")
+    large_name: str = Field(default="large", description="Large deployment name, for stats")
+    prices: Dict[str, Tuple[float, float]] = Field(default_factory=dict,
+                                                   description="Price per 1K prompt and completion tokens by tier")
+    observer: Optional[Callable[..., None]] = Field(default=None, exclude=True)
+    validate_replies: Optional[Callable[[Sequence[ChatMessage], str], bool]] = Field(default=react_reply_ok, exclude=True)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _tiers: Dict[str, _DeploymentStats] = PrivateAttr(default_factory=dict)
+    _reasons: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _fallbacks: int = PrivateAttr(default=0)
+    _breaker: CircuitBreaker = PrivateAttr()
+
+    def __init__(self, breaker_threshold: int = 3, breaker_reset: float = 30.0, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._tiers = {
+            "small": _DeploymentStats(self.small_name, self.prices.get("small", (0.0, 0.0))),
+            "large": _DeploymentStats(self.large_name, self.prices.get("large", (0.0, 0.0)))
+        }
+        self._breaker = CircuitBreaker("llm_small", breaker_threshold, breaker_reset)
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        small, large = self.small.metadata, self.large.metadata
+        return LLMMetadata(
+            context_window=min(small.context_window, large.context_window),
+            num_output=large.num_output,
+            is_chat_model=large.is_chat_model,
+            is_function_calling_model=small.is_function_calling_model and large.is_function_calling_model,
+            model_name=f"{small.model_name}|{large.model_name}"
+        )
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "routed_llm"
+
+    # Routing and accounting
+
+    def _choose(self, messages: Sequence[ChatMessage]) -> Tuple[str, str]:
+        tier, reason = self.policy.route(messages)
+        if tier == "small" and not self._breaker.allow():
+            return "large", "small_unavailable"
+        return tier, reason
+
+    def _backend(self, tier: str) -> Any:
+        return self.small if tier == "small" else self.large
+
+    def _record(self, tier: str, reason: str, start: float, messages: Sequence[ChatMessage],
+                response: Any = None, text: str = "", failed: bool = False):
+        seconds = time.perf_counter() - start
+        usage = response_usage(response) if response is not None else {}
+        estimated = not usage
+        if estimated and not failed:
+            usage = {"prompt_tokens": sum(estimate_tokens(m.content or "") for m in messages),
+                     "completion_tokens": estimate_tokens(text)}
+        with self._lock:
+            self._tiers[tier].record(seconds, usage, estimated, failed)
+            key = f"{tier}:{reason}"
+            self._reasons[key] = self._reasons.get(key, 0) + 1
+        trace = current_trace()
+        if trace is not None:
+            trace.count(f"llm_calls_{tier}")
+            attrs = {"error": True} if failed else {}
+            trace.add(f"llm_route:{tier}", trace.clock() - seconds, seconds, reason=reason, **attrs)
+        if self.observer is not None:
+            self.observer(self._tiers[tier].name, reason, seconds, failed, usage)
+
+    def _small_failed(self, error: Optional[BaseException]):
+        """Count a failed small call; only outages (not e.g. a prompt it rejects) count against its breaker"""
+        if error is None or not is_transient(error):
+            self._breaker.record_success()
+        else:
+            self._breaker.record_failure()
+        with self._lock:
+            self._fallbacks += 1
+
+    def _accept(self, messages: Sequence[ChatMessage], text: str) -> bool:
+        if self.validate_replies is None or self.validate_replies(messages, text):
+            self._breaker.record_success()
+            return True
+        with self._lock:
+            self._tiers["small"].counters["rejected_replies"] += 1
+        self._small_failed(None)
+        return False
+
+    def _chat(self, messages: Sequence[ChatMessage], call: Callable[[Any], ChatResponse]) -> ChatResponse:
+        tier, reason = self._choose(messages)
+        if tier == "small":
+            start = time.perf_counter()
+            try:
+                response = call(self.small)
+            except Exception as e:
+                self._record("small", reason, start, messages, failed=True)
+                self._small_failed(e)
+            else:
+                text = response.message.content or ""
+                self._record("small", reason, start, messages, response, text)
+                if self._accept(messages, text):
+                    return response
+            reason = "fallback"
+        start = time.perf_counter()
+        try:
+            response = call(self.large)
+        except Exception:
+            self._record("large", reason, start, messages, failed=True)
+            raise
+        self._record("large", reason, start, messages, response, response.message.content or "")
+        return response
+
+    async def _achat(self, messages: Sequence[ChatMessage], call: Callable[[Any], Any]) -> ChatResponse:
+        tier, reason = self._choose(messages)
+        if tier == "small":
+            start = time.perf_counter()
+            try:
+                response = await call(self.small)
+            except Exception as e:
+                self._record("small", reason, start, messages, failed=True)
+                self._small_failed(e)
+            else:
+                text = response.message.content or ""
+                self._record("small", reason, start, messages, response, text)
+                if self._accept(messages, text):
+                    return response
+            reason = "fallback"
+        start = time.perf_counter()
+        try:
+            response = await call(self.large)
+        except Exception:
+            self._record("large", reason, start, messages, failed=True)
+            raise
+        self._record("large", reason, start, messages, response, response.message.content or "")
+        return response
+
+    def _relay(self, tier: str, reason: str, start: float, messages: Sequence[ChatMessage],
+               first: ChatResponse, rest: ChatResponseGen) -> ChatResponseGen:
+        """Yield an opened stream, recording the call when it ends"""
+        last, failed = first, True
+        try:
+            yield first
+            for last in rest:
+                yield last
+            failed = False
+        finally:
+            self._record(tier, reason, start, messages, last, last.message.content or "", failed)
+
+    async def _arelay(self, tier: str, reason: str, start: float, messages: Sequence[ChatMessage],
+                      first: ChatResponse, rest: ChatResponseAsyncGen) -> ChatResponseAsyncGen:
+        last, failed = first, True
+        try:
+            yield first
+            async for last in rest:
+                yield last
+            failed = False
+        finally:
+            self._record(tier, reason, start, messages, last, last.message.content or "", failed)
+
+    # LLM interface
+
+    @llm_chat_callback()
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        return self._chat(messages, lambda backend: backend.chat(messages, **kwargs))
+
+    @llm_chat_callback()
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        return await self._achat(messages, lambda backend: backend.achat(messages, **kwargs))
+
+    @llm_chat_callback()
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        # The first chunk is read here, so a small deployment that fails to answer still falls back;
+        # a streamed reply cannot be checked before it reaches the agent
+        tier, reason = self._choose(messages)
+        while True:
+            start = time.perf_counter()
+            try:
+                stream = self._backend(tier).stream_chat(messages, **kwargs)
+                first = next(stream)
+            except Exception as e:
+                self._record(tier, reason, start, messages, failed=True)
+                if tier == "large":
+                    raise
+                self._small_failed(e)
+                tier, reason = "large", "fallback"
+                continue
+            if tier == "small":
+                self._breaker.record_success()
+            return self._relay(tier, reason, start, messages, first, stream)
+
+    @llm_chat_callback()
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        tier, reason = self._choose(messages)
+        while True:
+            start = time.perf_counter()
+            try:
+                stream = await self._backend(tier).astream_chat(messages, **kwargs)
+                first = await stream.__anext__()
+            except Exception as e:
+                self._record(tier, reason, start, messages, failed=True)
+                if tier == "large":
+                    raise
+                self._small_failed(e)
+                tier, reason = "large", "fallback"
+                continue
+            if tier == "small":
+                self._breaker.record_success()
+            return self._arelay(tier, reason, start, messages, first, stream)
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        response = self._chat([ChatMessage(role=MessageRole.USER, content=prompt)],
+                              lambda backend: backend.chat([ChatMessage(role=MessageRole.USER, content=prompt)], **kwargs))
+        return CompletionResponse(text=response.message.content or "", raw=response.raw)
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        response = self.complete(prompt, formatted=formatted, **kwargs)
+        yield CompletionResponse(text=response.text, delta=response.text, raw=response.raw)
+
+    def _prepare_chat_with_tools(self, tools: List[Any], **kwargs: Any) -> Dict[str, Any]:
+        return self.large._prepare_chat_with_tools(tools, **kwargs)
+
+    def get_tool_calls_from_response(self, response: ChatResponse, error_on_no_tool_call: bool = True,
+                                     **kwargs: Any) -> List[Any]:
+        return self.large.get_tool_calls_from_response(response, error_on_no_tool_call=error_on_no_tool_call, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tiers = {tier: stats.stats() for tier, stats in self._tiers.items()}
+            reasons = dict(sorted(self._reasons.items()))
+            fallbacks = self._fallbacks
+        calls = sum(t["calls"] for t in tiers.values())
+        return {
+            "mode": self.policy.mode,
+            "calls": calls,
+            "small_share": round(tiers["small"]["calls"] / calls, 3) if calls else 0.0,
+            "fallbacks": fallbacks,
+            "cost": round(sum(t["cost"] for t in tiers.values()), 6),
+            "small_breaker": self._breaker.state,
+            "deployments": tiers,
+            "reasons": reasons
+        }
@@ -0,0 +1,77 @@
+import time
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+from llama_index.core.callbacks import CBEventType, EventPayload
+from llama_index.core.callbacks.base_handler import BaseCallbackHandler
+
+from metrics import Counter, Histogram, Trace, _current_trace
+
+
+def response_usage(response: Any) -> Dict[str, int]:
+    """Prompt/completion token counts when the LLM reports them (OpenAI-style ``usage``)"""
+    raw = getattr(response, "raw", None)
+    usage = raw.get("usage") if isinstance(raw, dict) else getattr(raw, "usage", None)
+    if usage is None:
+        return {}
+    get = usage.get if isinstance(usage, dict) else lambda key: getattr(usage, key, None)
+    counts = {"prompt_tokens": get("prompt_tokens"), "completion_tokens": get("completion_tokens")}
+    return {kind: int(count) for kind, count in counts.items() if isinstance(count, int)}
+
+
+class LLMTelemetryHandler(BaseCallbackHandler):
+    """LlamaIndex callback handler timing LLM calls
+
+    Attached to the LLM's callback manager, which ReAct agents share, so every
+    completion is seen without wrapping the agent. Each ReAct reasoning step
+    is one LLM call, so the trace's ``llm_calls`` count is the number of agent
+    iterations.
+    """
+
+    def __init__(self, latency: Histogram, errors: Counter, tokens: Optional[Counter] = None):
+        super().__init__(event_starts_to_ignore=[], event_ends_to_ignore=[])
+        self.latency = latency
+        self.errors = errors
+        self.tokens = tokens
+        self._started: Dict[str, Tuple[float, Optional[Trace]]] = {}
+        self._lock = threading.Lock()
+
+    def on_event_start(self, event_type: CBEventType, payload: Optional[Dict[str, Any]] = None,
+                       event_id: str = "", parent_id: str = "", **kwargs: Any) -> str:
+        if event_type == CBEventType.LLM:
+            with self._lock:
+                self._started[event_id] = (time.perf_counter(), _current_trace.get())
+        return event_id
+
+    def on_event_end(self, event_type: CBEventType, payload: Optional[Dict[str, Any]] = None,
+                     event_id: str = "", **kwargs: Any) -> None:
+        if event_type != CBEventType.LLM:
+            return
+        with self._lock:
+            started = self._started.pop(event_id, None)
+        if started is None:
+            return
+        start, trace = started
+        duration = time.perf_counter() - start
+        failed = bool(payload and EventPayload.EXCEPTION in payload)
+        self.latency.observe(duration)
+        if failed:
+            self.errors.inc()
+        usage = self._usage(payload)
+        if self.tokens is not None:
+            for kind, count in usage.items():
+                self.tokens.inc(count, kind=kind)
+        if trace is not None:
+            trace.count("llm_calls")
+            attrs = {"error": True} if failed else {}
+            trace.add("llm", start, duration, **attrs, **usage)
+
+    @staticmethod
+    def _usage(payload: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        return response_usage((payload or {}).get(EventPayload.RESPONSE))
+
+    def start_trace(self, trace_id: Optional[str] = None) -> None:
+        pass
+
+    def end_trace(self, trace_id: Optional[str] = None, trace_map: Optional[Dict[str, List[str]]] = None) -> None:
+        pass
@@ -0,0 +1,409 @@
+"""Prometheus metrics and per-request traces for the chatbot.
+
+A small in-process registry of counters, gauges and histograms rendered
+in the Prometheus text exposition format (version 0.0.4), so ``/metrics``
+can be scraped without extra dependencies. Gauges can be backed by a
+callback, which lets the existing ``stats()`` snapshots (pool, caches,
+sessions) be exported without duplicating their counters.
+
+Traces break one chat request down into timed spans (fast path, LLM
+calls, tools, graph requests, ...). The active trace lives in a context
+variable: code anywhere below the request records spans with ``span()``
+and they land in the right trace, including code run on executor
+threads through ``contextvars.copy_context().run``.
+"""
+
+import time
+import uuid
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple, Union
+
+
+# Seconds; spans fast graph lookups through slow multi-step agent turns
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+COUNT_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Point-in-time value; ``fn`` computes it at scrape time instead of ``set``
+
+    A callback gauge with labels returns ``(label_values, value)`` pairs.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 fn: Optional[Callable[[], Union[float, Iterable[Tuple[Tuple[str, ...], float]]]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.fn = fn
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> List[str]:
+        if self.fn is None:
+            with self._lock:
+                items = sorted(self._values.items())
+        else:
+            try:
+                result = self.fn()
+            except Exception:
+                # A component that is not ready yet (e.g. no pool before initialize) reports nothing
+                return []
+            if result is None:
+                return []
+            items = [((), result)] if not self.labelnames else sorted((tuple(map(str, k)), v) for k, v in result)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self, **labels) -> Dict[str, float]:
+        """Count and sum for one label set, e.g. for reports outside Prometheus"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return {"count": state[2], "sum": state[1]} if state else {"count": 0, "sum": 0.0}
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together for a ``/metrics`` scrape"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(self._name(name), documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), fn=None) -> Gauge:
+        return self._register(Gauge(self._name(name), documentation, labelnames, fn=fn))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self._name(name), documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+class Trace:
+    """Timed spans of one request, in the order they finished"""
+
+    def __init__(self, trace_id: Optional[str] = None, clock: Callable[[], float] = time.perf_counter):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.clock = clock
+        self.start = clock()
+        self.spans: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, duration: float, **attrs):
+        span = {"name": name, "start_ms": round((start - self.start) * 1000, 2),
+                "duration_ms": round(duration * 1000, 2), **attrs}
+        with self._lock:
+            self.spans.append(span)
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def elapsed(self) -> float:
+        return self.clock() - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["start_ms"])
+            counts = dict(self.counts)
+        return {"trace_id": self.trace_id, "duration_ms": round(self.elapsed() * 1000, 2),
+                "counts": counts, "spans": spans}
+
+    def summary(self) -> str:
+        """One-line breakdown of where the time went, for slow-request logs"""
+        totals: Dict[str, float] = {}
+        for span in self.to_dict()["spans"]:
+            kind = span["name"].split(":", 1)[0]
+            totals[kind] = totals.get(kind, 0.0) + span["duration_ms"]
+        return ", ".join(f"{kind} {ms:.0f}ms" for kind, ms in sorted(totals.items(), key=lambda item: -item[1]))
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(trace_id: Optional[str] = None):
+    """Make a new trace current for the block"""
+    trace = Trace(trace_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def set_trace(trace: Optional[Trace]) -> contextvars.Token:
+    """Make ``trace`` current, e.g. inside a copied context with ``context.run(set_trace, trace)``"""
+    return _current_trace.set(trace)
+
+
+@contextmanager
+def span(name: str, trace: Optional[Trace] = None, **attrs):
+    """Record the block as a span of ``trace``, or of the current trace (a no-op outside one)
+
+    Yields a dict; attributes added to it while the block runs are recorded too.
+    """
+    trace = trace or _current_trace.get()
+    extra: Dict[str, Any] = {}
+    if trace is None:
+        yield extra
+        return
+    start = trace.clock()
+    try:
+        yield extra
+    except BaseException as e:
+        extra["error"] = type(e).__name__
+        raise
+    finally:
+        trace.add(name, start, trace.clock() - start, **attrs, **extra)
+
+
+class ChatMetrics:
+    """The chatbot's metrics: chat requests, LLM calls, tools and graph requests
+
+    Component ``stats()`` snapshots registered with ``add_stats`` are exported
+    as ``chatbot_component_stat{component, stat}`` gauges at scrape time.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry("chatbot")
+        r = self.registry
+        self.chat_requests = r.counter("chat_requests_total", "Chat requests by the path that answered them and outcome",
+                                       ("path", "status"))
+        self.chat_latency = r.histogram("chat_duration_seconds", "End-to-end chat latency by answering path", ("path",))
+        self.agent_iterations = r.histogram("agent_iterations", "ReAct reasoning steps per agent-answered chat",
+                                            buckets=COUNT_BUCKETS)
+        self.llm_latency = r.histogram("llm_request_duration_seconds", "Latency of individual LLM calls")
+        self.llm_errors = r.counter("llm_errors_total", "LLM calls that raised")
+        self.llm_tokens = r.counter("llm_tokens_total", "Tokens reported by the LLM", ("kind",))
+        self.llm_route_latency = r.histogram("llm_deployment_request_duration_seconds",
+                                             "Latency of LLM calls by deployment, when calls are routed between deployments",
+                                             ("deployment",))
+        self.llm_route_calls = r.counter("llm_deployment_calls_total",
+                                         "Routed LLM calls by deployment, routing reason and outcome",
+                                         ("deployment", "reason", "status"))
+        self.llm_route_tokens = r.counter("llm_deployment_tokens_total",
+                                          "Tokens by deployment (estimated when the deployment reports none)",
+                                          ("deployment", "kind"))
+        self.tool_latency = r.histogram("tool_duration_seconds", "Tool call latency", ("tool",))
+        self.tool_calls = r.counter("tool_calls_total", "Tool calls by result status", ("tool", "status"))
+        self.tool_result_bytes = r.histogram("tool_result_bytes", "Size of tool results as sent to the LLM", ("tool",),
+                                             buckets=SIZE_BUCKETS)
+        self.tool_result_tokens = r.histogram("tool_result_tokens", "Estimated tokens of tool results as sent to the LLM",
+                                              ("tool",), buckets=(16, 64, 256, 1024, 4096, 16384))
+        self.graph_latency = r.histogram("graph_request_duration_seconds",
+                                         "REST++ request latency (including pool checkout) by operation and query",
+                                         ("operation", "name"))
+        self.graph_errors = r.counter("graph_errors_total", "Failed REST++ requests by operation and query",
+                                      ("operation", "name"))
+        self.graph_host_latency = r.histogram("graph_host_request_duration_seconds",
+                                              "REST++ request latency per TigerGraph host, when reads are balanced over several",
+                                              ("host",))
+        self.graph_host_errors = r.counter("graph_host_errors_total", "Failed REST++ requests per TigerGraph host", ("host",))
+        self.coalesced = r.counter("coalesced_requests_total",
+                                   "Calls that joined an identical in-flight call instead of running their own",
+                                   ("layer", "name"))
+        self.admission_requests = r.counter("admission_requests_total",
+                                            "Chat requests by priority class and admission outcome", ("priority", "outcome"))
+        self.admission_wait = r.histogram("admission_wait_seconds", "Time admitted chats waited in the queue",
+                                          ("priority",))
+        self._queue_depths: Callable[[], Optional[Iterable[Tuple[Tuple[str, ...], float]]]] = lambda: None
+        r.gauge("admission_queue_depth", "Chats waiting for a slot by priority class", ("priority",),
+                fn=lambda: self._queue_depths())
+        self._stats: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+        r.gauge("component_stat", "Numeric fields of the component statistics shown on /api/stats",
+                ("component", "stat"), fn=self._component_stats)
+
+    def add_stats(self, component: str, fn: Callable[[], Optional[Dict[str, Any]]]):
+        self._stats[component] = fn
+
+    def add_queue_depths(self, fn: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]):
+        self._queue_depths = fn
+
+    def _component_stats(self) -> List[Tuple[Tuple[str, str], float]]:
+        samples = []
+        for component, fn in self._stats.items():
+            try:
+                stats = fn() or {}
+            except Exception:
+                continue
+            samples.extend(((component, key), value) for key, value in stats.items()
+                           if isinstance(value, (int, float)) and not isinstance(value, bool))
+        return samples
+
+    def llm_handler(self) -> Any:
+        """A LlamaIndex callback handler feeding the LLM metrics (imports LlamaIndex on first use)"""
+        from llm_telemetry import LLMTelemetryHandler
+        return LLMTelemetryHandler(self.llm_latency, self.llm_errors, self.llm_tokens)
+
+    def observe_graph(self, operation: str, name: str, seconds: float, failed: bool):
+        """GraphConnectionPool observer: latency metrics plus a span on the current trace"""
+        self.graph_latency.observe(seconds, operation=operation, name=name)
+        if failed:
+            self.graph_errors.inc(operation=operation, name=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            attrs = {"error": True} if failed else {}
+            trace.add(f"graph:{name or operation}", trace.clock() - seconds, seconds, **attrs)
+
+    def observe_graph_host(self, host: str, seconds: float, failed: bool):
+        """GraphCluster host observer: per-host latency and errors"""
+        self.graph_host_latency.observe(seconds, host=host)
+        if failed:
+            self.graph_host_errors.inc(host=host)
+
+    def observe_llm_route(self, deployment: str, reason: str, seconds: float, failed: bool, usage: Dict[str, int]):
+        """RoutedLLM observer: per-deployment latency, calls and tokens"""
+        self.llm_route_latency.observe(seconds, deployment=deployment)
+        self.llm_route_calls.inc(deployment=deployment, reason=reason, status="error" if failed else "success")
+        for kind, count in usage.items():
+            self.llm_route_tokens.inc(count, deployment=deployment, kind=kind)
+
+    def observe_admission(self, priority: str, outcome: str, seconds: float):
+        """AdmissionController observer: how each chat request was admitted or turned away"""
+        self.admission_requests.inc(priority=priority, outcome=outcome)
+        if outcome == "admitted":
+            self.admission_wait.observe(seconds, priority=priority)
+
+    def observe_tool(self, tool: str, seconds: float, status: str):
+        self.tool_latency.observe(seconds, tool=tool)
+        self.tool_calls.inc(tool=tool, status=status)
+
+    def observe_tool_result(self, tool: str, size: int, tokens: int):
+        self.tool_result_bytes.observe(size, tool=tool)
+        self.tool_result_tokens.observe(tokens, tool=tool)
+
+    def observe_chat(self, path: str, status: str, trace: Trace):
+        self.chat_requests.inc(path=path, status=status)
+        self.chat_latency.observe(trace.elapsed(), path=path)
+        if path == "agent":
+            self.agent_iterations.observe(trace.counts.get("llm_calls", 0))
+
+    def render(self) -> str:
+        return self.registry.render()
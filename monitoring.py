@@ -29,6 +29,22 @@ def health_check():
         logging.error(f"❌ Health check failed: {e}")
         return False
 
+def readiness_check():
+    """Check that startup has finished, naming any component that is not ready"""
+    try:
+        response = requests.get('http://localhost:5000/ready', timeout=5)
+        data = response.json()
+        if response.status_code == 200:
+            logging.info(f"✅ Application is ready (startup took {data.get('elapsed_ms') or 0:.0f}ms)")
+            return True
+        waiting = [f"{name} ({component['state']})" for name, component in data.get('components', {}).items()
+                   if component['state'] != 'ready']
+        logging.error(f"❌ Application is not ready: {', '.join(waiting) or 'startup has not begun'}")
+        return False
+    except Exception as e:
+        logging.error(f"❌ Readiness check failed: {e}")
+        return False
+
 def tigergraph_check():
     """Check TigerGraph connection"""
     try:
@@ -44,12 +60,101 @@ def tigergraph_check():
         logging.error(f"❌ TigerGraph check failed: {e}")
         return False
 
+def resilience_check():
+    """Report circuit breakers that are open, i.e. dependencies the app is currently failing fast on"""
+    try:
+        response = requests.get('http://localhost:5000/api/stats', timeout=10)
+        breakers = response.json().get('resilience') or {}
+        tripped = {name: breaker for name, breaker in breakers.items() if breaker and breaker['state'] != 'closed'}
+        for name, breaker in tripped.items():
+            logging.error(f"❌ {name} circuit breaker is {breaker['state']} "
+                          f"({breaker['trips']} trips, {breaker['rejected']} calls rejected, retry in {breaker['retry_in']}s)")
+        if not tripped:
+            logging.info("✅ Circuit breakers are closed")
+        return not tripped
+    except Exception as e:
+        logging.error(f"❌ Resilience check failed: {e}")
+        return False
+
+def graph_hosts_check():
+    """Log latency, errors and health of each TigerGraph host when reads are balanced over several"""
+    try:
+        response = requests.get('http://localhost:5000/api/stats', timeout=10)
+        hosts = (response.json().get('pool') or {}).get('hosts')
+        if not hosts:
+            return True
+        for name, host in hosts.items():
+            line = (f"{name} ({host['role']}): {host['latency_ms'] if host['latency_ms'] is not None else '-'}ms avg, "
+                    f"p95 {host['p95_ms'] if host['p95_ms'] is not None else '-'}ms, {host['requests']} requests, "
+                    f"{host['errors']} errors, {host['pinned_sessions']} sessions, breaker {host['breaker']}")
+            if host['healthy']:
+                logging.info(f"✅ TigerGraph host {line}")
+            else:
+                logging.warning(f"⚠️ TigerGraph host down for {host['down_for']}s: {line} - {host['last_error']}")
+        healthy = sum(host['healthy'] for host in hosts.values())
+        if not healthy:
+            logging.error("❌ No TigerGraph host is healthy")
+        return healthy > 0
+    except Exception as e:
+        logging.error(f"❌ TigerGraph host check failed: {e}")
+        return False
+
+def admission_check():
+    """Log the chat queue: chats running and waiting, and how many were turned away"""
+    try:
+        response = requests.get('http://localhost:5000/api/stats', timeout=10)
+        admission = response.json().get('admission')
+        if not admission:
+            return True
+        turned_away = admission['rate_limited'] + admission['queue_full'] + admission['queue_timeout'] + admission['shed']
+        waits = ", ".join(f"{name} p95 {stats['wait_p95_ms'] if stats['wait_p95_ms'] is not None else '-'}ms"
+                          for name, stats in admission['priorities'].items())
+        line = (f"{admission['in_flight']}/{admission['max_concurrent']} chats running, {admission['queued']} queued, "
+                f"{turned_away} turned away ({admission['rate_limited']} rate limited); wait {waits}")
+        if admission['queued'] >= admission['max_queue']:
+            logging.warning(f"⚠️ Chat queue full: {line}")
+        else:
+            logging.info(f"🚦 {line}")
+        return True
+    except Exception as e:
+        logging.error(f"❌ Admission check failed: {e}")
+        return False
+
+def metrics_check():
+    """Summarize the /metrics scrape: chats served, mean latency, failures"""
+    try:
+        response = requests.get('http://localhost:5000/metrics', timeout=10)
+        totals = {}
+        for line in response.text.splitlines():
+            if line.startswith('#') or ' ' not in line:
+                continue
+            sample, value = line.rsplit(' ', 1)
+            name = sample.split('{', 1)[0]
+            if name in ('chatbot_chat_duration_seconds_sum', 'chatbot_chat_duration_seconds_count',
+                        'chatbot_llm_errors_total', 'chatbot_graph_errors_total') or \
+                    (name == 'chatbot_chat_requests_total' and 'status="error"' in sample):
+                totals[name] = totals.get(name, 0.0) + float(value)
+        chats = totals.get('chatbot_chat_duration_seconds_count', 0)
+        mean_ms = 1000 * totals.get('chatbot_chat_duration_seconds_sum', 0) / chats if chats else 0.0
+        logging.info(
+            f"📈 {chats:.0f} chats, mean {mean_ms:.0f}ms, "
+            f"{totals.get('chatbot_chat_requests_total', 0):.0f} failed chats, "
+            f"{totals.get('chatbot_llm_errors_total', 0):.0f} LLM errors, "
+            f"{totals.get('chatbot_graph_errors_total', 0):.0f} graph errors"
+        )
+        return True
+    except Exception as e:
+        logging.error(f"❌ Metrics check failed: {e}")
+        return False
+
 if __name__ == "__main__":
     while True:
         print(f"\n🔍 Running health checks at {datetime.now()}")
         
-        app_healthy = health_check()
-        tg_healthy = tigergraph_check()
+        app_healthy = health_check() and readiness_check()
+        tg_healthy = tigergraph_check() and resilience_check() and graph_hosts_check()
+        admission_check()
+        metrics_check()
         
         if not app_healthy or not tg_healthy:
             logging.error("❌ System is unhealthy!")
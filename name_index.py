@@ -0,0 +1,275 @@
+import re
+import time
+import heapq
+import bisect
+import difflib
+import logging
+import threading
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+from graph_pool import iter_keyset
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Match weights: an exact token beats a prefix, which beats a fuzzy match
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+COMPANY_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class NameIndex:
+    """In-memory name -> person ID resolver.
+
+    Keeps one compact row per person (id, first name, last name, company)
+    plus an inverted index from lowercase name tokens to row numbers and a
+    sorted token list for prefix lookups. Fuzzy matching falls back to
+    difflib over the distinct tokens, which are far fewer than people.
+
+    ``loader(after_id, page_size)`` returns the next page of people ordered
+    by ID as dicts with ``id``, ``first_name``, ``last_name`` and
+    ``company_name``. Incremental refreshes only fetch IDs after the highest
+    one already indexed; a periodic full rebuild picks up edits and deletes.
+    After a failed build or refresh, the next attempt waits ``retry_backoff``
+    seconds, doubling with each further failure up to ``refresh_interval``;
+    until the first build succeeds, lookups in between fail fast.
+    """
+
+    def __init__(self, loader: Callable[[str, int], List[Dict[str, Any]]], page_size: int = 5000,
+                 refresh_interval: float = 60.0, rebuild_interval: float = 3600.0, retry_backoff: float = 30.0):
+        self.loader = loader
+        self.page_size = page_size
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.retry_backoff = retry_backoff
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._reset_state()
+        # Guarded by _lock; set before the background thread starts so only one is ever running
+        self._refreshing = False
+        self.failures = 0
+        self.last_attempt = 0.0
+        self.last_error = ""
+        self.last_refresh = 0.0
+        self.last_rebuild = 0.0
+        self.stats_counters = {"lookups": 0, "refreshes": 0, "rebuilds": 0, "refresh_errors": 0}
+
+    def _reset_state(self):
+        self._ids: List[str] = []
+        self._first: List[str] = []
+        self._last: List[str] = []
+        self._company: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._tokens: Dict[str, List[int]] = {}
+        self._company_tokens: Dict[str, List[int]] = {}
+        self._sorted_tokens: List[str] = []
+        self._max_id = ""
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def ready(self) -> bool:
+        return self.last_rebuild > 0
+
+    def _add(self, person: Dict[str, Any], keep_sorted: bool = True):
+        person_id = str(person["id"])
+        if person_id in self._rows:
+            return
+        row = len(self._ids)
+        self._rows[person_id] = row
+        self._ids.append(person_id)
+        self._first.append(person.get("first_name", ""))
+        self._last.append(person.get("last_name", ""))
+        self._company.append(person.get("company_name", ""))
+        for token in set(tokenize(person.get("first_name", "")) + tokenize(person.get("last_name", ""))):
+            rows = self._tokens.get(token)
+            if rows is None:
+                self._tokens[token] = [row]
+                if keep_sorted:
+                    bisect.insort(self._sorted_tokens, token)
+                else:
+                    self._sorted_tokens.append(token)
+            else:
+                rows.append(row)
+        for token in set(tokenize(person.get("company_name", ""))):
+            self._company_tokens.setdefault(token, []).append(row)
+        self._max_id = max(self._max_id, person_id)
+
+    def _fetch(self, after_id: str) -> Iterable[Dict[str, Any]]:
+        return iter_keyset(self.loader, self.page_size, after_id)
+
+    def _rebuild(self):
+        fresh = NameIndex(self.loader, self.page_size)
+        for person in self._fetch(""):
+            fresh._add(person, keep_sorted=False)
+        fresh._sorted_tokens.sort()
+        with self._lock:
+            for attr in ("_ids", "_first", "_last", "_company", "_rows", "_tokens",
+                         "_company_tokens", "_sorted_tokens", "_max_id"):
+                setattr(self, attr, getattr(fresh, attr))
+        self.last_rebuild = self.last_refresh = time.time()
+        self.stats_counters["rebuilds"] += 1
+        logger.info(f"Name index rebuilt with {len(self)} people")
+
+    def rebuild(self):
+        """Reload every person and atomically swap in the new index"""
+        with self._refresh_lock:
+            self._rebuild()
+
+    def refresh(self) -> int:
+        """Index people added after the highest known ID; returns how many were added"""
+        with self._refresh_lock:
+            added = 0
+            for person in self._fetch(self._max_id):
+                with self._lock:
+                    before = len(self._ids)
+                    self._add(person)
+                    added += len(self._ids) - before
+            self.last_refresh = time.time()
+            self.stats_counters["refreshes"] += 1
+            return added
+
+    def mark_stale(self):
+        """Force an incremental refresh on the next lookup, e.g. after a data load"""
+        self.last_refresh = 0.0
+
+    def _retry_delay(self) -> float:
+        if not self.failures:
+            return 0.0
+        return min(self.retry_backoff * 2 ** (self.failures - 1), max(self.retry_backoff, self.refresh_interval))
+
+    def _record_failure(self, e: Exception):
+        self.failures += 1
+        self.stats_counters["refresh_errors"] += 1
+        self.last_error = str(e)
+        logger.warning(f"Name index refresh failed, retrying in {self._retry_delay():.0f}s: {e}")
+
+    def _refresh_in_background(self, full: bool):
+        def run():
+            try:
+                self.rebuild() if full else self.refresh()
+                self.failures = 0
+                self.last_error = ""
+            except Exception as e:
+                self._record_failure(e)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self.last_attempt = time.time()
+        threading.Thread(target=run, name="name-index-refresh", daemon=True).start()
+
+    def _build_first(self):
+        """Build the index now, unless the last attempt failed too recently"""
+        with self._refresh_lock:
+            if self.ready:
+                return
+            wait = self.last_attempt + self._retry_delay() - time.time()
+            if wait > 0:
+                raise RuntimeError(f"The name index is not built yet (last error: {self.last_error}); "
+                                   f"retrying in {wait:.0f}s")
+            self.last_attempt = time.time()
+            try:
+                self._rebuild()
+            except Exception as e:
+                self._record_failure(e)
+                raise
+            self.failures = 0
+            self.last_error = ""
+
+    def ensure_fresh(self):
+        """Build on first use, then refresh stale data without blocking lookups"""
+        if not self.ready:
+            self._build_first()
+            return
+        now = time.time()
+        if self._refreshing or now - self.last_attempt < self._retry_delay():
+            return
+        if now - self.last_rebuild > self.rebuild_interval:
+            self._refresh_in_background(full=True)
+        elif now - self.last_refresh > self.refresh_interval:
+            self._refresh_in_background(full=False)
+
+    def _match_token(self, token: str) -> Dict[int, float]:
+        """Rows matching one query token with their best match weight"""
+        scores: Dict[int, float] = {}
+
+        def add(rows: List[int], weight: float):
+            for row in rows:
+                if weight > scores.get(row, 0.0):
+                    scores[row] = weight
+
+        add(self._tokens.get(token, []), EXACT_WEIGHT)
+        start = bisect.bisect_left(self._sorted_tokens, token)
+        for candidate in self._sorted_tokens[start:start + 50]:
+            if not candidate.startswith(token):
+                break
+            if candidate != token:
+                add(self._tokens[candidate], PREFIX_WEIGHT)
+        if not scores and len(token) >= 3:
+            for candidate in difflib.get_close_matches(token, self._tokens.keys(), n=5, cutoff=0.75):
+                ratio = difflib.SequenceMatcher(None, token, candidate).ratio()
+                add(self._tokens[candidate], FUZZY_WEIGHT * ratio)
+        return scores
+
+    def name_tokens(self, text: str) -> List[str]:
+        """Words in ``text`` that are someone's first or last name"""
+        with self._lock:
+            return sorted({token for token in tokenize(text) if token in self._tokens})
+
+    def search(self, name: str, company: str = "", top_k: int = 5) -> List[Dict[str, Any]]:
+        """Return the top-k people whose names best match ``name``"""
+        self.stats_counters["lookups"] += 1
+        tokens = tokenize(name)
+        if not tokens:
+            return []
+        with self._lock:
+            # Score the most selective token's matches first; everyone else is only
+            # scored when they could still make the top-k
+            matches = sorted((self._match_token(token) for token in tokens), key=len)
+            company_rows = None
+            for token in tokenize(company):
+                rows = set(self._company_tokens.get(token, []))
+                company_rows = rows if company_rows is None else company_rows & rows
+            boost = COMPANY_WEIGHT if company_rows else 0.0
+
+            def score(row: int) -> float:
+                total = sum(match.get(row, 0.0) for match in matches) / len(tokens)
+                return total + boost if company_rows and row in company_rows else total
+
+            # Rows are stored in ID order, so -row breaks score ties towards lower IDs
+            best = heapq.nlargest(top_k, ((score(row), -row) for row in matches[0]))
+            outsider_bound = (len(tokens) - 1) / len(tokens) * EXACT_WEIGHT + boost
+            if len(matches) > 1 and (len(best) < top_k or best[-1][0] <= outsider_bound):
+                outsiders = set().union(*(match.keys() for match in matches[1:])) - matches[0].keys()
+                best = heapq.nlargest(top_k, best + [(score(row), -row) for row in outsiders])
+
+            return [{
+                "id": self._ids[-neg_row],
+                "name": f"{self._first[-neg_row]} {self._last[-neg_row]}".strip(),
+                "company": self._company[-neg_row],
+                "score": round(row_score, 3)
+            } for row_score, neg_row in best]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats_counters,
+            "people": len(self._ids),
+            "distinct_tokens": len(self._tokens),
+            "refreshing": self._refreshing,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_refresh": self.last_refresh,
+            "last_rebuild": self.last_rebuild
+        }
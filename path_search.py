@@ -0,0 +1,170 @@
+"""In-memory reference for the FindConnections path search.
+
+CSRGraph holds an adjacency list as NumPy arrays (compressed sparse rows),
+with every edge stored in both directions, the way TigerGraph stores an
+edge and its reverse edge. ``bidirectional_bfs`` runs the same
+level-synchronous search as the GSQL query: expand the smaller frontier,
+stop after the first round in which the two sides meet. ``bfs`` is the
+one-sided search it replaces. Both are used by benchmark_paths.py and
+can back a fake REST++ FindConnections.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Tuple, Iterable, Callable
+
+import numpy as np
+
+# Edge codes; each edge's counterpart is what you traverse when walking it backwards
+EDGE_TYPES = ("FRIENDS_WITH", "WORKS_AT", "reverse_WORKS_AT", "FOLLOWS", "reverse_FOLLOWS")
+FRIENDS_WITH, WORKS_AT, REVERSE_WORKS_AT, FOLLOWS, REVERSE_FOLLOWS = range(len(EDGE_TYPES))
+COUNTERPART = np.array([FRIENDS_WITH, REVERSE_WORKS_AT, WORKS_AT, REVERSE_FOLLOWS, FOLLOWS], dtype=np.int8)
+FORWARD = np.array([True, True, False, True, False])
+
+
+class CSRGraph:
+    """Adjacency in CSR form: neighbours of ``v`` are ``indices[indptr[v]:indptr[v + 1]]``"""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, edge_types: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_types = edge_types
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(cls, num_vertices: int, edges: Iterable[Tuple[np.ndarray, np.ndarray, int]]) -> "CSRGraph":
+        """Build from ``(sources, targets, edge_code)`` batches, adding each edge's counterpart"""
+        src_parts, dst_parts, type_parts = [], [], []
+        for sources, targets, code in edges:
+            sources = np.asarray(sources, dtype=np.int32)
+            targets = np.asarray(targets, dtype=np.int32)
+            src_parts += [sources, targets]
+            dst_parts += [targets, sources]
+            type_parts += [np.full(len(sources), code, dtype=np.int8),
+                           np.full(len(sources), COUNTERPART[code], dtype=np.int8)]
+        src = np.concatenate(src_parts)
+        order = np.argsort(src, kind="stable")
+        indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_vertices), out=indptr[1:])
+        return cls(indptr, np.concatenate(dst_parts)[order], np.concatenate(type_parts)[order])
+
+    def expand(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Every edge out of ``frontier`` as parallel (from, to, edge_code) arrays"""
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            empty = np.empty(0, dtype=np.int32)
+            return empty, empty, np.empty(0, dtype=np.int8)
+        offsets = np.arange(total) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return np.repeat(frontier, counts), self.indices[offsets], self.edge_types[offsets]
+
+
+@dataclass
+class PathResult:
+    """Vertices from source to target, the edge code taken into each vertex after the first, and search effort"""
+    vertices: List[int] = field(default_factory=list)
+    edges: List[int] = field(default_factory=list)
+    explored: int = 0
+    rounds: int = 0
+
+    @property
+    def found(self) -> bool:
+        return bool(self.vertices)
+
+    @property
+    def hops(self) -> int:
+        return len(self.vertices) - 1
+
+
+class _Side:
+    def __init__(self, num_vertices: int, root: int):
+        self.dist = np.full(num_vertices, -1, dtype=np.int32)
+        self.parent = np.full(num_vertices, -1, dtype=np.int32)
+        self.edge = np.full(num_vertices, -1, dtype=np.int8)
+        self.dist[root] = 0
+        self.frontier = np.array([root], dtype=np.int32)
+        self.hops = 0
+
+    def advance(self, graph: CSRGraph) -> np.ndarray:
+        """Expand one level and return the newly reached vertices"""
+        parents, reached, codes = graph.expand(self.frontier)
+        new = self.dist[reached] < 0
+        reached, first = np.unique(reached[new], return_index=True)
+        self.hops += 1
+        self.dist[reached] = self.hops
+        self.parent[reached] = parents[new][first]
+        self.edge[reached] = codes[new][first]
+        self.frontier = reached
+        return reached
+
+    def chain(self, vertex: int) -> Tuple[List[int], List[int]]:
+        """Vertices and edge codes from ``vertex`` back to this side's root"""
+        vertices, edges = [vertex], []
+        while self.dist[vertex] > 0:
+            edges.append(int(self.edge[vertex]))
+            vertex = int(self.parent[vertex])
+            vertices.append(vertex)
+        return vertices, edges
+
+
+def bidirectional_bfs(graph: CSRGraph, source: int, target: int, max_hops: int = 3) -> PathResult:
+    """Shortest path of at most ``max_hops`` edges, searching from both ends"""
+    if source == target:
+        return PathResult([source])
+    sides = (_Side(graph.num_vertices, source), _Side(graph.num_vertices, target))
+    explored = rounds = 0
+    while sides[0].hops + sides[1].hops < max_hops and sides[0].frontier.size and sides[1].frontier.size:
+        index = 0 if sides[0].frontier.size <= sides[1].frontier.size else 1
+        side, other = sides[index], sides[1 - index]
+        reached = side.advance(graph)
+        explored += reached.size
+        rounds += 1
+        meeting = reached[other.dist[reached] >= 0]
+        if meeting.size:
+            totals = sides[0].dist[meeting] + sides[1].dist[meeting]
+            middle = int(meeting[np.argmin(totals)])
+            back, back_edges = sides[0].chain(middle)
+            forth, forth_edges = sides[1].chain(middle)
+            # Walking the target side towards the target traverses its edges backwards
+            edges = back_edges[::-1] + [int(COUNTERPART[code]) for code in forth_edges]
+            return PathResult(back[::-1] + forth[1:], edges, explored, rounds)
+    return PathResult(explored=explored, rounds=rounds)
+
+
+def bfs(graph: CSRGraph, source: int, target: int, max_hops: int = 3) -> PathResult:
+    """Shortest path of at most ``max_hops`` edges, searching from the source only"""
+    if source == target:
+        return PathResult([source])
+    side = _Side(graph.num_vertices, source)
+    explored = 0
+    while side.hops < max_hops and side.frontier.size:
+        reached = side.advance(graph)
+        explored += reached.size
+        if side.dist[target] >= 0:
+            vertices, edges = side.chain(target)
+            return PathResult(vertices[::-1], edges[::-1], explored, side.hops)
+    return PathResult(explored=explored, rounds=side.hops)
+
+
+def restpp_path(result: PathResult, vertex_id: Callable[[int], str], vertex_type: Callable[[int], str],
+                label: Callable[[int], str]) -> List[Dict[str, Any]]:
+    """A result as the ``path`` steps FindConnections prints"""
+    steps = []
+    for position, vertex in enumerate(result.vertices):
+        code = result.edges[position - 1] if position else None
+        steps.append({
+            "position": position,
+            "node": vertex_id(vertex),
+            "node_type": vertex_type(vertex),
+            "label": label(vertex),
+            "edge_type": EDGE_TYPES[code] if code is not None else "",
+            "forward": bool(FORWARD[code]) if code is not None else False
+        })
+    return steps
@@ -0,0 +1,175 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse a ``Query=seconds,Query=seconds`` TTL specification"""
+    ttls = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, seconds = item.split("=", 1)
+        ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+class QueryCache:
+    """LRU cache of installed-query results with per-query TTLs.
+
+    Entries are keyed on the query name plus its normalized parameters, so
+    ``{"limit_count": "5"}`` and ``{"limit_count": 5}`` share an entry.
+    A TTL of 0 for a query disables caching for it. Only successful loads
+    are cached; exceptions from the loader propagate untouched.
+
+    Expired entries are kept for another ``stale_ttl`` seconds. ``get``
+    ignores them, but ``get_stale`` returns them, so callers can fall back
+    on an older result while the graph is unavailable.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 60.0,
+                 ttls: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic, stale_ttl: float = 0.0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.clock = clock
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0, "stale_served": 0}
+        self._per_query: Dict[str, Dict[str, int]] = {}
+        # Bumped on every invalidation so loads that started before it are not cached
+        self._generation = 0
+
+    @staticmethod
+    def _normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            value = value.strip()
+            # Numeric strings from the LLM ("5") match their int form, but "05" stays distinct
+            if value.lstrip("-").isdigit() and str(int(value)) == value:
+                return int(value)
+            return value
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, (list, tuple, set)):
+            return tuple(sorted((QueryCache._normalize(v) for v in value), key=repr))
+        return value
+
+    @classmethod
+    def make_key(cls, query_name: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+        items = ((k, cls._normalize(v)) for k, v in (params or {}).items() if v is not None)
+        return (query_name,) + tuple(sorted(items))
+
+    def ttl_for(self, query_name: str) -> float:
+        return self.ttls.get(query_name, self.default_ttl)
+
+    def _record(self, query_name: str, outcome: str):
+        self._stats[outcome] += 1
+        counters = self._per_query.setdefault(query_name, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get(self, query_name: str, params: Optional[Dict[str, Any]] = None) -> Tuple[bool, Any]:
+        """Return ``(True, value)`` on a fresh hit, ``(False, None)`` otherwise"""
+        key = self.make_key(query_name, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                now = self.clock()
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._record(query_name, "hits")
+                    return True, value
+                if expires_at + self.stale_ttl <= now:
+                    del self._entries[key]
+                    self._stats["expirations"] += 1
+            self._record(query_name, "misses")
+            return False, None
+
+    def get_stale(self, query_name: str, params: Optional[Dict[str, Any]] = None) -> Tuple[bool, Any]:
+        """Like ``get``, but also returns results that expired less than ``stale_ttl`` seconds ago"""
+        key = self.make_key(query_name, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] + self.stale_ttl <= self.clock():
+                return False, None
+            self._stats["stale_served"] += 1
+            return True, entry[1]
+
+    def set(self, query_name: str, params: Optional[Dict[str, Any]], value: Any,
+            generation: Optional[int] = None):
+        ttl = self.ttl_for(query_name)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        key = self.make_key(query_name, params)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_load(self, query_name: str, params: Optional[Dict[str, Any]], loader: Callable[[], Any]) -> Any:
+        hit, value = self.get(query_name, params)
+        if hit:
+            return value
+        generation = self._generation
+        value = loader()
+        self.set(query_name, params, value, generation=generation)
+        return value
+
+    def get_many_or_load(self, query_name: str, params_list: List[Dict[str, Any]],
+                         loader: Callable[[List[Dict[str, Any]]], List[Any]]) -> List[Any]:
+        """``get_or_load`` for several parameter sets, loading all the misses with one ``loader`` call
+
+        ``loader`` gets the missing parameter sets and returns their values in
+        the same order; each value is cached under its own parameters.
+        """
+        values: List[Any] = []
+        missing: List[int] = []
+        for i, params in enumerate(params_list):
+            hit, value = self.get(query_name, params)
+            values.append(value)
+            if not hit:
+                missing.append(i)
+        if missing:
+            generation = self._generation
+            loaded = loader([params_list[i] for i in missing])
+            for i, value in zip(missing, loaded):
+                values[i] = value
+                self.set(query_name, params_list[i], value, generation=generation)
+        return values
+
+    def invalidate(self, query_name: Optional[str] = None) -> int:
+        """Drop cached results for one query, or everything when no name is given.
+
+        Call this after data loads so the agent never serves pre-load results.
+        Returns the number of entries removed.
+        """
+        with self._lock:
+            if query_name is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [k for k in self._entries if k[0] == query_name]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            self._generation += 1
+            self._stats["invalidations"] += 1
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "per_query": {name: dict(counts) for name, counts in self._per_query.items()}
+            }
@@ -0,0 +1,138 @@
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional
+
+import requests
+
+# Exception class names from the openai SDK that mean the service, not the request, failed.
+# Matched by name so this module does not have to import the SDK.
+_TRANSIENT_NAMES = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+_TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether ``error`` says the dependency is unreachable, overloaded or timing out
+
+    These are worth retrying and count against a circuit breaker. Anything
+    else (bad parameters, unknown vertices, 4xx responses) means the
+    dependency answered and is healthy.
+    """
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in _TRANSIENT_STATUS
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_NAMES for cls in type(error).__mro__)
+
+
+@dataclass
+class RetryPolicy:
+    """Bounded retries with exponential backoff and full jitter
+
+    Attempt ``n`` (from 0) waits a random time between 0 and
+    ``min(max_delay, base_delay * 2 ** n)``. The jitter spreads the retries
+    of many callers that failed together, so they do not hit a recovering
+    server in lockstep.
+    """
+
+    attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+
+    def delay(self, attempt: int, rng: Callable[[], float] = random.random) -> float:
+        return rng() * min(self.max_delay, self.base_delay * 2 ** attempt)
+
+
+class CircuitBreaker:
+    """Fail fast while a dependency is down.
+
+    ``closed``: calls go through, and consecutive failures are counted.
+    After ``failure_threshold`` of them the breaker opens. ``open``: calls
+    are refused, so callers can answer from a cache or report the outage
+    immediately instead of waiting for timeouts. After ``reset_timeout``
+    seconds the breaker is ``half_open`` and lets one probe call through.
+    A successful probe closes it; a failed one opens it again.
+
+    Callers ask ``allow()`` first and then report every allowed call with
+    ``record_success()`` or ``record_failure()``. Report as a success any
+    error that shows the dependency answered (see ``is_transient``).
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "trips": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(self.clock())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == "open" and now - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return self._state
+
+    def allow(self) -> bool:
+        if self.failure_threshold <= 0:
+            return True
+        now = self.clock()
+        with self._lock:
+            state = self._current_state(now)
+            if state == "closed":
+                return True
+            # One probe at a time; a probe that never reported back is replaced after reset_timeout
+            if state == "half_open" and (self._probe_started is None or now - self._probe_started >= self.reset_timeout):
+                self._probe_started = now
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._stats["successes"] += 1
+            self._failures = 0
+            self._probe_started = None
+            self._state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            probing = self._probe_started is not None
+            self._probe_started = None
+            if self.failure_threshold > 0 and (probing or self._failures >= self.failure_threshold):
+                if self._state != "open" or probing:
+                    self._stats["trips"] += 1
+                self._state = "open"
+                self._opened_at = self.clock()
+
+    def reset(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_started = None
+
+    def stats(self) -> Dict[str, Any]:
+        now = self.clock()
+        with self._lock:
+            state = self._current_state(now)
+            return {
+                **self._stats,
+                "state": state,
+                "open": int(state != "closed"),
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "retry_in": round(max(0.0, self._opened_at + self.reset_timeout - now), 1) if state == "open" else 0.0
+            }
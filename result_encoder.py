@@ -0,0 +1,185 @@
+import json
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("json", "compact", "columnar", "table")
+
+
+def parse_projections(spec: str) -> Dict[str, List[str]]:
+    """Parse a ``tool=field,field;tool=field`` projection specification"""
+    projections = {}
+    for item in spec.split(";"):
+        if "=" not in item:
+            continue
+        tool, fields = item.split("=", 1)
+        projections[tool.strip()] = [f.strip() for f in fields.split(",") if f.strip()]
+    return projections
+
+
+def _approximate_tokens(text: str) -> int:
+    # About four characters per token for English and JSON under cl100k
+    return (len(text) + 3) // 4
+
+
+def make_token_counter() -> Callable[[str], int]:
+    """tiktoken's cl100k counter when available, otherwise a character-based estimate
+
+    The tokenizer is loaded by the first count rather than here, since it pulls in LlamaIndex.
+    """
+    counter: Optional[Callable[[str], int]] = None
+
+    def count(text: str) -> int:
+        nonlocal counter
+        if counter is None:
+            counter = _load_token_counter()
+        return counter(text)
+
+    return count
+
+
+def _load_token_counter() -> Callable[[str], int]:
+    try:
+        from llama_index.core.utils import get_tokenizer
+        tokenizer = get_tokenizer()
+        tokenizer("warm up")
+        return lambda text: len(tokenizer(text))
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, estimating token counts from length: {e}")
+        return _approximate_tokens
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:g}"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, separators=(",", ":"))
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+class ResultEncoder:
+    """Turns tool result payloads into the text the LLM reads.
+
+    ``json`` is the original pretty-printed JSON. ``compact`` is the same
+    without whitespace. ``columnar`` also writes each list of rows as
+    ``{"columns": [...], "rows": [[...], ...]}`` so keys appear once.
+    ``table`` writes ``key: value`` lines with pipe-separated tables for
+    row lists.
+
+    Row lists keep only the fields listed for the tool in ``projections``.
+    They are cut to ``max_rows`` with a note of how many rows were left
+    out, except in paginated payloads (those with ``next_after_id``),
+    which are already bounded by their page size. Every call records the
+    encoded token count next to what the ``json`` format would have cost.
+    """
+
+    def __init__(self, format: str = "table", max_rows: int = 25,
+                 projections: Optional[Dict[str, List[str]]] = None,
+                 token_counter: Optional[Callable[[str], int]] = None):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown tool result format {format!r}; expected one of {', '.join(FORMATS)}")
+        self.format = format
+        self.max_rows = max_rows
+        self.projections = dict(projections or {})
+        self.count_tokens = token_counter or make_token_counter()
+        self._lock = threading.Lock()
+        self._per_tool: Dict[str, Dict[str, int]] = {}
+
+    def _rows(self, tool: str, rows: List[Any], paginated: bool) -> Tuple[List[Any], int]:
+        """Projected rows to show, and how many were left out"""
+        fields = self.projections.get(tool)
+        if fields:
+            rows = [{k: row[k] for k in fields if k in row} if isinstance(row, dict) else row for row in rows]
+        if paginated or not self.max_rows or len(rows) <= self.max_rows:
+            return rows, 0
+        return rows[:self.max_rows], len(rows) - self.max_rows
+
+    def _shape(self, tool: str, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Payload with row lists projected and truncated, plus omitted row counts per field"""
+        paginated = "next_after_id" in payload
+        shaped, omitted = {}, {}
+        for key, value in payload.items():
+            if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+                value, left_out = self._rows(tool, value, paginated)
+                if left_out:
+                    omitted[key] = left_out
+            shaped[key] = value
+        return shaped, omitted
+
+    def _columnar(self, shaped: Dict[str, Any], omitted: Dict[str, int]) -> str:
+        out = {}
+        for key, value in shaped.items():
+            if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+                columns = list(dict.fromkeys(k for row in value for k in row))
+                value = {"columns": columns, "rows": [[row.get(c) for c in columns] for row in value]}
+                if key in omitted:
+                    value["more_rows"] = omitted[key]
+            out[key] = value
+        return json.dumps(out, separators=(",", ":"))
+
+    def _table(self, shaped: Dict[str, Any], omitted: Dict[str, int]) -> str:
+        lines = []
+        for key, value in shaped.items():
+            if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+                columns = list(dict.fromkeys(k for row in value for k in row))
+                lines.append(f"{key} ({len(value)} rows):")
+                lines.append("|".join(columns))
+                lines.extend("|".join(_cell(row.get(c)) for c in columns) for row in value)
+                if key in omitted:
+                    lines.append(f"... {omitted[key]} more rows")
+            elif isinstance(value, dict):
+                lines.append(f"{key}:")
+                lines.extend(f"  {k}: {_cell(v)}" for k, v in value.items())
+            else:
+                lines.append(f"{key}: {_cell(value)}")
+        return "\n".join(lines)
+
+    def encode(self, tool: str, payload: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        """Text for the LLM and its token report (``tokens``, ``baseline_tokens``, ``rows_omitted``)"""
+        baseline = json.dumps(payload, indent=2)
+        if self.format == "json":
+            text, omitted = baseline, {}
+        else:
+            shaped, omitted = self._shape(tool, payload)
+            for key, left_out in omitted.items():
+                shaped.setdefault("note", f"Showing the first {self.max_rows} {key}; {left_out} more rows not shown")
+            if self.format == "compact":
+                text = json.dumps(shaped, separators=(",", ":"))
+            elif self.format == "columnar":
+                text = self._columnar(shaped, omitted)
+            else:
+                text = self._table(shaped, omitted)
+
+        tokens = self.count_tokens(text)
+        report = {
+            "tokens": tokens,
+            "baseline_tokens": tokens if self.format == "json" else self.count_tokens(baseline),
+            "rows_omitted": sum(omitted.values())
+        }
+        with self._lock:
+            counters = self._per_tool.setdefault(tool, {"calls": 0, "tokens": 0, "baseline_tokens": 0, "rows_omitted": 0})
+            counters["calls"] += 1
+            for key, value in report.items():
+                counters[key] += value
+        return text, report
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_tool = {tool: dict(counters) for tool, counters in self._per_tool.items()}
+        tokens = sum(c["tokens"] for c in per_tool.values())
+        baseline = sum(c["baseline_tokens"] for c in per_tool.values())
+        for counters in per_tool.values():
+            counters["saved_pct"] = round(100 * (1 - counters["tokens"] / counters["baseline_tokens"]), 1) if counters["baseline_tokens"] else 0.0
+        return {
+            "format": self.format,
+            "max_rows": self.max_rows,
+            "calls": sum(c["calls"] for c in per_tool.values()),
+            "tokens": tokens,
+            "baseline_tokens": baseline,
+            "saved_pct": round(100 * (1 - tokens / baseline), 1) if baseline else 0.0,
+            "per_tool": per_tool
+        }
@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Cache of chat answers keyed on the meaning of the question.
+
+    Questions are embedded and stored as unit vectors in a fixed-size
+    ``capacity x dim`` matrix, so a lookup is one matrix-vector product
+    over every entry. A cached answer is returned only if all of these
+    hold:
+
+    - its cosine similarity is at least ``threshold``
+    - its entity signature matches exactly, so "person_001" never answers
+      for "person_002" however close the embeddings are
+    - it was stored under the current data version
+    - it was stored after the last ``mark_stale()``
+    - it is younger than ``ttl`` seconds
+
+    The data version comes from ``version_source()``, e.g. a checksum of the
+    graph's vertex and edge counts, so every process sharing the cache file
+    agrees on it; while it returns None nothing is looked up or stored.
+    ``mark_stale()`` records the time of an explicit invalidation. It is
+    saved with the entries, and ``save()`` keeps the latest invalidation
+    time already in the file, so an invalidation survives restarts and
+    reaches the other processes when they next save.
+
+    When the matrix is full, stale slots are reused first, then the least
+    recently used one. ``save()``/``load()`` persist everything to a single
+    ``.npz`` file, so the cache survives restarts.
+    """
+
+    def __init__(self, embed_model: Any = None, capacity: int = 1000, threshold: float = 0.95,
+                 ttl: float = 86400, path: str = "", save_interval: float = 60.0,
+                 version_source: Optional[Callable[[], Optional[int]]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.embed_model = embed_model
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.path = path
+        self.save_interval = save_interval
+        # Wall-clock time, since entry timestamps are persisted across restarts
+        self.clock = clock
+        self.version_source = version_source
+        self.invalidated_at = 0.0
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._signatures = np.zeros(capacity, dtype=np.int64)
+        self._versions = np.zeros(capacity, dtype=np.int64)
+        self._created = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._dirty = False
+        self._last_save = self.clock()
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "stale": 0, "stores": 0, "skipped_stores": 0, "evictions": 0,
+                       "embeddings": 0, "embed_errors": 0, "embed_ms_total": 0.0, "saves": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.embed_model is not None
+
+    @property
+    def dim(self) -> int:
+        return 0 if self._matrix is None else self._matrix.shape[1]
+
+    @staticmethod
+    def _signature_hash(signature: str) -> int:
+        # Stable across processes (unlike hash()), so persisted entries keep matching
+        digest = 1469598103934665603
+        for byte in signature.encode("utf-8"):
+            digest = ((digest ^ byte) * 1099511628211) & 0x7FFFFFFFFFFFFFFF
+        return digest
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _record_embedding(self, start: float):
+        with self._lock:
+            self._stats["embeddings"] += 1
+            self._stats["embed_ms_total"] += (time.perf_counter() - start) * 1000
+
+    def embed(self, question: str) -> np.ndarray:
+        start = time.perf_counter()
+        vector = self.embed_model.get_query_embedding(question.strip().lower())
+        self._record_embedding(start)
+        return self._normalize(vector)
+
+    async def aembed(self, question: str) -> np.ndarray:
+        start = time.perf_counter()
+        vector = await self.embed_model.aget_query_embedding(question.strip().lower())
+        self._record_embedding(start)
+        return self._normalize(vector)
+
+    def record_embed_error(self):
+        with self._lock:
+            self._stats["embed_errors"] += 1
+
+    def record_skipped_store(self):
+        with self._lock:
+            self._stats["skipped_stores"] += 1
+
+    def data_version(self) -> Optional[int]:
+        """Version of the graph data answers are cached for; None while it is unknown"""
+        if self.version_source is None:
+            return 0
+        try:
+            return self.version_source()
+        except Exception as e:
+            logger.warning(f"Could not read the graph data version for the semantic cache: {e}")
+            return None
+
+    def _stale(self, version: int, now: float) -> np.ndarray:
+        return (self._versions != version) | (self._created <= self.invalidated_at) | (now - self._created > self.ttl)
+
+    def lookup(self, vector: np.ndarray, signature: str = "") -> Optional[Dict[str, Any]]:
+        """Closest usable entry for an embedded question, or None"""
+        now = self.clock()
+        version = self.data_version()
+        with self._lock:
+            self._stats["lookups"] += 1
+            if self._matrix is None or vector.shape[0] != self.dim or version is None:
+                self._stats["misses"] += 1
+                return None
+            usable = self._valid & (self._signatures == self._signature_hash(signature))
+            if not usable.any():
+                self._stats["misses"] += 1
+                return None
+            scores = self._matrix @ vector
+            scores[~usable] = -np.inf
+            slot = int(np.argmax(scores))
+            similarity = float(scores[slot])
+            if similarity < self.threshold:
+                self._stats["misses"] += 1
+                return None
+            if self._stale(version, now)[slot]:
+                self._stats["stale"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._last_used[slot] = now
+            self._stats["hits"] += 1
+            return {**self._entries[slot], "similarity": round(similarity, 4)}
+
+    def store(self, vector: np.ndarray, question: str, answer: str, signature: str = ""):
+        now = self.clock()
+        version = self.data_version()
+        with self._lock:
+            if version is None:
+                self._stats["skipped_stores"] += 1
+                return
+            if self._matrix is None:
+                self._matrix = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            elif vector.shape[0] != self.dim:
+                return
+            slot = self._free_slot(version, now)
+            self._matrix[slot] = vector
+            self._valid[slot] = True
+            self._signatures[slot] = self._signature_hash(signature)
+            self._versions[slot] = version
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._entries[slot] = {"question": question, "answer": answer}
+            self._stats["stores"] += 1
+            self._dirty = True
+
+    def _free_slot(self, version: int, now: float) -> int:
+        free = np.flatnonzero(~self._valid)
+        if free.size:
+            return int(free[0])
+        self._stats["evictions"] += 1
+        stale = np.flatnonzero(self._stale(version, now))
+        if stale.size:
+            return int(stale[0])
+        return int(np.argmin(self._last_used))
+
+    def mark_stale(self):
+        """Mark every answer cached so far stale; call when the graph data changes"""
+        with self._lock:
+            self.invalidated_at = self.clock()
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._valid[:] = False
+            self._entries = [None] * self.capacity
+            self._dirty = True
+
+    def save(self, path: Optional[str] = None) -> bool:
+        """Write the cache to ``path`` (default ``self.path``); returns False when there is nothing to do"""
+        path = path or self.path
+        if not path:
+            return False
+        # Another process sharing the file may have invalidated since we last saved
+        saved_invalidation = self._saved_invalidation(path)
+        with self._lock:
+            if self._matrix is None:
+                return False
+            self.invalidated_at = max(self.invalidated_at, saved_invalidation)
+            slots = np.flatnonzero(self._valid & (self._created > self.invalidated_at))
+            arrays = {
+                "matrix": self._matrix[slots],
+                "signatures": self._signatures[slots],
+                "versions": self._versions[slots],
+                "created": self._created[slots],
+                "last_used": self._last_used[slots],
+                "entries": np.array(json.dumps([self._entries[i] for i in slots])),
+                "invalidated_at": np.array(self.invalidated_at)
+            }
+            self._dirty = False
+            self._last_save = self.clock()
+            self._stats["saves"] += 1
+        # np.savez appends .npz to names without it, so write to a temp name that already has it
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        return True
+
+    @staticmethod
+    def _saved_invalidation(path: str) -> float:
+        try:
+            with np.load(path) as data:
+                return float(data["invalidated_at"]) if "invalidated_at" in data.files else 0.0
+        except (OSError, ValueError):
+            return 0.0
+
+    def maybe_save(self) -> bool:
+        """Save if there are unsaved changes and ``save_interval`` has passed since the last save"""
+        if not self._dirty or self.clock() - self._last_save < self.save_interval:
+            return False
+        return self.save()
+
+    def load(self, path: Optional[str] = None) -> int:
+        """Load entries saved by ``save()``; returns how many were loaded"""
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            with np.load(path) as data:
+                matrix = data["matrix"]
+                entries = json.loads(str(data["entries"]))
+                count = min(len(entries), self.capacity)
+                # Keep the most recently used entries if the file holds more than fit
+                keep = np.argsort(-data["last_used"])[:count]
+                with self._lock:
+                    self._matrix = np.zeros((self.capacity, matrix.shape[1]), dtype=np.float32)
+                    self._matrix[:count] = matrix[keep]
+                    self._valid[:] = False
+                    self._valid[:count] = True
+                    self._signatures[:count] = data["signatures"][keep]
+                    self._versions[:count] = data["versions"][keep]
+                    self._created[:count] = data["created"][keep]
+                    self._last_used[:count] = data["last_used"][keep]
+                    self._entries = [entries[i] for i in keep] + [None] * (self.capacity - count)
+                    if "invalidated_at" in data.files:
+                        self.invalidated_at = max(self.invalidated_at, float(data["invalidated_at"]))
+                    self._dirty = False
+            return count
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Could not load semantic cache from {path}: {e}")
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            size = int(self._valid.sum())
+        lookups = stats["lookups"]
+        embeddings = stats.pop("embeddings")
+        embed_ms_total = stats.pop("embed_ms_total")
+        return {
+            **stats,
+            "enabled": self.enabled,
+            "size": size,
+            "capacity": self.capacity,
+            "dim": self.dim,
+            "threshold": self.threshold,
+            "data_version": self.data_version(),
+            "invalidated_at": self.invalidated_at,
+            "embeddings": embeddings,
+            "embed_ms_avg": round(embed_ms_total / embeddings, 2) if embeddings else 0.0,
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,163 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Any, Optional, Callable
+
+if TYPE_CHECKING:
+    # LlamaIndex is slow to import, so it is only loaded when the first session is created
+    from chat_memory import SessionMemory
+
+SUMMARIZE_PROMPT = (
+    "The following is a conversation between a user and an assistant exploring a social network graph. "
+    "Write a concise summary of it. Keep every person ID, name and company mentioned and what the user wanted to know about them."
+)
+
+
+@dataclass
+class Session:
+    session_id: str
+    agent: Any
+    memory: "SessionMemory"
+    created_at: float
+    last_used: float
+    turns: int = 0
+    tokens: int = 0
+    # Set while a turn runs; the agent and its memory are not safe to share between concurrent turns
+    in_turn: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_turn(self, user_message: str, response: str):
+        """Add a turn that was answered outside the agent (e.g. by the fast path)"""
+        from llama_index.core.base.llms.types import ChatMessage, MessageRole
+        self.memory.put(ChatMessage(role=MessageRole.USER, content=user_message))
+        self.memory.put(ChatMessage(role=MessageRole.ASSISTANT, content=response))
+
+
+class SessionStore:
+    """Per-session agents, each with its own bounded memory.
+
+    ``agent_factory(memory)`` builds the agent for a new session. Sessions
+    idle for longer than ``idle_ttl`` seconds are evicted on the next
+    access. Past ``max_sessions``, the least recently used session is
+    evicted. Memory size per session is capped by ``memory_tokens``, so
+    the prompt an agent sends stays about the same size however long the
+    conversation runs. ``begin_turn``/``end_turn`` bracket every turn, so
+    a second message sent to a session before its previous answer is
+    finished can be turned away instead of interleaving with it.
+    """
+
+    def __init__(self, agent_factory: Callable[["SessionMemory"], Any], memory_tokens: int = 1500,
+                 idle_ttl: float = 1800, max_sessions: int = 1000, summarizer_llm: Any = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.agent_factory = agent_factory
+        self.memory_tokens = memory_tokens
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.summarizer_llm = summarizer_llm
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._metrics = {"created": 0, "evicted_idle": 0, "evicted_capacity": 0, "dropped": 0, "turns": 0,
+                         "busy_rejections": 0}
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        """The session for ``session_id``, creating it (with a new ID if none is given) when needed"""
+        now = self.clock()
+        with self._lock:
+            self._evict_idle(now)
+            session = self._sessions.get(session_id) if session_id else None
+            if session is not None:
+                session.last_used = now
+                self._sessions.move_to_end(session.session_id)
+                return session
+
+        from chat_memory import SessionMemory
+        memory = SessionMemory.from_defaults(
+            llm=self.summarizer_llm,
+            token_limit=self.memory_tokens,
+            summarize_prompt=SUMMARIZE_PROMPT
+        )
+        session = Session(
+            session_id=session_id or uuid.uuid4().hex,
+            agent=self.agent_factory(memory),
+            memory=memory,
+            created_at=now,
+            last_used=now
+        )
+        with self._lock:
+            # Another request may have created the same session while the agent was being built
+            existing = self._sessions.get(session.session_id)
+            if existing is not None:
+                return existing
+            self._sessions[session.session_id] = session
+            self._metrics["created"] += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._metrics["evicted_capacity"] += 1
+        return session
+
+    def begin_turn(self, session: Session) -> bool:
+        """Mark a turn as running on ``session``; False if another one already is"""
+        with session.lock:
+            if not session.in_turn:
+                session.in_turn = True
+                return True
+        with self._lock:
+            self._metrics["busy_rejections"] += 1
+        return False
+
+    def end_turn(self, session: Session):
+        with session.lock:
+            session.in_turn = False
+
+    def finish_turn(self, session: Session):
+        """Bring a session's memory back within budget after a turn; may call the LLM, so run it off the event loop"""
+        with session.lock:
+            session.tokens = session.memory.compact()
+            session.turns += 1
+            session.last_used = self.clock()
+        with self._lock:
+            self._metrics["turns"] += 1
+
+    def drop(self, session_id: str) -> bool:
+        with self._lock:
+            removed = self._sessions.pop(session_id, None) is not None
+            if removed:
+                self._metrics["dropped"] += 1
+        return removed
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            return self._evict_idle(self.clock())
+
+    def _evict_idle(self, now: float) -> int:
+        # Sessions are kept in last-used order, so idle ones are at the front
+        evicted = 0
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used <= self.idle_ttl:
+                break
+            self._sessions.popitem(last=False)
+            evicted += 1
+        self._metrics["evicted_idle"] += evicted
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            metrics = dict(self._metrics)
+        tokens = [session.tokens for session in sessions]
+        return {
+            **metrics,
+            "active": len(sessions),
+            "max_sessions": self.max_sessions,
+            "idle_ttl": self.idle_ttl,
+            "memory_token_budget": self.memory_tokens,
+            "memory_tokens_total": sum(tokens),
+            "memory_tokens_max": max(tokens, default=0),
+            "memory_tokens_avg": round(sum(tokens) / len(tokens), 1) if tokens else 0.0,
+            "memory_messages_total": sum(len(session.memory.get_all()) for session in sessions),
+            "summaries": sum(session.memory.summaries for session in sessions)
+        }
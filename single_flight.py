@@ -0,0 +1,111 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, Executor
+from typing import Dict, Any, Optional, Callable, Hashable, Tuple
+
+
+def _raise(error: BaseException):
+    raise error
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one in-flight call.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive with the same key while it is running wait for the leader and all
+    receive its result, or its exception. Once the call finishes the key is
+    released, so later callers run it afresh. Combine with a cache for
+    reuse over time; this only shares work that overlaps.
+
+    ``do`` is for threads: the leader runs the function in its own thread and
+    followers block. ``ado`` is for coroutines: the leader's call runs on
+    ``executor`` and followers await it without holding a thread. Both kinds
+    of caller can share the same flight.
+
+    Keys are tuples whose first element names the call (a query or tool
+    name); ``stats()`` breaks coalesced calls down by that name and
+    ``on_coalesce(name)`` is called for every follower.
+    """
+
+    def __init__(self, on_coalesce: Optional[Callable[[str], None]] = None):
+        self.on_coalesce = on_coalesce
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, Future] = {}
+        self._stats = {"calls": 0, "executed": 0, "coalesced": 0, "errors": 0, "max_waiters": 0}
+        self._waiters: Dict[Hashable, int] = {}
+        self._per_name: Dict[str, int] = {}
+
+    @staticmethod
+    def _name(key: Hashable) -> str:
+        return str(key[0]) if isinstance(key, tuple) and key else str(key)
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """The flight for ``key`` and whether the caller leads it"""
+        with self._lock:
+            self._stats["calls"] += 1
+            future = self._flights.get(key)
+            if future is None:
+                future = self._flights[key] = Future()
+                self._waiters[key] = 1
+                self._stats["executed"] += 1
+                return future, True
+            name = self._name(key)
+            self._stats["coalesced"] += 1
+            self._per_name[name] = self._per_name.get(name, 0) + 1
+            self._waiters[key] += 1
+            self._stats["max_waiters"] = max(self._stats["max_waiters"], self._waiters[key])
+        if self.on_coalesce is not None:
+            self.on_coalesce(name)
+        return future, False
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], Any]):
+        """Run the leader's call and hand its outcome to every waiter; never raises"""
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._stats["errors"] += 1
+                self._release(key)
+            future.set_exception(e)
+        else:
+            with self._lock:
+                self._release(key)
+            future.set_result(result)
+
+    def _release(self, key: Hashable):
+        # Release the key before publishing, so callers from here on start a new flight
+        del self._flights[key]
+        del self._waiters[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` once for all concurrent callers with this key (blocking)"""
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn)
+        return future.result()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Any], executor: Optional[Executor] = None) -> Any:
+        """Awaitable ``do``: the leader runs ``fn`` on ``executor`` (the loop's default if None)"""
+        future, leader = self._join(key)
+        if leader:
+            try:
+                asyncio.get_running_loop().run_in_executor(executor, self._run, key, future, fn)
+            except BaseException as e:
+                # e.g. the executor is shut down: fail this flight rather than leave it open
+                self._run(key, future, functools.partial(_raise, e))
+        # Shielded: a cancelled waiter must not cancel the flight the others are waiting on
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "in_flight": len(self._flights),
+                "coalesced_rate": round(self._stats["coalesced"] / self._stats["calls"], 4) if self._stats["calls"] else 0.0,
+                "per_name": dict(self._per_name)
+            }
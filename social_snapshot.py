@@ -0,0 +1,486 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+
+import numpy as np
+
+from graph_pool import iter_keyset
+from path_search import CSRGraph, EDGE_TYPES, FRIENDS_WITH, FOLLOWS, REVERSE_FOLLOWS
+
+logger = logging.getLogger(__name__)
+
+# Edge codes each neighbourhood relation walks
+RELATIONS = {
+    "friends": (FRIENDS_WITH,),
+    "follows": (FOLLOWS,),
+    "followers": (REVERSE_FOLLOWS,),
+    "all": (FRIENDS_WITH, FOLLOWS, REVERSE_FOLLOWS)
+}
+
+# Arrays written by save(), one .npy file each so load() can memory-map them
+_ARRAYS = ("ids", "friends", "follows", "indptr", "indices", "edge_types")
+
+
+def _lookup(ids: np.ndarray, wanted: Iterable[str]) -> np.ndarray:
+    """Position of each wanted ID in the sorted ``ids``, or -1 where it is missing"""
+    wanted = np.asarray(list(wanted), dtype=str)
+    if not len(wanted) or not len(ids):
+        return np.full(len(wanted), -1, dtype=np.int32)
+    positions = np.minimum(np.searchsorted(ids, wanted), len(ids) - 1)
+    return np.where(ids[positions] == wanted, positions, -1).astype(np.int32)
+
+
+def _unique_pairs(pairs: np.ndarray, num_vertices: int) -> np.ndarray:
+    """Distinct ``(a, b)`` rows of an int32 pair array, sorted"""
+    keys = np.unique(pairs[:, 0].astype(np.int64) * max(num_vertices, 1) + pairs[:, 1])
+    return np.stack([keys // max(num_vertices, 1), keys % max(num_vertices, 1)], axis=1).astype(np.int32)
+
+
+class SocialAdjacency:
+    """One immutable snapshot of the Person friendship and follow graph.
+
+    Person IDs are kept sorted in ``ids`` and remapped to their position
+    there, so the CSR arrays hold plain int32 rows. ``friends`` holds every
+    friendship once as ``(a, b)`` with ``a < b`` and ``follows`` every
+    ``(follower, followed)`` pair; ``csr`` is built from both, with
+    FRIENDS_WITH in both directions and FOLLOWS next to its reverse edge.
+    """
+
+    def __init__(self, ids: np.ndarray, friends: np.ndarray, follows: np.ndarray,
+                 csr: Optional[CSRGraph] = None, built_at: float = 0.0):
+        self.ids = ids
+        self.friends = friends
+        self.follows = follows
+        self.csr = csr or CSRGraph.from_edges(len(ids), [
+            (friends[:, 0], friends[:, 1], FRIENDS_WITH),
+            (follows[:, 0], follows[:, 1], FOLLOWS)
+        ])
+        self.built_at = built_at
+
+    @property
+    def num_people(self) -> int:
+        return len(self.ids)
+
+    @property
+    def max_id(self) -> str:
+        return str(self.ids[-1]) if len(self.ids) else ""
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.ids, self.friends, self.follows, self.csr.indptr,
+                                              self.csr.indices, self.csr.edge_types))
+
+    def rows(self, person_ids: Iterable[str]) -> np.ndarray:
+        """Row of each person ID, or -1 for IDs not in the snapshot"""
+        return _lookup(self.ids, person_ids)
+
+    def row(self, person_id: str) -> int:
+        return int(self.rows([person_id])[0])
+
+    def neighbours(self, row: int, codes: Tuple[int, ...] = (FRIENDS_WITH,)) -> np.ndarray:
+        """Rows adjacent to ``row`` over the given edge codes, sorted"""
+        start, end = self.csr.indptr[row], self.csr.indptr[row + 1]
+        keep = np.isin(self.csr.edge_types[start:end], codes)
+        return np.unique(self.csr.indices[start:end][keep])
+
+    def id_list(self, rows: np.ndarray) -> List[str]:
+        return self.ids[rows].tolist()
+
+    def save(self, path: str, meta: Dict[str, Any]):
+        """Write every array as ``<path>/<name>.npy`` plus ``meta.json``
+
+        Files are replaced one at a time and the metadata last; ``load``
+        rejects a set whose shapes do not match it.
+        """
+        os.makedirs(path, exist_ok=True)
+        arrays = {"ids": self.ids, "friends": self.friends, "follows": self.follows, "indptr": self.csr.indptr,
+                  "indices": self.csr.indices, "edge_types": self.csr.edge_types}
+        for name, array in arrays.items():
+            # np.save appends .npy to names without it, so write to a temp name that already has it
+            tmp_path = os.path.join(path, f"{name}.tmp.npy")
+            np.save(tmp_path, np.ascontiguousarray(array))
+            os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+        meta = {**meta, "built_at": self.built_at, "shapes": {name: list(array.shape) for name, array in arrays.items()}}
+        tmp_path = os.path.join(path, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(path, "meta.json"))
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["SocialAdjacency", Dict[str, Any]]:
+        """Memory-map a snapshot written by ``save``; pages are read from disk on first touch"""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+        for name, array in arrays.items():
+            if list(array.shape) != meta["shapes"][name]:
+                raise ValueError(f"{name}.npy does not match meta.json (partially written snapshot?)")
+        csr = CSRGraph(arrays["indptr"], arrays["indices"], arrays["edge_types"])
+        return cls(arrays["ids"], arrays["friends"], arrays["follows"], csr, meta["built_at"]), meta
+
+
+class SocialGraphSnapshot:
+    """In-process copy of the Person FRIENDS_WITH/FOLLOWS adjacency.
+
+    Answers neighbourhood questions that would otherwise each need their
+    own multi-hop GSQL round trip: k-hop expansion (``neighbourhood``),
+    mutual friends, and friend-of-friend suggestions ranked by the number
+    of mutual friends. All of them are vectorized NumPy over the CSR
+    arrays of a ``SocialAdjacency``.
+
+    ``loader(after_id, page_size)`` returns the next keyset page of people
+    ordered by ID as dicts with ``id``, ``friends`` and ``follows`` (lists
+    of person IDs); ``fetch_people(ids)`` returns the same rows for the
+    given people and leaves out IDs that no longer exist.
+
+    A full ``rebuild`` reloads everyone. ``refresh`` applies a delta:
+    people added after the highest known ID are appended, and people
+    queued with ``mark_changed`` (both endpoints of every changed edge, as
+    for the influence leaderboard) get their edges replaced. Readers keep
+    the previous snapshot until the new one is swapped in. With ``path``
+    set, every new snapshot is saved as .npy files, which the next start
+    memory-maps instead of reloading the graph. After a failed build or
+    refresh, the next one waits ``retry_backoff`` seconds, doubling with
+    each further failure up to ``refresh_interval``; until the first build
+    succeeds, lookups in between fail fast.
+    """
+
+    def __init__(self, loader: Callable[[str, int], List[Dict[str, Any]]],
+                 fetch_people: Callable[[List[str]], List[Dict[str, Any]]], page_size: int = 5000,
+                 path: str = "", refresh_interval: float = 300.0, rebuild_interval: float = 86400.0,
+                 max_hops: int = 3, retry_backoff: float = 30.0):
+        self.loader = loader
+        self.fetch_people = fetch_people
+        self.page_size = page_size
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.max_hops = max_hops
+        self.retry_backoff = retry_backoff
+        self._graph: Optional[SocialAdjacency] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._pending: set = set()
+        # Guarded by _lock; set before the background thread starts so only one is ever running
+        self._refreshing = False
+        self.failures = 0
+        self.last_attempt = 0.0
+        self.last_refresh = 0.0
+        self.last_rebuild = 0.0
+        self.build_ms = 0.0
+        self.last_error = ""
+        self.stats_counters = {"lookups": 0, "refreshes": 0, "rebuilds": 0, "refresh_errors": 0, "loads": 0,
+                               "saves": 0, "people_added": 0, "people_refetched": 0, "dangling_edges": 0}
+
+    @property
+    def ready(self) -> bool:
+        return self._graph is not None
+
+    # Building
+
+    def _build(self, people: List[Dict[str, Any]], base: Optional[SocialAdjacency] = None,
+               changed: List[str] = ()) -> Optional[SocialAdjacency]:
+        """A new snapshot: ``base`` with the edges of ``changed`` replaced by those in ``people``
+
+        Returns None for a delta that names a person who is neither in
+        ``base`` nor newer than everyone in it; only a rebuild can place
+        them in the sorted ID order.
+        """
+        person_ids = [str(person["id"]) for person in people]
+        old_ids = base.ids if base is not None else np.empty(0, dtype=str)
+        new_ids = sorted(set(np.asarray(person_ids, dtype=str)[_lookup(old_ids, person_ids) < 0].tolist()))
+        if base is not None and new_ids and new_ids[0] <= base.max_id:
+            return None
+        ids = np.concatenate([old_ids, np.asarray(new_ids, dtype=str)]) if new_ids else np.asarray(old_ids)
+
+        def edges(key: str) -> Tuple[np.ndarray, int]:
+            counts = [len(person.get(key) or []) for person in people]
+            targets = [str(target) for person in people for target in person.get(key) or []]
+            pairs = np.stack([_lookup(ids, np.repeat(np.asarray(person_ids, dtype=str), counts)),
+                              _lookup(ids, targets)], axis=1)
+            known = (pairs >= 0).all(axis=1)
+            return pairs[known & (pairs[:, 0] != pairs[:, 1])], int((~known).sum())
+
+        friends, dangling_friends = edges("friends")
+        follows, dangling_follows = edges("follows")
+        dangling = dangling_friends + dangling_follows
+        if dangling:
+            self.stats_counters["dangling_edges"] += dangling
+            if base is not None:
+                return None
+        friends = np.sort(friends, axis=1)
+        if base is not None:
+            touched = base.rows(changed)
+            touched = touched[touched >= 0]
+            deleted = np.setdiff1d(touched, _lookup(base.ids, person_ids))
+            keep_friends = ~(np.isin(base.friends[:, 0], touched) | np.isin(base.friends[:, 1], touched))
+            keep_follows = ~(np.isin(base.follows[:, 0], touched) | np.isin(base.follows[:, 1], deleted))
+            friends = np.concatenate([base.friends[keep_friends], friends])
+            follows = np.concatenate([base.follows[keep_follows], follows])
+        return SocialAdjacency(ids, _unique_pairs(friends, len(ids)), _unique_pairs(follows, len(ids)),
+                               built_at=time.time())
+
+    def _swap(self, graph: SocialAdjacency, start: float, full: bool):
+        self._graph = graph
+        self.build_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.last_refresh = time.time()
+        if full:
+            self.last_rebuild = self.last_refresh
+        self.save()
+
+    def _rebuild(self):
+        start = time.perf_counter()
+        with self._lock:
+            # A full load covers everything queued before it started
+            self._pending.clear()
+        graph = self._build(list(iter_keyset(self.loader, self.page_size)))
+        self._swap(graph, start, full=True)
+        self.stats_counters["rebuilds"] += 1
+        logger.info(f"Social graph snapshot rebuilt: {graph.num_people} people, {len(graph.friends)} friendships, "
+                    f"{len(graph.follows)} follows in {self.build_ms:.0f} ms")
+
+    def rebuild(self):
+        """Reload every person's friends and follows and swap in the new snapshot"""
+        with self._refresh_lock:
+            self._rebuild()
+
+    def refresh(self) -> int:
+        """Apply new people and queued changes; returns how many people were added or refetched"""
+        with self._refresh_lock:
+            base = self._graph
+            if base is None:
+                self._rebuild()
+                return self._graph.num_people
+            start = time.perf_counter()
+            with self._lock:
+                changed = sorted(self._pending)
+                self._pending.clear()
+            try:
+                added = list(iter_keyset(self.loader, self.page_size, base.max_id))
+                updated = [person for i in range(0, len(changed), self.page_size)
+                           for person in self.fetch_people(changed[i:i + self.page_size])]
+            except Exception:
+                self.mark_changed(changed)
+                raise
+            self.stats_counters["refreshes"] += 1
+            if not added and not changed:
+                self.last_refresh = time.time()
+                return 0
+            graph = self._build(added + updated, base, changed)
+            if graph is None:
+                logger.info("Social graph delta names people outside the snapshot; rebuilding it instead")
+                self._rebuild()
+            else:
+                self._swap(graph, start, full=False)
+            self.stats_counters["people_added"] += len(added)
+            self.stats_counters["people_refetched"] += len(changed)
+            return len(added) + len(changed)
+
+    def mark_changed(self, person_ids: Iterable[str]) -> int:
+        """Queue people whose friendships or follows changed; returns the queue length"""
+        with self._lock:
+            self._pending.update(str(person_id) for person_id in person_ids)
+            return len(self._pending)
+
+    def mark_stale(self):
+        """Force a full rebuild on the next check, e.g. after a bulk data load"""
+        self.last_rebuild = 0.0
+
+    # Persistence
+
+    def save(self) -> bool:
+        graph = self._graph
+        if not self.path or graph is None:
+            return False
+        try:
+            graph.save(self.path, {"last_refresh": self.last_refresh, "last_rebuild": self.last_rebuild})
+        except OSError as e:
+            logger.warning(f"Could not save the social graph snapshot to {self.path}: {e}")
+            return False
+        self.stats_counters["saves"] += 1
+        return True
+
+    def load(self) -> bool:
+        """Map the saved snapshot into memory; False if there is none or it is unreadable"""
+        if not self.path or not os.path.exists(os.path.join(self.path, "meta.json")):
+            return False
+        start = time.perf_counter()
+        try:
+            graph, meta = SocialAdjacency.load(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring the saved social graph snapshot in {self.path}: {e}")
+            return False
+        self._graph = graph
+        self.last_refresh = meta.get("last_refresh", graph.built_at)
+        self.last_rebuild = meta.get("last_rebuild", graph.built_at)
+        self.build_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.stats_counters["loads"] += 1
+        logger.info(f"Social graph snapshot loaded from {self.path}: {graph.num_people} people in {self.build_ms:.1f} ms")
+        return True
+
+    def _retry_delay(self) -> float:
+        if not self.failures:
+            return 0.0
+        return min(self.retry_backoff * 2 ** (self.failures - 1), max(self.retry_backoff, self.refresh_interval))
+
+    def _record_failure(self, e: Exception):
+        self.failures += 1
+        self.stats_counters["refresh_errors"] += 1
+        self.last_error = str(e)
+        logger.warning(f"Social graph snapshot refresh failed, retrying in {self._retry_delay():.0f}s: {e}")
+
+    def _refresh_in_background(self, full: bool):
+        def run():
+            try:
+                self.rebuild() if full else self.refresh()
+                self.failures = 0
+                self.last_error = ""
+            except Exception as e:
+                self._record_failure(e)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self.last_attempt = time.time()
+        threading.Thread(target=run, name="social-snapshot-refresh", daemon=True).start()
+
+    def _build_first(self):
+        """Load or build the snapshot now, unless the last attempt failed too recently"""
+        with self._refresh_lock:
+            if self._graph is not None or self.load():
+                return
+            wait = self.last_attempt + self._retry_delay() - time.time()
+            if wait > 0:
+                raise RuntimeError(f"The social graph snapshot is not loaded yet (last error: {self.last_error}); "
+                                   f"retrying in {wait:.0f}s")
+            self.last_attempt = time.time()
+            try:
+                self._rebuild()
+            except Exception as e:
+                self._record_failure(e)
+                raise
+            self.failures = 0
+            self.last_error = ""
+
+    def ensure_fresh(self):
+        """Load or build on first use, then refresh stale data without blocking readers"""
+        if not self.ready:
+            self._build_first()
+        now = time.time()
+        if self._refreshing or now - self.last_attempt < self._retry_delay():
+            return
+        if now - self.last_rebuild > self.rebuild_interval:
+            self._refresh_in_background(full=True)
+        elif self._pending or now - self.last_refresh > self.refresh_interval:
+            self._refresh_in_background(full=False)
+
+    # Queries
+
+    def _snapshot(self) -> SocialAdjacency:
+        graph = self._graph
+        if graph is None:
+            raise RuntimeError("The social graph snapshot is not loaded yet")
+        self.stats_counters["lookups"] += 1
+        return graph
+
+    @staticmethod
+    def _row(graph: SocialAdjacency, person_id: str) -> int:
+        row = graph.row(str(person_id))
+        if row < 0:
+            raise KeyError(f"No person found with ID: {person_id}")
+        return row
+
+    def neighbourhood(self, person_id: str, hops: int = 2, relation: str = "friends",
+                      sample: int = 10) -> Dict[str, Any]:
+        """People within ``hops`` steps over ``relation``, counted per hop
+
+        Each hop lists at most ``sample`` of its people, the most connected first.
+        """
+        if relation not in RELATIONS:
+            raise ValueError(f"Unknown relation {relation!r}; use one of {', '.join(RELATIONS)}")
+        graph = self._snapshot()
+        root = self._row(graph, person_id)
+        hops = max(1, min(int(hops), self.max_hops))
+        allowed = np.zeros(len(EDGE_TYPES), dtype=bool)
+        allowed[list(RELATIONS[relation])] = True
+        seen = np.zeros(graph.num_people, dtype=bool)
+        seen[root] = True
+        frontier = np.array([root], dtype=np.int32)
+        degree = np.diff(graph.csr.indptr)
+        levels = []
+        for hop in range(1, hops + 1):
+            _, reached, codes = graph.csr.expand(frontier)
+            reached = np.unique(reached[allowed[codes]])
+            reached = reached[~seen[reached]]
+            if not reached.size:
+                break
+            seen[reached] = True
+            top = reached[np.argsort(-degree[reached], kind="stable")[:sample]]
+            levels.append({"hop": hop, "count": int(reached.size), "people": graph.id_list(top)})
+            frontier = reached
+        return {
+            "person_id": str(person_id),
+            "relation": relation,
+            "hops": hops,
+            "total": sum(level["count"] for level in levels),
+            "levels": levels
+        }
+
+    def mutual_friends(self, person_a: str, person_b: str, limit: int = 20) -> Dict[str, Any]:
+        """Friends ``person_a`` and ``person_b`` have in common"""
+        graph = self._snapshot()
+        friends_a = graph.neighbours(self._row(graph, person_a))
+        friends_b = graph.neighbours(self._row(graph, person_b))
+        mutual = np.intersect1d(friends_a, friends_b, assume_unique=True)
+        return {
+            "count": int(mutual.size),
+            "people": graph.id_list(mutual[:limit]),
+            "friend_counts": {str(person_a): int(friends_a.size), str(person_b): int(friends_b.size)}
+        }
+
+    def suggest_friends(self, person_id: str, top_k: int = 10, sample: int = 3) -> List[Dict[str, Any]]:
+        """Friends of friends who are not friends yet, most mutual friends first (ties by ID)"""
+        graph = self._snapshot()
+        root = self._row(graph, person_id)
+        friends = graph.neighbours(root)
+        via, reached, codes = graph.csr.expand(friends.astype(np.int32))
+        keep = (codes == FRIENDS_WITH) & (reached != root)
+        via, reached = via[keep], reached[keep]
+        keep = ~np.isin(reached, friends)
+        via, reached = via[keep], reached[keep]
+        candidates, counts = np.unique(reached, return_counts=True)
+        # Rows follow ID order, so sorting on the row breaks ties by ID
+        best = candidates[np.lexsort((candidates, -counts))[:top_k]]
+        best_counts = counts[np.searchsorted(candidates, best)]
+        return [{
+            "id": graph.ids[row].item(),
+            "mutual_friends": int(count),
+            "via": graph.id_list(np.sort(via[reached == row])[:sample])
+        } for row, count in zip(best, best_counts)]
+
+    def stats(self) -> Dict[str, Any]:
+        graph = self._graph
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            **self.stats_counters,
+            "ready": self.ready,
+            "people": graph.num_people if graph else 0,
+            "friendships": len(graph.friends) if graph else 0,
+            "follows": len(graph.follows) if graph else 0,
+            "bytes": graph.nbytes if graph else 0,
+            "pending": pending,
+            "refreshing": self._refreshing,
+            "failures": self.failures,
+            "build_ms": self.build_ms,
+            "last_refresh": self.last_refresh,
+            "last_rebuild": self.last_rebuild,
+            "last_error": self.last_error
+        }
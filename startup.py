@@ -0,0 +1,128 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from concurrent.futures import Executor
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StartupStep:
+    name: str
+    fn: Callable[[], Any]
+    requires: Tuple[str, ...] = ()
+    critical: bool = True
+    state: str = "pending"
+    started_at: Optional[float] = None
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+
+class Startup:
+    """Application startup as a set of steps with dependencies.
+
+    Steps whose requirements are met run concurrently: plain functions on
+    ``executor`` (blocking imports, connections, warm-up queries) and
+    coroutine functions on the event loop. A step whose requirement failed
+    is skipped. The application is ready once every critical step has
+    succeeded; non-critical steps (cache warm-up, background refreshers)
+    only show up in ``status()``.
+
+    Steps must be added after the steps they require.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.steps: Dict[str, StartupStep] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def add(self, name: str, fn: Callable[[], Any], requires: Tuple[str, ...] = (), critical: bool = True):
+        unknown = [r for r in requires if r not in self.steps]
+        if unknown:
+            raise ValueError(f"Startup step {name!r} requires unknown step(s): {', '.join(unknown)}")
+        self.steps[name] = StartupStep(name, fn, tuple(requires), critical)
+
+    async def _run_step(self, step: StartupStep, requirements: List["asyncio.Task"], executor: Optional[Executor]) -> bool:
+        if requirements and not all(await asyncio.gather(*requirements)):
+            step.state = "skipped"
+            step.error = "requires " + ", ".join(r for r in step.requires if self.steps[r].state != "ready")
+            return False
+        step.state = "running"
+        step.started_at = self.clock()
+        try:
+            if asyncio.iscoroutinefunction(step.fn):
+                await step.fn()
+            else:
+                await asyncio.get_running_loop().run_in_executor(executor, step.fn)
+        except Exception as e:
+            step.state = "failed"
+            step.error = str(e) or type(e).__name__
+            log = logger.error if step.critical else logger.warning
+            log(f"Startup step {step.name} failed: {step.error}")
+            return False
+        finally:
+            step.duration = self.clock() - step.started_at
+        step.state = "ready"
+        logger.info(f"Startup step {step.name} ready in {step.duration * 1000:.0f} ms")
+        return True
+
+    async def run(self, executor: Optional[Executor] = None) -> bool:
+        """Run every step, each as soon as its requirements are ready; returns ``ready``"""
+        self.started_at = self.clock()
+        tasks: Dict[str, asyncio.Task] = {}
+        for step in self.steps.values():
+            tasks[step.name] = asyncio.ensure_future(
+                self._run_step(step, [tasks[r] for r in step.requires], executor)
+            )
+        await asyncio.gather(*tasks.values())
+        self.finished_at = self.clock()
+        return self.ready
+
+    @property
+    def ready(self) -> bool:
+        return self.started_at is not None and all(
+            step.state == "ready" for step in self.steps.values() if step.critical
+        )
+
+    def failures(self) -> List[str]:
+        """``name: error`` for critical steps that failed or were skipped"""
+        return [f"{step.name}: {step.error}" for step in self.steps.values()
+                if step.critical and step.state in ("failed", "skipped")]
+
+    def _elapsed_ms(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return round(((self.finished_at or self.clock()) - self.started_at) * 1000, 1)
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness plus state and timing of every step, for /ready"""
+        components = {}
+        for step in self.steps.values():
+            component = {"state": step.state, "critical": step.critical}
+            if step.started_at is not None:
+                component["started_ms"] = round((step.started_at - self.started_at) * 1000, 1)
+            if step.duration is not None:
+                component["duration_ms"] = round(step.duration * 1000, 1)
+            if step.requires:
+                component["requires"] = list(step.requires)
+            if step.error:
+                component["error"] = step.error
+            components[step.name] = component
+        return {
+            "ready": self.ready,
+            "finished": self.finished_at is not None,
+            "elapsed_ms": self._elapsed_ms(),
+            "components": components
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        states = [step.state for step in self.steps.values()]
+        return {
+            "ready": self.ready,
+            "elapsed_ms": self._elapsed_ms(),
+            "steps": len(states),
+            **{f"steps_{state}": states.count(state) for state in ("ready", "failed", "skipped")}
+        }
@@ -80,8 +80,10 @@ async def test_setup():
     print("\n4. 🔧 Testing installed TigerGraph queries...")
     try:
         queries = conn.getInstalledQueries()
-        expected_queries = ["GetPersonInfo", "FindConnections", "GetCompanyEmployees", 
-                          "FindTopInfluencers", "GetNetworkAnalytics"]
+        expected_queries = ["GetPersonInfo", "GetPeopleInfo", "FindConnections", "GetCompanyEmployees", 
+                          "FindTopInfluencers", "GetNetworkAnalytics", "PersonDirectory",
+                          "ListPeople", "ListCompanies", "ComputeInfluenceScores", "RefreshInfluenceScores",
+                          "SocialAdjacency", "PeopleAdjacency"]
         
         for query in expected_queries:
             if query in queries: